@@ -191,12 +191,33 @@ class ReviewerAdmin(admin.ModelAdmin):
     actions_on_bottom = True
     save_on_top = True
 
-    list_display = ('full_name', 'review_count')
+    list_display = (
+        'full_name', 'review_count', 'published_review_count',
+        'last_published_on')
 
     formfield_overrides = {
         models.TextField: {'widget': TinyMCE(attrs={'cols': 80, 'rows': 30})},
     }
 
+    def get_queryset(self, request):
+        return Reviewer.objects.annotate_review_counts(
+            super(ReviewerAdmin, self).get_queryset(request))
+
+    def review_count(self, obj):
+        return obj.total_review_count
+    review_count.short_description = 'Reviews'
+    review_count.admin_order_field = 'total_review_count'
+
+    def published_review_count(self, obj):
+        return obj.published_review_count
+    published_review_count.short_description = 'Published reviews'
+    published_review_count.admin_order_field = 'published_review_count'
+
+    def last_published_on(self, obj):
+        return obj.last_published_on
+    last_published_on.short_description = 'Last published'
+    last_published_on.admin_order_field = 'last_published_on'
+
 
 class ExternalReviewAdmin(admin.ModelAdmin):
     actions_on_bottom = True
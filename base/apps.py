@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_init
+
+
+class BaseConfig(AppConfig):
+    name = 'base'
+
+    def ready(self):
+        from base import checks, signals  # noqa
+        # objects of other apps, such as sessions, never tag cached pages
+        for model in self.get_models():
+            post_init.connect(signals.record_page_dependency, sender=model)
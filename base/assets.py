@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# The bundles built by the build_assets command, and the static files each
+# concatenates, in order
+BUNDLES = OrderedDict([
+    ('base.css', (
+        'css/bootstrap.min.css',
+        'css/bootstrap-theme.css',
+        'css/colorbox.css',
+    )),
+    ('site.css', (
+        'css/livetheatre.css',
+    )),
+    ('site.js', (
+        'js/bootstrap.min.js',
+        'js/jquery.colorbox-min.js',
+        'js/livetheatre.js',
+    )),
+])
+
+# Directory of STATIC_ROOT the bundles and their manifest are written to
+ASSETS_DIR = 'assets'
+MANIFEST_NAME = 'manifest.json'
+
+CSS_COMMENT_RE = re.compile(r'/\*(?!!).*?\*/', re.DOTALL)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def get_manifest_path():
+    return os.path.join(settings.STATIC_ROOT, ASSETS_DIR, MANIFEST_NAME)
+
+
+def minify_css(source):
+    """Remove comments and unneeded whitespace from a stylesheet"""
+    source = CSS_COMMENT_RE.sub('', source)
+    source = CSS_SPACE_RE.sub(' ', source)
+    source = CSS_PUNCTUATION_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip()
+
+
+def minify_js(source):
+    """
+    Remove indentation and blank lines from a script. Line breaks are kept,
+    since statements may rely on them in place of semicolons.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+def absolute_css_urls(source, path):
+    """
+    Make the relative url() references of the stylesheet at the static path
+    absolute, so they still resolve once it is moved into a bundle
+    """
+    directory = posixpath.dirname(path)
+
+    def replace(match):
+        quote, url = match.groups()
+        if url.startswith(('/', 'data:', 'http:', 'https:', '#')):
+            return match.group(0)
+        resolved = posixpath.normpath(posixpath.join(directory, url))
+        return 'url(%s%s%s)' % (quote, settings.STATIC_URL + resolved, quote)
+    return CSS_URL_RE.sub(replace, source)
+
+
+def build_bundle(name, paths):
+    """Return the minified contents of a bundle of static files, as bytes"""
+    parts = []
+    for path in paths:
+        full_path = finders.find(path)
+        if full_path is None:
+            raise ValueError('Static file not found: %s' % path)
+        with open(full_path, encoding='utf-8') as source_file:
+            source = source_file.read()
+        if name.endswith('.css'):
+            parts.append(minify_css(absolute_css_urls(source, path)))
+        else:
+            # end each script's last statement, in case it has no semicolon
+            parts.append(minify_js(source) + '\n;')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def write_bundle(name, content, root):
+    """
+    Write a bundle to root under a name including a hash of its content,
+    along with gzip and brotli compressed copies, and return its path
+    relative to the static root
+    """
+    stem, extension = posixpath.splitext(name)
+    digest = hashlib.md5(content).hexdigest()[:12]
+    path = posixpath.join(ASSETS_DIR, '%s.%s%s' % (stem, digest, extension))
+    full_path = os.path.join(root, path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+    with open(full_path, 'wb') as bundle_file:
+        bundle_file.write(content)
+    # a fixed mtime keeps the compressed copy identical between builds
+    with open(full_path + '.gz', 'wb') as gzip_file:
+        gzip_file.write(gzip.compress(content, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(full_path + '.br', 'wb') as brotli_file:
+            brotli_file.write(brotli.compress(content))
+    return path
+
+
+def build_assets(root=None):
+    """
+    Build every bundle into the static root and write the manifest mapping
+    bundle names to their hashed paths. Returns the manifest.
+    """
+    root = root or settings.STATIC_ROOT
+    manifest = OrderedDict(
+        (name, write_bundle(name, build_bundle(name, paths), root))
+        for name, paths in BUNDLES.items()
+    )
+    manifest_path = os.path.join(root, ASSETS_DIR, MANIFEST_NAME)
+    with open(manifest_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    _manifest_cache.clear()
+    return manifest
+
+
+# the loaded manifest, keyed on its path and modification time
+_manifest_cache = {}
+
+
+def load_manifest():
+    """
+    Return the manifest written by build_assets, or an empty dictionary if the
+    assets have not been built. It is read again only when it changes.
+    """
+    path = get_manifest_path()
+    try:
+        key = (path, os.stat(path).st_mtime)
+    except OSError:
+        return {}
+    if key not in _manifest_cache:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+        _manifest_cache.clear()
+        _manifest_cache[key] = manifest
+    return _manifest_cache[key]
+
+
+def get_asset_paths(name):
+    """
+    Return the static paths to include for a bundle: its hashed file once
+    the assets have been built, otherwise the files it bundles
+    """
+    manifest = load_manifest()
+    if name in manifest:
+        return [manifest[name]]
+    return list(BUNDLES[name])
@@ -0,0 +1,22 @@
+from django.core.checks import Warning, register
+
+from base import generations
+
+
+@register()
+def check_shared_cache(app_configs, **kwargs):
+    """
+    Warn when the default cache is local to each process, since generations
+    bumped by one process, such as the search index generation bumped by the
+    process_search_queue worker, must invalidate what the others cached
+    """
+    if generations.cache_is_shared():
+        return []
+    return [Warning(
+        'The default cache is local to each process.',
+        hint=(
+            'Search results, fragments and pages cached by one process are '
+            'not invalidated by changes made in another. Configure a shared '
+            'backend, such as memcached, in CACHES.'),
+        id='base.W001',
+    )]
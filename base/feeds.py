@@ -1,7 +1,14 @@
+import hashlib
+
 from django.contrib.syndication.views import Feed
+from django.http import HttpResponse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date, quote_etag
 
-from base.models import Review, Production, Audition, ArtsNews
+from base import generations
+from base.models import (
+    ArtsNews, Audition, Play, Production, ProductionCompany, Review)
 
 
 class AggregatedFeed(Feed):
@@ -13,10 +20,47 @@ class AggregatedFeed(Feed):
         'narrative theatre in Central Texas.')
     link = '/'
 
+    # the rendered feed is cached until one of these models is saved
+    cache_models = (
+        Review, Production, Audition, ArtsNews, Play, ProductionCompany)
+
+    def __call__(self, request, *args, **kwargs):
+        """
+        Serve the cached feed document, answering conditional requests with a
+        304 without rebuilding it or querying the database
+        """
+        document = generations.get_or_set_versioned(
+            'aggregated_feed', self.cache_models,
+            lambda: self.build_document(request, *args, **kwargs),
+            request.get_host(), request.scheme)
+
+        response = HttpResponse(
+            document['content'], content_type=document['content_type'])
+        response['ETag'] = document['etag']
+        if document['last_modified'] is not None:
+            response['Last-Modified'] = http_date(document['last_modified'])
+        return get_conditional_response(
+            request, etag=document['etag'],
+            last_modified=document['last_modified'], response=response)
+
+    def build_document(self, request, *args, **kwargs):
+        """Render the feed, returning its content and validators"""
+        response = super(AggregatedFeed, self).__call__(
+            request, *args, **kwargs)
+        last_modified = response.get('Last-Modified')
+        return {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+            'last_modified': (
+                parse_http_date(last_modified) if last_modified else None),
+        }
+
     def items(self):
         """Return a sorted list of Productions, Auditions, News, and Reviews"""
-        productions = Production.objects.all()[:30]
-        auditions = Audition.objects.all()[:11]
+        productions = Production.objects.select_related(
+            'play', 'production_company').order_by('-created_on')[:30]
+        auditions = Audition.objects.order_by('-created_on')[:11]
         news = ArtsNews.objects.all()[:33]
         reviews = Review.objects.filter(is_published=True)[:6]
         aggregated = (
@@ -1,8 +1,10 @@
 from django import forms
 from django.conf import settings
-from django.core.mail import EmailMessage
 from django.template.defaultfilters import filesizeformat
 from captcha.fields import CaptchaField
+from haystack.forms import ModelSearchForm
+
+from base.models import ContactMessage
 
 CONTACT_SUBJECTS = (
     ('inquiry', 'Personal/website inquiry'),
@@ -29,11 +31,21 @@ class ContactForm(forms.Form):
         'condensing them into a zipped archive. Size limit: 5MB')
     captcha = CaptchaField(label="Please prove you're not a robot")
 
+    def __init__(self, *args, **kwargs):
+        # fields whose uploads were skipped for exceeding MAX_UPLOAD_SIZE
+        self.skipped_files = kwargs.pop('skipped_files', ())
+        super(ContactForm, self).__init__(*args, **kwargs)
+
     def clean_attachment(self):
         attachment = self.cleaned_data.get('attachment')
-        if attachment and attachment._size > settings.MAX_UPLOAD_SIZE:
-            readable_filesize = filesizeformat(attachment._size)
-            readable_limit = filesizeformat(settings.MAX_UPLOAD_SIZE)
+        readable_limit = filesizeformat(settings.MAX_UPLOAD_SIZE)
+        if 'attachment' in self.skipped_files:
+            raise forms.ValidationError(
+                'Please keep your attachments smaller than %s.'
+                % readable_limit
+            )
+        if attachment and attachment.size > settings.MAX_UPLOAD_SIZE:
+            readable_filesize = filesizeformat(attachment.size)
             raise forms.ValidationError(
                 'Please keep your attachments smaller than %s. This file is %s'
                 % (readable_limit, readable_filesize)
@@ -57,17 +69,69 @@ class ContactForm(forms.Form):
         subject = prefix + subjects[choice]
         return subject
 
-    def send_message(self):
-        """After form is validated, send the values by email"""
+    def queue_message(self):
+        """
+        After form is validated, add the values to the outbox, to be emailed
+        by the send_contact_messages command. Returns the ContactMessage.
+        """
         if not self.cleaned_data:
             self.clean()
 
-        email = EmailMessage(
+        return ContactMessage.objects.create(
             subject=self.get_subject(),
             body=self.cleaned_data.get('message'),
-            to=settings.DEFAULT_CONTACT_EMAILS,
-            headers={'Reply-To': self.cleaned_data.get('email')})
-        attachment = self.cleaned_data.get('attachment')
-        if attachment:
-            email.attach(attachment.name, attachment.read())
-        email.send()
+            reply_to=self.cleaned_data.get('email'),
+            attachment=self.cleaned_data.get('attachment'))
+
+
+class FilteredSearchForm(ModelSearchForm):
+    """
+    Searches the selected content types, narrowed to any selected facet values
+    and to events that overlap the given dates
+    """
+    facet_fields = ('kind', 'city', 'company')
+
+    kind = forms.CharField(
+        required=False, label='Type', widget=forms.HiddenInput)
+    city = forms.CharField(
+        required=False, label='City', widget=forms.HiddenInput)
+    company = forms.CharField(
+        required=False, label='Company', widget=forms.HiddenInput)
+    date_from = forms.DateField(required=False, label='From')
+    date_to = forms.DateField(required=False, label='To')
+
+    def clean(self):
+        cleaned_data = super(FilteredSearchForm, self).clean()
+        for name in self.facet_fields:
+            value = cleaned_data.get(name)
+            # a value is quoted to be matched literally, so it cannot
+            # contain both kinds of quote
+            if value and '"' in value and "'" in value:
+                self.add_error(name, 'Select a valid %s.' % (
+                    self.fields[name].label.lower()))
+        return cleaned_data
+
+    def get_narrow_query(self, name, value):
+        """
+        Return the query matching a facet's exact value. The parser takes a
+        quoted value literally, up to the next matching quote, so the value is
+        quoted with a character it does not contain.
+        """
+        quote = "'" if '"' in value else '"'
+        return u'%s_exact:%s%s%s' % (name, quote, value, quote)
+
+    def search(self):
+        sqs = super(FilteredSearchForm, self).search()
+        if not self.is_valid():
+            return sqs
+
+        for name in self.facet_fields:
+            sqs = sqs.facet('%s_exact' % name)
+            if self.cleaned_data[name]:
+                sqs = sqs.narrow(
+                    self.get_narrow_query(name, self.cleaned_data[name]))
+        if self.cleaned_data['date_from']:
+            sqs = sqs.filter(end_date__gte=self.cleaned_data['date_from'])
+        if self.cleaned_data['date_to']:
+            sqs = sqs.filter(start_date__lte=self.cleaned_data['date_to'])
+        return sqs
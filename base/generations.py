@@ -0,0 +1,150 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# Models whose edits should invalidate cached fragments. Besides the content
+# types themselves, this includes the related models their listings display.
+GENERATION_MODELS = (
+    'Review', 'ArtsNews', 'Production', 'Audition', 'Play',
+    'ProductionCompany', 'Venue', 'Address', 'ExternalReview',
+    'NewsSlideshowImage', 'Reviewer',
+)
+
+
+def cache_is_shared():
+    """
+    Return whether the default cache is shared between processes. Counters
+    bumped in a LocMemCache are only seen by the process that bumped them.
+    """
+    return not isinstance(caches['default'], LocMemCache)
+
+
+def _generation_key(model):
+    return 'generation:%s' % model._meta.label_lower
+
+
+def _initial_generation():
+    """
+    Return a starting value for a new generation counter. Using the current
+    time ensures a counter that was evicted never restarts at an old value.
+    """
+    return int(time.time() * 1000)
+
+
+# The models whose generations were read in this thread, while tracked
+_reads = threading.local()
+
+# Bumped whenever the search index is written, invalidating cached results
+SEARCH_INDEX_KEY = 'generation:search_index'
+
+# Bumped whenever a typeahead suggestion changes (see base.typeahead)
+SUGGESTIONS_KEY = 'generation:suggestions'
+
+
+def _get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, _initial_generation(), None)
+        generation = cache.get(key)
+    return generation
+
+
+def _bump_generation(key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        generation = _initial_generation()
+        cache.set(key, generation, None)
+        return generation
+
+
+def get_generation(model):
+    """Return the current generation number of the given model"""
+    models = getattr(_reads, 'models', None)
+    if models is not None:
+        models.add(model)
+    return _get_generation(_generation_key(model))
+
+
+@contextmanager
+def tracking_reads():
+    """
+    Collect the models whose generations are read within the block. Content
+    cached on them, such as template fragments, depends on those models even
+    when it is rendered without a query.
+    """
+    models = set()
+    _reads.models = models
+    try:
+        yield models
+    finally:
+        _reads.models = None
+
+
+def get_generations(*models):
+    """Return a version string that changes when any of the models change"""
+    return '.'.join(str(get_generation(model)) for model in models)
+
+
+def bump_generation(model):
+    """Increment the generation of the given model, invalidating fragments"""
+    return _bump_generation(_generation_key(model))
+
+
+def get_search_index_generation():
+    """Return the current generation number of the search index"""
+    return _get_generation(SEARCH_INDEX_KEY)
+
+
+def bump_search_index_generation():
+    """Increment the search index generation, invalidating cached results"""
+    return _bump_generation(SEARCH_INDEX_KEY)
+
+
+def get_suggestions_generation():
+    """Return the current generation number of the typeahead suggestions"""
+    return _get_generation(SUGGESTIONS_KEY)
+
+
+def bump_suggestions_generation():
+    """Increment the suggestions generation, so processes apply changes"""
+    return _bump_generation(SUGGESTIONS_KEY)
+
+
+def _tag_key(tag):
+    return 'generation:page:%s' % tag
+
+
+def get_tag_generations(tags):
+    """
+    Return the current generation number of each of the page cache tags, as
+    a dictionary. They are fetched together, since a page may have many.
+    """
+    keys = dict((_tag_key(tag), tag) for tag in tags)
+    generations = cache.get_many(keys)
+    for key in set(keys) - set(generations):
+        generations[key] = _get_generation(key)
+    return dict((keys[key], generation)
+                for key, generation in generations.items())
+
+
+def bump_tag_generation(tag):
+    """Increment the generation of a page cache tag, expiring its pages"""
+    return _bump_generation(_tag_key(tag))
+
+
+def get_or_set_versioned(name, models, default, *vary_on):
+    """
+    Return the cached value of the callable default, keyed on name, the
+    generations of models, and any vary_on values. Values also expire after
+    VERSIONED_CACHE_TIMEOUT seconds.
+    """
+    key = ':'.join(
+        ['versioned', name, get_generations(*models)] +
+        [str(value) for value in vary_on]
+    )
+    return cache.get_or_set(key, default, settings.VERSIONED_CACHE_TIMEOUT)
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+
+from django.apps import apps
+from django.db import IntegrityError, models, transaction
+from django.db.models import Q
+from django.utils import timezone
+from haystack import connection_router, connections
+from haystack.exceptions import NotHandled, SkipDocument
+from haystack.signals import BaseSignalProcessor
+
+from base import generations
+from base.models import SearchQueueEntry
+
+
+def is_indexed(model):
+    """Return True if any search connection has an index for the model"""
+    return any(
+        model in connections[alias].get_unified_index().get_indexed_models()
+        for alias in connections.connections_info
+    )
+
+
+def prepare_documents(model, pks, using='default'):
+    """
+    Return the search documents of the model's objects with the given primary
+    keys, converted to the values the Whoosh backend stores. Objects that are
+    not part of the index's queryset are skipped.
+    """
+    index = connections[using].get_unified_index().get_index(model)
+    backend = connections[using].get_backend()
+    documents = []
+    for obj in index.index_queryset(using=using).filter(pk__in=pks):
+        try:
+            document = index.full_prepare(obj)
+        except SkipDocument:
+            continue
+        # document boosts are not supported by Whoosh
+        document.pop('boost', None)
+        documents.append(dict(
+            (key, backend._from_python(value))
+            for key, value in document.items()
+        ))
+    return documents
+
+
+def enqueue(model, pk, action):
+    """
+    Queue an update or removal of an object's search documents, replacing any
+    action already queued for the same object
+    """
+    label = model._meta.label_lower
+    entries = SearchQueueEntry.objects.filter(model_label=label, object_pk=pk)
+    now = timezone.now()
+    if entries.update(action=action, queued_on=now):
+        return
+    try:
+        with transaction.atomic():
+            SearchQueueEntry.objects.create(
+                model_label=label, object_pk=pk, action=action, queued_on=now)
+    except IntegrityError:
+        # another process queued the same object first
+        entries.update(action=action, queued_on=now)
+
+
+def process_queue(batch_size=100):
+    """
+    Apply the oldest batch_size queued entries to the search indexes and
+    return the number of entries processed. Objects queued for an update that
+    are no longer part of their index's queryset are removed instead.
+    """
+    entries = list(SearchQueueEntry.objects.all()[:batch_size])
+    entries_by_label = OrderedDict()
+    for entry in entries:
+        entries_by_label.setdefault(entry.model_label, []).append(entry)
+
+    for label, label_entries in entries_by_label.items():
+        model = apps.get_model(label)
+        update_pks = [
+            entry.object_pk for entry in label_entries
+            if entry.action == SearchQueueEntry.UPDATE
+        ]
+        for using in connection_router.for_write():
+            try:
+                index = connections[using].get_unified_index().get_index(model)
+            except NotHandled:
+                continue
+            backend = connections[using].get_backend()
+            objects = []
+            if update_pks:
+                objects = list(index.index_queryset(using=using).filter(
+                    pk__in=update_pks))
+            if objects:
+                backend.update(index, objects)
+            indexed_pks = set(obj.pk for obj in objects)
+            for entry in label_entries:
+                if entry.object_pk not in indexed_pks:
+                    backend.remove('%s.%s' % (label, entry.object_pk))
+
+    # leave entries that were queued again while the batch was processed
+    processed = Q()
+    for entry in entries:
+        processed |= Q(pk=entry.pk, queued_on=entry.queued_on)
+    if entries:
+        SearchQueueEntry.objects.filter(processed).delete()
+        # read by the web processes through the shared cache (see CACHES)
+        generations.bump_search_index_generation()
+    return len(entries)
+
+
+class QueuedSignalProcessor(BaseSignalProcessor):
+    """
+    Record saved and deleted objects in the search queue instead of updating
+    the search index during the request. The process_search_queue command
+    applies the queued changes.
+    """
+    def setup(self):
+        models.signals.post_save.connect(self.handle_save)
+        models.signals.post_delete.connect(self.handle_delete)
+
+    def teardown(self):
+        models.signals.post_save.disconnect(self.handle_save)
+        models.signals.post_delete.disconnect(self.handle_delete)
+
+    def handle_save(self, sender, instance, raw=False, **kwargs):
+        if not raw and is_indexed(sender):
+            enqueue(sender, instance.pk, SearchQueueEntry.UPDATE)
+
+    def handle_delete(self, sender, instance, **kwargs):
+        if is_indexed(sender):
+            enqueue(sender, instance.pk, SearchQueueEntry.DELETE)
@@ -0,0 +1,208 @@
+import json
+import platform
+import time
+import tracemalloc
+from datetime import date
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, reset_queries
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from base import urls
+from base.profiling import percentile
+from base.models import (
+    Address, ArtsNews, Audition, Production, ProductionCompany,
+    ProductionOccurrence, Review, Reviewer, Venue)
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Querysets from which to pick the object named by a url's slug
+SLUG_QUERYSETS = {
+    'review_detail': lambda: Review.objects.filter(is_published=True),
+    'audition_detail': lambda: Audition.objects.all(),
+    'news_detail': lambda: ArtsNews.objects.all(),
+    'production_detail': lambda: Production.objects.all(),
+    'production_news': lambda: Production.objects.annotate(
+        count=Count('artsnews')).order_by('-count'),
+    'production_company': lambda: ProductionCompany.objects.all(),
+    'company_reviews': lambda: ProductionCompany.objects.annotate(
+        count=Count('production__review')).order_by('-count'),
+    'company_auditions': lambda: ProductionCompany.objects.annotate(
+        count=Count('audition')).order_by('-count'),
+    'company_auditions_past': lambda: ProductionCompany.objects.annotate(
+        count=Count('audition')).order_by('-count'),
+    'company_productions': lambda: ProductionCompany.objects.annotate(
+        count=Count('production')).order_by('-count'),
+    'company_news': lambda: ProductionCompany.objects.annotate(
+        count=Count('artsnews')).order_by('-count'),
+    'venue_productions': lambda: Venue.objects.annotate(
+        count=Count('production')).order_by('-count'),
+}
+
+REPORTED_MODELS = (
+    Address, ArtsNews, Audition, Production, ProductionCompany,
+    ProductionOccurrence, Review, Reviewer, Venue,
+)
+
+
+def get_sample_kwargs(name, group_names):
+    """
+    Return url kwargs selecting representative content for the named url,
+    or None if there is no content to select
+    """
+    today = date.today()
+    kwargs = {}
+    for group in group_names:
+        if group == 'slug':
+            obj = SLUG_QUERYSETS[name]().only('slug').first()
+            if obj is None:
+                return None
+            kwargs['slug'] = obj.slug
+        elif group == 'year':
+            kwargs['year'] = today.strftime('%Y')
+        elif group == 'month':
+            kwargs['month'] = str(today.month)
+        elif group == 'start_date':
+            kwargs['start_date'] = today.strftime('%Y%m%d')
+        elif group == 'city':
+            city = Venue.objects.values('address__city').annotate(
+                count=Count('pk')).order_by('-count').first()
+            if city is None:
+                return None
+            kwargs['city'] = city['address__city']
+    return kwargs
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every url in base/urls.py through the test client and write '
+        'a JSON report of latency percentiles, query counts and peak memory '
+        'per view. Run against a large dataset (see generate_dataset) and '
+        'diff the reports between releases.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Number of timed requests per url.')
+        parser.add_argument(
+            '--output', default=None,
+            help='File to write the JSON report to. Defaults to stdout.')
+        parser.add_argument(
+            '--url', action='append', dest='url_names', default=None,
+            help='Only benchmark the named url. May be given several times.')
+
+    def get_targets(self, url_names=None):
+        """Return (name, path) tuples of the urls to benchmark"""
+        targets = []
+        for pattern in urls.urlpatterns:
+            if url_names and pattern.name not in url_names:
+                continue
+            group_names = sorted(pattern.pattern.regex.groupindex)
+            kwargs = get_sample_kwargs(pattern.name, group_names)
+            if kwargs is None:
+                self.stderr.write('Skipping %s: no content' % pattern.name)
+                continue
+            path = reverse(pattern.name, kwargs=kwargs)
+            if (pattern.name, path) not in targets:
+                targets.append((pattern.name, path))
+        return targets
+
+    def benchmark(self, client, name, path, repeat):
+        """
+        Return the benchmark results of requesting path, starting from an
+        empty cache
+        """
+        cache.clear()
+        reset_queries()
+        with CaptureQueriesContext(connection) as cold_queries:
+            start = time.perf_counter()
+            response = client.get(path)
+            first_request_ms = (time.perf_counter() - start) * 1000
+        # captured queries are read lazily from the log, so count them now
+        first_request_queries = len(cold_queries)
+
+        timings = []
+        query_counts = []
+        for _ in range(repeat):
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                client.get(path)
+                timings.append((time.perf_counter() - start) * 1000)
+            query_counts.append(len(queries))
+
+        # measured separately, since tracing allocations slows requests down
+        tracemalloc.start()
+        client.get(path)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        latency = dict(
+            ('p%s' % pct, round(percentile(timings, pct), 3))
+            for pct in PERCENTILES)
+        latency.update({
+            'min': round(min(timings), 3),
+            'max': round(max(timings), 3),
+            'mean': round(sum(timings) / len(timings), 3),
+        })
+        return {
+            'name': name,
+            'path': path,
+            'status': response.status_code,
+            'response_bytes': len(response.content),
+            'first_request_ms': round(first_request_ms, 3),
+            'latency_ms': latency,
+            'queries_first_request': first_request_queries,
+            'queries': max(query_counts),
+            'peak_memory_kb': round(peak_memory / 1024.0, 1),
+        }
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'python_version': platform.python_version(),
+            'django_version': django.get_version(),
+            'database': connection.vendor,
+            'repeat': repeat,
+            'row_counts': dict(
+                (model.__name__, model.objects.count())
+                for model in REPORTED_MODELS),
+            'views': [],
+        }
+
+        # the client loads its middleware on its first request, so create
+        # it with the page cache disabled: cached pages would make every
+        # timed request a cache hit and hide the queries of the views. Each
+        # url starts from an empty cache, so use one private to this process
+        # rather than clearing the generations and pages of the site's.
+        with override_settings(
+                ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver'],
+                PAGE_CACHE_ENABLED=False,
+                CACHES={'default': {
+                    'BACKEND':
+                        'django.core.cache.backends.locmem.LocMemCache',
+                    'LOCATION': 'benchmark_views',
+                }}):
+            client = Client()
+            for name, path in self.get_targets(options['url_names']):
+                result = self.benchmark(client, name, path, repeat)
+                report['views'].append(result)
+                self.stderr.write('%s %s: p50 %sms, %s queries' % (
+                    result['status'], path, result['latency_ms']['p50'],
+                    result['queries']))
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as report_file:
+                report_file.write(output + '\n')
+        else:
+            self.stdout.write(output)
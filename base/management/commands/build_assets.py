@@ -0,0 +1,27 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from base.assets import brotli, build_assets
+
+
+class Command(BaseCommand):
+    help = (
+        'Bundle and minify the site stylesheets and scripts into files named '
+        'for their content, with compressed copies and a manifest the '
+        'templates include them from.'
+    )
+
+    def handle(self, *args, **options):
+        manifest = build_assets()
+        for name, path in manifest.items():
+            full_path = os.path.join(settings.STATIC_ROOT, path)
+            sizes = ['%s bytes' % os.path.getsize(full_path),
+                     '%s gzipped' % os.path.getsize(full_path + '.gz')]
+            if brotli is not None:
+                sizes.append('%s brotli' % os.path.getsize(full_path + '.br'))
+            self.stdout.write('%s: %s (%s)' % (name, path, ', '.join(sizes)))
+        if brotli is None:
+            self.stdout.write(
+                'Install the brotli package to also write brotli copies.')
@@ -0,0 +1,111 @@
+import json
+import os
+import time
+from collections import OrderedDict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from base import profiling
+
+
+class Command(BaseCommand):
+    help = (
+        'Summarize the request profiles recorded by ProfilingMiddleware in '
+        'the given web worker processes, slowest url first, or dump them as '
+        'JSON. Each process is sent SIGUSR2, which stops any process not '
+        'running the middleware, so pass worker pids, not a master\'s.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'pids', nargs='+', type=int, metavar='pid',
+            help='Process ids of the web workers to read profiles from.')
+        parser.add_argument(
+            '--timeout', type=float, default=5,
+            help='Seconds to wait for each process to write its profiles.')
+        parser.add_argument(
+            '--json', action='store_true', dest='as_json',
+            help='Dump every buffered profile as JSON instead of a summary.')
+        parser.add_argument(
+            '--url-name', default=None,
+            help='Only include requests to the named url.')
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Empty the buffers after dumping them.')
+
+    def read_profiles(self, pid, clear, timeout):
+        """Return the profiles buffered by a process, signalling it"""
+        request_path, dump_path = profiling.get_dump_paths(pid)
+        os.makedirs(os.path.dirname(request_path), exist_ok=True)
+        if os.path.exists(dump_path):
+            os.remove(dump_path)
+        with open(request_path, 'w') as request_file:
+            json.dump({'clear': clear}, request_file)
+        try:
+            try:
+                os.kill(pid, profiling.DUMP_SIGNAL)
+            except ProcessLookupError:
+                raise CommandError('No process with id %s.' % pid)
+            deadline = time.monotonic() + timeout
+            while not os.path.exists(dump_path):
+                if time.monotonic() > deadline:
+                    raise CommandError(
+                        'Process %s did not write its profiles. Is it a web '
+                        'worker with ProfilingMiddleware enabled?' % pid)
+                time.sleep(0.05)
+            with open(dump_path) as dump_file:
+                return json.load(dump_file)
+        finally:
+            for path in (request_path, dump_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def summarize(self, profiles):
+        """Return a summary dictionary per url name, slowest first"""
+        by_url_name = OrderedDict()
+        for profile in profiles:
+            by_url_name.setdefault(
+                profile['url_name'] or profile['path'], []).append(profile)
+
+        summaries = []
+        for url_name, url_profiles in by_url_name.items():
+            total_times = [profile['total_ms'] for profile in url_profiles]
+            summaries.append({
+                'url_name': url_name,
+                'requests': len(url_profiles),
+                'p50_ms': profiling.percentile(total_times, 50),
+                'p95_ms': profiling.percentile(total_times, 95),
+                'db_ms': sum(
+                    p['db_ms'] for p in url_profiles) / len(url_profiles),
+                'render_ms': sum(
+                    p['render_ms'] for p in url_profiles) / len(url_profiles),
+                'max_queries': max(p['queries'] for p in url_profiles),
+            })
+        return sorted(summaries, key=lambda s: s['p95_ms'], reverse=True)
+
+    def handle(self, *args, **options):
+        profiles = []
+        for pid in options['pids']:
+            profiles.extend(self.read_profiles(
+                pid, options['clear'], options['timeout']))
+        if options['url_name']:
+            profiles = [
+                profile for profile in profiles
+                if profile['url_name'] == options['url_name']
+            ]
+
+        if options['as_json']:
+            self.stdout.write(json.dumps(profiles, indent=2, sort_keys=True))
+        elif profiles:
+            row_format = '{:<32} {:>8} {:>10} {:>10} {:>10} {:>10} {:>8}'
+            self.stdout.write(row_format.format(
+                'url', 'requests', 'p50 ms', 'p95 ms', 'db ms', 'render ms',
+                'queries'))
+            for summary in self.summarize(profiles):
+                self.stdout.write(row_format.format(
+                    summary['url_name'][:32], summary['requests'],
+                    '%.1f' % summary['p50_ms'], '%.1f' % summary['p95_ms'],
+                    '%.1f' % summary['db_ms'], '%.1f' % summary['render_ms'],
+                    summary['max_queries']))
+        else:
+            self.stdout.write('No request profiles recorded.')
@@ -0,0 +1,73 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from base.models import ArtsNews, Audition, Production, Review
+
+
+class Command(BaseCommand):
+    help = (
+        'Print the query plan and average execution time of the filter and '
+        'ordering queries run by the listing and detail pages. Run before '
+        'and after a schema change (e.g. `migrate base <previous migration>`) '
+        'to compare plans on the same dataset.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=10,
+            help='Number of times to execute each query when timing it.')
+
+    def get_querysets(self):
+        """Return (name, queryset) tuples of the queries to explain"""
+        today = timezone.now().date()
+        slug = Production.objects.values_list('slug', flat=True).last() or ''
+        return [
+            (
+                'Production.objects.filter_in_range',
+                Production.objects.filter_in_range(
+                    today, today + timedelta(days=60)).order_by('start_date'),
+            ),
+            (
+                'Production.objects.filter_current',
+                Production.objects.filter_current().order_by('start_date'),
+            ),
+            (
+                'Production detail (slug lookup)',
+                Production.objects.filter(slug=slug),
+            ),
+            (
+                'Audition.objects.filter_upcoming',
+                Audition.objects.filter_upcoming(),
+            ),
+            (
+                'Audition.objects.filter_past',
+                Audition.objects.filter_past()[:24],
+            ),
+            (
+                'Published review listing',
+                Review.objects.filter(is_published=True).order_by(
+                    '-published_on')[:6],
+            ),
+            (
+                'News listing',
+                ArtsNews.objects.order_by('-created_on')[:36],
+            ),
+        ]
+
+    def time_queryset(self, queryset, repeat):
+        """Return the average time in milliseconds to evaluate queryset"""
+        start = time.time()
+        for _ in range(repeat):
+            list(queryset.prefetch_related(None))
+        return (time.time() - start) * 1000 / repeat
+
+    def handle(self, *args, **options):
+        repeat = max(1, options['repeat'])
+        for name, queryset in self.get_querysets():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            self.stdout.write(queryset.explain())
+            self.stdout.write('Average: %.2fms over %s runs\n' % (
+                self.time_queryset(queryset, repeat), repeat))
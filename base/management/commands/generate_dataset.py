@@ -0,0 +1,296 @@
+import random
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from base import generations, pagecache
+from base.models import (
+    Address, ArtsNews, Audition, ExternalReview, Play, Production,
+    ProductionCompany, ProductionOccurrence, Review, Reviewer, Venue,
+    WEEK_DAYS, get_performance_dates, week_to_mask)
+
+CITIES = [
+    'Austin', 'Austin', 'Austin', 'Austin', 'Round Rock', 'Georgetown',
+    'San Marcos', 'Pflugerville', 'Cedar Park', 'Lockhart', 'Bastrop',
+]
+ADJECTIVES = [
+    'Little', 'Glass', 'Lost', 'Electric', 'Crooked', 'Silent', 'Burning',
+    'Hidden', 'Winter', 'Golden', 'Restless', 'Broken', 'Midnight', 'Wild',
+]
+NOUNS = [
+    'Menagerie', 'Orchard', 'Garden', 'Crossing', 'House', 'Country', 'Tale',
+    'Streetcar', 'Foxes', 'Town', 'River', 'Lesson', 'Dream', 'Ballad',
+]
+NAMES = [
+    'Ada', 'Ben', 'Carmen', 'Dev', 'Elena', 'Frank', 'Grace', 'Hector',
+    'Iris', 'Jonah', 'Kim', 'Luis', 'Maya', 'Noel', 'Olive', 'Pat',
+]
+SURNAMES = [
+    'Adler', 'Baker', 'Castro', 'Diaz', 'Evans', 'Fischer', 'Garza', 'Huang',
+    'Ibarra', 'Jensen', 'Kowalski', 'Lopez', 'Moreno', 'Nguyen', 'Ortiz',
+]
+WORDS = (
+    'the cast delivers a performance of rare warmth while the staging keeps '
+    'every scene moving toward its inevitable end and the design team builds '
+    'a world that feels both intimate and enormous at once audiences will '
+    'find much to admire in the direction even when the script falters'
+).split()
+
+
+@contextmanager
+def preserve_created_on(*models):
+    """
+    Temporarily disable auto_now_add on the models' created_on fields, so
+    generated timestamps survive bulk_create
+    """
+    fields = [model._meta.get_field('created_on') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Populate the database with a synthetic archive of companies, venues, '
+        'productions, reviews, auditions and news spanning several years, for '
+        'load and query benchmarking. Rows are bulk inserted, so search '
+        'indexes are not updated; run rebuild_index afterwards if needed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--years', type=int, default=20,
+            help='Number of years of archives to generate, ending this year.')
+        parser.add_argument('--companies', type=int, default=60)
+        parser.add_argument('--venues', type=int, default=80)
+        parser.add_argument('--reviewers', type=int, default=30)
+        parser.add_argument('--productions-per-year', type=int, default=400)
+        parser.add_argument('--reviews-per-year', type=int, default=250)
+        parser.add_argument('--auditions-per-year', type=int, default=300)
+        parser.add_argument('--news-per-year', type=int, default=600)
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Seed for the random generator, to reproduce a dataset.')
+
+    def sentence(self, min_words=6, max_words=14):
+        words = self.random.sample(
+            WORDS, self.random.randint(min_words, max_words))
+        return ' '.join(words).capitalize() + '.'
+
+    def paragraphs(self, count):
+        return '\n\n'.join(
+            ' '.join(self.sentence() for _ in range(self.random.randint(3, 7)))
+            for _ in range(count))
+
+    def title(self):
+        return 'The %s %s' % (
+            self.random.choice(ADJECTIVES), self.random.choice(NOUNS))
+
+    def random_datetime(self, day):
+        return timezone.make_aware(datetime.combine(
+            day, time(self.random.randint(8, 22), self.random.randint(0, 59))))
+
+    def create_venues(self, count):
+        venues = []
+        for n in range(count):
+            address = Address.objects.create(
+                line_1='%s %s St.' % (
+                    self.random.randint(100, 9999), self.random.choice(NOUNS)),
+                city=self.random.choice(CITIES),
+                zip_code='78%03d' % self.random.randint(600, 799),
+            )
+            name = '%s %s Theatre' % (
+                self.random.choice(SURNAMES), self.random.choice(NOUNS))
+            venues.append(Venue.objects.create(
+                name=name, address=address,
+                slug='%s-%s' % (slugify(name), n)))
+        return venues
+
+    def create_companies(self, count, venues):
+        companies = []
+        for n in range(count):
+            name = '%s %s Players' % (
+                self.random.choice(ADJECTIVES), self.random.choice(NOUNS))
+            company = ProductionCompany.objects.create(
+                name=name, slug='%s-%s' % (slugify(name), n),
+                description=self.paragraphs(1))
+            company.home_venues.set(self.random.sample(
+                venues, min(len(venues), self.random.randint(1, 3))))
+            companies.append(company)
+        return companies
+
+    def create_reviewers(self, count):
+        return [
+            Reviewer.objects.create(
+                first_name=self.random.choice(NAMES),
+                last_name=self.random.choice(SURNAMES),
+                bio=self.sentence())
+            for _ in range(count)
+        ]
+
+    def create_plays(self, count):
+        Play.objects.bulk_create([
+            Play(title=self.title(), playwright='%s %s' % (
+                self.random.choice(NAMES), self.random.choice(SURNAMES)))
+            for _ in range(count)
+        ])
+        return list(Play.objects.order_by('-pk')[:count])
+
+    def create_productions(self, year, count, plays, companies, venues):
+        productions = []
+        for _ in range(count):
+            start_date = date(year, 1, 1) + timedelta(
+                days=self.random.randint(0, 364))
+            week = [self.random.random() < 0.5 for _ in WEEK_DAYS]
+            production = Production(
+                play=self.random.choice(plays),
+                production_company=(
+                    self.random.choice(companies)
+                    if self.random.random() < 0.9 else None),
+                venue=self.random.choice(venues),
+                start_date=start_date,
+                end_date=(
+                    start_date + timedelta(days=self.random.randint(1, 42))
+                    if self.random.random() < 0.85 else None),
+                description=self.paragraphs(2),
+                schedule_mask=week_to_mask(week),
+                created_on=self.random_datetime(
+                    start_date - timedelta(days=self.random.randint(7, 90))),
+            )
+            for day, occurs in zip(WEEK_DAYS, week):
+                setattr(production, day['boolean_field'], occurs)
+            production.slug = '%s-%s' % (
+                production.get_slug()[:40], self.random.getrandbits(24))
+            productions.append(production)
+        last_pk = Production.objects.aggregate(last_pk=Max('pk'))['last_pk']
+        Production.objects.bulk_create(productions)
+
+        # bulk_create does not set primary keys on every backend, so reload
+        productions = list(Production.objects.filter(
+            pk__gt=last_pk or 0).only(
+                'pk', 'start_date', 'end_date', 'schedule_mask'))
+        ProductionOccurrence.objects.bulk_create([
+            ProductionOccurrence(production_id=production.pk, date=day)
+            for production in productions
+            for day in get_performance_dates(
+                production.start_date, production.end_date,
+                production.schedule_mask)
+        ])
+        return productions
+
+    def create_reviews(self, count, productions, reviewers):
+        reviews = []
+        external_reviews = []
+        for n, production in enumerate(self.random.sample(
+                productions, min(count, len(productions)))):
+            is_published = self.random.random() < 0.9
+            reviews.append(Review(
+                production=production,
+                reviewer=self.random.choice(reviewers),
+                content=self.paragraphs(self.random.randint(3, 8)),
+                lede=self.sentence(),
+                is_published=is_published,
+                published_on=self.random_datetime(
+                    production.start_date + timedelta(
+                        days=self.random.randint(1, 5))
+                ) if is_published else None,
+                slug='review-%s-%s' % (production.pk, n),
+            ))
+            if self.random.random() < 0.3:
+                external_reviews.append(ExternalReview(
+                    production=production,
+                    review_url='http://example.com/reviews/%s' % production.pk,
+                    source_name='%s %s' % (
+                        self.random.choice(NAMES),
+                        self.random.choice(SURNAMES)),
+                ))
+        Review.objects.bulk_create(reviews)
+        ExternalReview.objects.bulk_create(external_reviews)
+
+    def create_auditions(self, year, count, plays, companies):
+        auditions = []
+        for n in range(count):
+            start_date = date(year, 1, 1) + timedelta(
+                days=self.random.randint(0, 364))
+            auditions.append(Audition(
+                title='Auditions for %s' % self.title(),
+                production_company=self.random.choice(companies),
+                play=self.random.choice(plays),
+                start_date=start_date,
+                end_date=(
+                    start_date + timedelta(days=self.random.randint(1, 3))
+                    if self.random.random() < 0.5 else None),
+                content=self.paragraphs(2),
+                slug='auditions-%s-%s' % (year, n),
+                created_on=self.random_datetime(
+                    start_date - timedelta(days=self.random.randint(7, 30))),
+            ))
+        Audition.objects.bulk_create(auditions)
+
+    def create_news(self, year, count, productions, companies):
+        news = []
+        for n in range(count):
+            title = self.title()
+            news.append(ArtsNews(
+                title=title,
+                content=self.paragraphs(self.random.randint(1, 4)),
+                is_job_opportunity=self.random.random() < 0.1,
+                related_production=(
+                    self.random.choice(productions)
+                    if productions and self.random.random() < 0.3 else None),
+                related_company=(
+                    self.random.choice(companies)
+                    if self.random.random() < 0.3 else None),
+                created_on=self.random_datetime(
+                    date(year, 1, 1) + timedelta(
+                        days=self.random.randint(0, 364))),
+                slug='%s-%s-%s' % (slugify(title), year, n),
+            ))
+        ArtsNews.objects.bulk_create(news)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        this_year = date.today().year
+        years = range(this_year - max(1, options['years']) + 1, this_year + 1)
+
+        with transaction.atomic(), preserve_created_on(
+                Production, Audition, ArtsNews):
+            venues = self.create_venues(max(1, options['venues']))
+            companies = self.create_companies(
+                max(1, options['companies']), venues)
+            reviewers = self.create_reviewers(max(1, options['reviewers']))
+            plays = self.create_plays(max(1, options['productions_per_year']))
+
+            for year in years:
+                productions = self.create_productions(
+                    year, options['productions_per_year'],
+                    plays, companies, venues)
+                self.create_reviews(
+                    options['reviews_per_year'], productions, reviewers)
+                self.create_auditions(
+                    year, options['auditions_per_year'], plays, companies)
+                self.create_news(
+                    year, options['news_per_year'], productions, companies)
+                self.stdout.write('Generated %s' % year)
+
+        # bulk_create does not send post_save, so update the activity dates
+        # and invalidate cached fragments and pages here
+        for model in (ProductionCompany, Venue, Reviewer):
+            model.objects.update_activity()
+        for model_name in generations.GENERATION_MODELS:
+            generations.bump_generation(apps.get_model('base', model_name))
+        pagecache.clear()
+
+        self.stdout.write(self.style.SUCCESS(
+            'Generated %s years of data. Run rebuild_index to update the '
+            'search index.' % len(years)))
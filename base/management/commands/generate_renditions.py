@@ -0,0 +1,50 @@
+import multiprocessing
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from base.renditions import generate_path_renditions, get_image_paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate the missing or outdated renditions of every image used by '
+        'a production, company, review, reviewer, audition, or slideshow, in '
+        'a pool of worker processes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of processes resizing images; 1 resizes them in '
+            'this process.')
+
+    def handle(self, *args, **options):
+        paths = get_image_paths()
+        if options['workers'] > 1:
+            # workers must not share this process's database connections
+            connections.close_all()
+            pool = multiprocessing.Pool(options['workers'])
+            results = pool.imap_unordered(generate_path_renditions, paths)
+        else:
+            pool = None
+            results = (generate_path_renditions(path) for path in paths)
+
+        started = time.time()
+        generated = 0
+        try:
+            for generated_count in results:
+                generated += generated_count
+        except BaseException:
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        self.stdout.write('Generated %s renditions of %s images in %.1fs' % (
+            generated, len(paths), time.time() - started))
@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from base.indexing import process_queue
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply the search index updates recorded by QueuedSignalProcessor, '
+        'in batches, until the queue is empty.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Number of queued objects to index at a time.')
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running, checking the queue every INTERVAL seconds '
+            'once it is empty.')
+
+    def drain(self, batch_size):
+        total = 0
+        processed = process_queue(batch_size)
+        while processed:
+            total += processed
+            processed = process_queue(batch_size)
+        return total
+
+    def handle(self, *args, **options):
+        while True:
+            total = self.drain(options['batch_size'])
+            if total or options['interval'] is None:
+                self.stdout.write('Processed %s queued objects' % total)
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
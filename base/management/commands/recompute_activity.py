@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from base import pagecache
+from base.models import ProductionCompany, Reviewer, Venue
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the last production, audition and review dates used to '
+        'find active companies, venues and reviewers. Signals keep them '
+        'current on save and delete; run this nightly to correct for bulk '
+        'edits and reassigned productions, auditions or reviews.'
+    )
+
+    def handle(self, *args, **options):
+        for model in (ProductionCompany, Venue, Reviewer):
+            count = model.objects.update_activity()
+            pagecache.invalidate(model)
+            self.stdout.write('Updated %s %s' % (
+                count, model._meta.verbose_name_plural))
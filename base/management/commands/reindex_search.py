@@ -0,0 +1,140 @@
+import multiprocessing
+import os
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections as db_connections
+from haystack import connections
+from haystack.backends.whoosh_backend import WhooshSearchBackend
+
+from base import generations
+from base.indexing import prepare_documents
+
+
+def prepare_chunk(args):
+    """Prepare the documents of one chunk of objects in a worker process"""
+    label, pks, using = args
+    documents = prepare_documents(apps.get_model(label), pks, using)
+    return label, len(pks), documents
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the Whoosh search index, preparing documents in a pool of '
+        'worker processes and committing them in large batches.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'labels', nargs='*', metavar='app_label.model_name',
+            help='Only reindex these models (default: every indexed model).')
+        parser.add_argument(
+            '--using', default='default',
+            help='The search connection to rebuild.')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of processes preparing documents; 1 prepares them '
+            'in this process.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Number of objects each worker prepares at a time.')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Number of documents written between index commits.')
+        parser.add_argument(
+            '--no-clear', action='store_false', dest='clear',
+            help='Update documents in place instead of clearing them first.')
+
+    def get_models(self, labels, using):
+        indexed_models = connections[using].get_unified_index() \
+            .get_indexed_models()
+        if not labels:
+            return sorted(indexed_models, key=lambda m: m._meta.label_lower)
+        models = []
+        for label in labels:
+            try:
+                model = apps.get_model(label)
+            except (LookupError, ValueError):
+                raise CommandError('Unknown model: %s' % label)
+            if model not in indexed_models:
+                raise CommandError('%s is not indexed' % label)
+            models.append(model)
+        return models
+
+    def get_chunks(self, models, chunk_size, using):
+        """Return (label, pks, using) tuples covering every indexed object"""
+        unified_index = connections[using].get_unified_index()
+        chunks = []
+        for model in models:
+            pks = list(
+                unified_index.get_index(model).index_queryset(using=using)
+                .order_by('pk').values_list('pk', flat=True))
+            chunks.extend(
+                (model._meta.label_lower, pks[start:start + chunk_size], using)
+                for start in range(0, len(pks), chunk_size)
+            )
+        return chunks
+
+    def handle(self, *args, **options):
+        using = options['using']
+        backend = connections[using].get_backend()
+        if not isinstance(backend, WhooshSearchBackend):
+            raise CommandError('reindex_search only supports Whoosh indexes')
+
+        models = self.get_models(options['labels'], using)
+        chunks = self.get_chunks(models, options['chunk_size'], using)
+        total_objects = sum(len(pks) for _, pks, _ in chunks)
+
+        if options['clear']:
+            # recreating the whole index is much faster than deleting by query
+            all_models = set(models) == set(
+                connections[using].get_unified_index().get_indexed_models())
+            backend.clear(models=None if all_models else models)
+        if not backend.setup_complete:
+            backend.setup()
+        # once cleared, documents can be added without looking up old copies
+        write = 'add_document' if options['clear'] else 'update_document'
+
+        if options['workers'] > 1:
+            # workers must open their own database connections
+            db_connections.close_all()
+            pool = multiprocessing.Pool(options['workers'])
+            results = pool.imap_unordered(prepare_chunk, chunks)
+        else:
+            pool = None
+            results = (prepare_chunk(chunk) for chunk in chunks)
+
+        started = time.time()
+        processed = indexed = uncommitted = 0
+        writer = backend.index.refresh().writer()
+        try:
+            for label, count, documents in results:
+                for document in documents:
+                    getattr(writer, write)(**document)
+                processed += count
+                indexed += len(documents)
+                uncommitted += len(documents)
+                if uncommitted >= options['batch_size']:
+                    writer.commit()
+                    writer = backend.index.refresh().writer()
+                    uncommitted = 0
+                elapsed = time.time() - started
+                self.stdout.write('%s/%s objects (%.0f/s)' % (
+                    processed, total_objects,
+                    processed / elapsed if elapsed else 0))
+            writer.commit()
+            generations.bump_search_index_generation()
+        except BaseException:
+            writer.cancel()
+            if pool is not None:
+                pool.terminate()
+            raise
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        elapsed = time.time() - started
+        self.stdout.write('Indexed %s documents from %s objects in %.1fs' % (
+            indexed, total_objects, elapsed))
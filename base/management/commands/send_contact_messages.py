@@ -0,0 +1,41 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from base.outbox import send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        'Email the queued contact form submissions over a single mail server '
+        'connection, retrying those that fail.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Number of messages sent over each connection.')
+        parser.add_argument(
+            '--max-attempts', type=int, default=5,
+            help='Number of times a message is tried before giving up.')
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Keep running, checking the outbox every INTERVAL seconds '
+            'once it is empty.')
+
+    def drain(self, batch_size, max_attempts):
+        total = 0
+        sent = send_pending(batch_size, max_attempts)
+        while sent:
+            total += sent
+            sent = send_pending(batch_size, max_attempts)
+        return total
+
+    def handle(self, *args, **options):
+        while True:
+            total = self.drain(options['batch_size'], options['max_attempts'])
+            if total or options['interval'] is None:
+                self.stdout.write('Sent %s contact messages' % total)
+            if options['interval'] is None:
+                break
+            time.sleep(options['interval'])
@@ -1,9 +1,128 @@
+import time
+from contextlib import ExitStack
+
 import pytz
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import Resolver404, resolve
 from django.utils import deprecation, timezone
 
+from base import pagecache, profiling
+from base.urls import urlpatterns as base_urlpatterns
+
 
 class TexasTimezoneMiddleware(deprecation.MiddlewareMixin):
-    """Middleware to activate US/Central timezone, unless otherwise specified"""
+    """Middleware to activate US/Central timezone, unless otherwise set"""
     def process_request(self, request):
         tzname = request.session.get('timezone', 'US/Central')
         timezone.activate(pytz.timezone(tzname))
+
+
+class PageCacheMiddleware(deprecation.MiddlewareMixin):
+    """
+    Middleware to cache the full responses to anonymous GET requests for the
+    pages of base.urls, keyed on the URL, the active timezone and the date.
+    Each page is tagged with the objects and models it read while rendering
+    (see base.pagecache), and expires when any of them is saved or deleted.
+
+    Enabled by the PAGE_CACHE_ENABLED setting. Place it after
+    TexasTimezoneMiddleware, which activates the timezone pages are keyed on.
+    """
+    def __init__(self, get_response=None):
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', False):
+            raise MiddlewareNotUsed
+        super(PageCacheMiddleware, self).__init__(get_response)
+        self.url_names = set(
+            pattern.name for pattern in base_urlpatterns
+        ) - pagecache.UNCACHED_URL_NAMES
+
+    def is_cacheable(self, request):
+        if request.method not in ('GET', 'HEAD') or \
+                request.user.is_authenticated:
+            return False
+        try:
+            match = resolve(
+                request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return False
+        return match.url_name in self.url_names
+
+    def __call__(self, request):
+        if not self.is_cacheable(request):
+            return self.get_response(request)
+
+        key = pagecache.get_page_key(request)
+        response = pagecache.get_page(key)
+        if response is not None:
+            return response
+        with pagecache.recording() as tags:
+            response = self.get_response(request)
+        if pagecache.is_cacheable_response(request, response):
+            pagecache.set_page(key, response, tags)
+        return response
+
+
+class ProfilingMiddleware(deprecation.MiddlewareMixin):
+    """
+    Middleware to record each request's query count, database time, view time
+    and template render time. Results are sent as Server-Timing headers and
+    stored in a ring buffer in each process, which the dump_request_profiles
+    command reads by signalling the process.
+
+    Enabled by the PROFILING_ENABLED setting. Place it last in MIDDLEWARE, so
+    its process_response runs as soon as the template has rendered.
+    """
+    def __init__(self, get_response=None):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        super(ProfilingMiddleware, self).__init__(get_response)
+        profiling.install_dump_handler()
+
+    def _time_query(self, profile, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile['db_ms'] += (time.perf_counter() - start) * 1000
+            profile['queries'] += 1
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.profile_marks['view'] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        request.profile_marks['render'] = time.perf_counter()
+        return response
+
+    def process_response(self, request, response):
+        request.profile_marks['response'] = time.perf_counter()
+        return response
+
+    def __call__(self, request):
+        profile = {'queries': 0, 'db_ms': 0.0}
+        request.profile_marks = {}
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(
+                    lambda *args: self._time_query(profile, *args)))
+            response = super(ProfilingMiddleware, self).__call__(request)
+
+        marks = request.profile_marks
+        view_start = marks.get('view', start)
+        response_start = marks.get('response', time.perf_counter())
+        render_start = marks.get('render', response_start)
+        resolver_match = getattr(request, 'resolver_match', None)
+        profile.update({
+            'timestamp': timezone.now().isoformat(),
+            'method': request.method,
+            'path': request.path,
+            'url_name': resolver_match.url_name if resolver_match else None,
+            'status': response.status_code,
+            'view_ms': (render_start - view_start) * 1000,
+            'render_ms': (response_start - render_start) * 1000,
+            'total_ms': (time.perf_counter() - start) * 1000,
+        })
+        response['Server-Timing'] = profiling.format_server_timing(profile)
+        profiling.record_profile(profile)
+        return response
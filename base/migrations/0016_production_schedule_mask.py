@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+# Frozen copies of the day fields and base.models.week_to_mask, so this
+# migration keeps its meaning if they change
+DAY_FIELDS = (
+    'on_monday', 'on_tuesday', 'on_wednesday', 'on_thursday', 'on_friday',
+    'on_saturday', 'on_sunday',
+)
+
+
+def week_to_mask(week):
+    """Return a 7-bit integer with bit n set if the event occurs on day n"""
+    mask = 0
+    for day_idx, occurs in enumerate(week):
+        if occurs:
+            mask |= 1 << day_idx
+    return mask
+
+
+def populate_schedule_mask(apps, schema_editor):
+    Production = apps.get_model('base', 'Production')
+    for production in Production.objects.all():
+        production.schedule_mask = week_to_mask(
+            getattr(production, field) for field in DAY_FIELDS)
+        production.save(update_fields=['schedule_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0015_auto_20150328_1834'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='production',
+            name='schedule_mask',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Mirrors the on_* fields; bit n is set if the event occurs on day n of the week (Monday is 0).'),
+            preserve_default=True,
+        ),
+        migrations.RunPython(
+            populate_schedule_mask, migrations.RunPython.noop),
+    ]
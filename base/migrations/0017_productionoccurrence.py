@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from datetime import timedelta
+
+from django.db import models, migrations
+import django.db.models.deletion
+
+
+# Frozen copy of base.models.get_performance_dates, so this migration keeps
+# its meaning if it changes
+def get_performance_dates(start_date, end_date, schedule_mask):
+    """
+    Return the dates in range [start_date, end_date] on which an event with
+    the given schedule mask occurs. If no days are marked, the event is
+    assumed to occur on every day of its range.
+    """
+    end_date = end_date or start_date
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        if not schedule_mask or schedule_mask & (1 << current_date.weekday()):
+            dates.append(current_date)
+        current_date += timedelta(days=1)
+    return dates
+
+
+def populate_occurrences(apps, schema_editor):
+    Production = apps.get_model('base', 'Production')
+    ProductionOccurrence = apps.get_model('base', 'ProductionOccurrence')
+    for production in Production.objects.all():
+        ProductionOccurrence.objects.bulk_create([
+            ProductionOccurrence(production=production, date=performance_date)
+            for performance_date in get_performance_dates(
+                production.start_date, production.end_date,
+                production.schedule_mask)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0016_production_schedule_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductionOccurrence',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('date', models.DateField(db_index=True)),
+                ('production', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='base.Production')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='productionoccurrence',
+            unique_together=set([('production', 'date')]),
+        ),
+        migrations.RunPython(
+            populate_occurrences, migrations.RunPython.noop),
+    ]
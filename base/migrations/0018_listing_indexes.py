@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0017_productionoccurrence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_published', '-published_on'], name='review_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audition',
+            index=models.Index(fields=['end_date', 'start_date'], name='audition_end_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='production',
+            index=models.Index(fields=['start_date', 'end_date'], name='production_start_end_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='production',
+            index=models.Index(fields=['end_date', 'start_date'], name='production_end_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='artsnews',
+            index=models.Index(fields=['-created_on'], name='artsnews_created_idx'),
+        ),
+    ]
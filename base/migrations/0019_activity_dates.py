@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+
+
+# Frozen copy of base.models.latest_value, so this migration keeps its
+# meaning if it changes
+def latest_value(queryset, field_name):
+    """
+    Return a subquery selecting the greatest value of field_name in queryset,
+    which should be filtered against an OuterRef
+    """
+    return models.Subquery(
+        queryset.filter(**{'%s__isnull' % field_name: False}).order_by(
+            '-%s' % field_name).values(field_name)[:1]
+    )
+
+
+def populate_activity(apps, schema_editor):
+    ProductionCompany = apps.get_model('base', 'ProductionCompany')
+    Venue = apps.get_model('base', 'Venue')
+    Reviewer = apps.get_model('base', 'Reviewer')
+    Production = apps.get_model('base', 'Production')
+    Audition = apps.get_model('base', 'Audition')
+    Review = apps.get_model('base', 'Review')
+
+    ProductionCompany.objects.update(
+        last_production_date=latest_value(
+            Production.objects.filter(
+                production_company=models.OuterRef('pk')),
+            'start_date'),
+        last_audition_date=latest_value(
+            Audition.objects.filter(production_company=models.OuterRef('pk')),
+            'start_date'),
+    )
+    Venue.objects.update(last_production_date=latest_value(
+        Production.objects.filter(venue=models.OuterRef('pk')), 'start_date'))
+    Reviewer.objects.update(last_review_on=latest_value(
+        Review.objects.filter(reviewer=models.OuterRef('pk')), 'published_on'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0018_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productioncompany',
+            name='last_production_date',
+            field=models.DateField(help_text='Start date of the most recent production, maintained by signals and the recompute_activity command.', null=True, editable=False, blank=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='productioncompany',
+            name='last_audition_date',
+            field=models.DateField(help_text='Start date of the most recent audition, maintained by signals and the recompute_activity command.', null=True, editable=False, blank=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='last_production_date',
+            field=models.DateField(help_text='Start date of the most recent production, maintained by signals and the recompute_activity command.', null=True, editable=False, blank=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='reviewer',
+            name='last_review_on',
+            field=models.DateTimeField(help_text='Publication time of the most recent review, maintained by signals and the recompute_activity command.', null=True, editable=False, blank=True, db_index=True),
+        ),
+        migrations.RunPython(populate_activity, migrations.RunPython.noop),
+    ]
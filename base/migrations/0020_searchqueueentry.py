@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0019_activity_dates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchQueueEntry',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_pk', models.PositiveIntegerField()),
+                ('action', models.CharField(max_length=6, choices=[('update', 'Update'), ('delete', 'Delete')])),
+                ('queued_on', models.DateTimeField(default=django.utils.timezone.now, db_index=True)),
+            ],
+            options={
+                'ordering': ['queued_on'],
+                'verbose_name_plural': 'search queue entries',
+            },
+            bases=(models.Model,),
+        ),
+        migrations.AlterUniqueTogether(
+            name='searchqueueentry',
+            unique_together=set([('model_label', 'object_pk')]),
+        ),
+    ]
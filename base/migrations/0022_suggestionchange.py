@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import models, migrations
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('base', '0021_contactmessage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SuggestionChange',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_pk', models.PositiveIntegerField()),
+                ('changed_on', models.DateTimeField(default=django.utils.timezone.now, db_index=True)),
+            ],
+            options={
+                'ordering': ['changed_on'],
+            },
+            bases=(models.Model,),
+        ),
+    ]
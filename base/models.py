@@ -1,15 +1,20 @@
+import uuid
+from collections import OrderedDict
 from datetime import timedelta
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.db import models
 from django.db.models import Q
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.deconstruct import deconstructible
 from django.utils.text import slugify
 from filebrowser.fields import FileBrowseField
 
 __all__ = (
     'Review', 'Audition', 'ProductionCompany', 'Production', 'Play',
     'Venue', 'Address', 'ArtsNews', 'Reviewer', 'ExternalReview',
-    'NewsSlideshowImage', 'ProductionPoster'
+    'NewsSlideshowImage', 'ProductionPoster', 'ProductionOccurrence'
 )
 
 
@@ -53,6 +58,11 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-published_on']
+        indexes = [
+            models.Index(
+                fields=['is_published', '-published_on'],
+                name='review_published_idx'),
+        ]
 
     def get_title(self):
         title = self.title if self.title else u'Review: %s' % self.production
@@ -93,6 +103,150 @@ class Review(models.Model):
         return self.get_title()
 
 
+WEEK_DAYS = (
+    {'abbrev': 'M', 'name': 'Monday', 'boolean_field': 'on_monday'},
+    {'abbrev': 'T', 'name': 'Tuesday', 'boolean_field': 'on_tuesday'},
+    {'abbrev': 'W', 'name': 'Wednesday', 'boolean_field': 'on_wednesday'},
+    {'abbrev': 'Th', 'name': 'Thursday', 'boolean_field': 'on_thursday'},
+    {'abbrev': 'F', 'name': 'Friday', 'boolean_field': 'on_friday'},
+    {'abbrev': 'Sat', 'name': 'Saturday', 'boolean_field': 'on_saturday'},
+    {'abbrev': 'Sun', 'name': 'Sunday', 'boolean_field': 'on_sunday'},
+)
+
+
+def week_to_mask(week):
+    """Return a 7-bit integer with bit n set if the event occurs on day n"""
+    mask = 0
+    for day_idx, occurs in enumerate(week):
+        if occurs:
+            mask |= 1 << day_idx
+    return mask
+
+
+def mask_to_week(mask):
+    """Return a list of booleans, indicating which days mask includes"""
+    return [bool(mask & (1 << day_idx)) for day_idx in range(len(WEEK_DAYS))]
+
+
+def get_last_sequential_day_index(
+        week, start_on=0, wrap=True, stop_before=len(WEEK_DAYS)
+):
+    """
+    Returns index of the final day in a sequence when the event occurs
+
+    week:       list of booleans, indicating which days the event occurs
+    start_on:   index of the day of the week to start the sequence
+    wrap:       boolean indicating if earlier days can be considered
+    stop_before:index of the day that must end the sequence
+    """
+    # check days following start_on until we find one during which the event
+    # doesn't occur, or we reach the end of the allowable sequence
+    end_on = None
+    for offset, occurs in enumerate(week[start_on:stop_before]):
+        if not occurs:
+            break
+        end_on = start_on + offset
+
+    # if wrapping, find the final day of a sequence that starts on monday,
+    # and ends on start_on (at the latest)
+    if wrap and start_on > 0 and end_on == len(WEEK_DAYS)-1:
+        end_on_next_week = get_last_sequential_day_index(
+            week, wrap=False, stop_before=start_on)
+        end_on = (
+            end_on_next_week
+            if end_on_next_week is not None
+            else end_on
+        )
+
+    return end_on
+
+
+def describe_week(week, description_key='abbrev', pluralize=False):
+    """Return a string describing the days marked in a list of booleans"""
+    if all(week):
+        return u'All week'
+
+    # get all days & sequences when event occurs. Start from first day when
+    # the even doesn't occur when week-wrapping sequences are needed
+    start_on = week.index(False) if week[-1] else 0
+    description = ''
+    described = []
+    for day_idx in range(start_on, len(WEEK_DAYS)):
+        # check if day has already been described as part of a sequence, or
+        # ignore day if event doesn't occur
+        if day_idx in described or not week[day_idx]:
+            continue
+
+        # try to retrieve end of sequence, create appropriate description
+        sequence_end = get_last_sequential_day_index(week, start_on=day_idx)
+        if sequence_end == day_idx:
+            description += '{0}{1}, '.format(
+                WEEK_DAYS[day_idx][description_key],
+                's' if pluralize else '')
+            described.append(day_idx)
+        else:
+            sequence_description = '{day1}{plural}-{day2}{plural}, '.format(
+                day1=WEEK_DAYS[day_idx][description_key],
+                day2=WEEK_DAYS[sequence_end][description_key],
+                plural='s' if pluralize else '')
+            description += sequence_description
+            if day_idx < sequence_end:
+                described += range(day_idx, sequence_end+1)
+            else:
+                described += range(day_idx, len(WEEK_DAYS))
+                described += (
+                    range(0, sequence_end)
+                    if sequence_end > 0 else [0]
+                )
+
+    return description.rstrip(', ')
+
+
+def get_performance_dates(start_date, end_date, schedule_mask):
+    """
+    Return the dates in range [start_date, end_date] on which an event with
+    the given schedule mask occurs. If no days are marked, the event is
+    assumed to occur on every day of its range.
+    """
+    end_date = end_date or start_date
+    dates = []
+    current_date = start_date
+    while current_date <= end_date:
+        if not schedule_mask or schedule_mask & (1 << current_date.weekday()):
+            dates.append(current_date)
+        current_date += timedelta(days=1)
+    return dates
+
+
+# descriptions of every possible weekly schedule, indexed by schedule mask
+WEEK_DESCRIPTIONS = tuple(
+    {
+        'abbrev': describe_week(mask_to_week(mask)),
+        'name': describe_week(mask_to_week(mask), 'name'),
+        'name_plural': describe_week(mask_to_week(mask), 'name', True),
+    }
+    for mask in range(2 ** len(WEEK_DAYS))
+)
+
+
+# Fields of DaysBase that schedule_mask mirrors
+DAY_FIELDS = frozenset(day['boolean_field'] for day in WEEK_DAYS)
+
+
+class DaysBaseQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        """
+        Update the matched objects, refusing changes to the day fields:
+        schedule_mask, and any data derived from it, is only recomputed
+        when each object is saved
+        """
+        if DAY_FIELDS.intersection(kwargs):
+            raise ValueError(
+                'Day fields cannot be updated in bulk; save each object so '
+                'its schedule_mask is recomputed.')
+        return super(DaysBaseQuerySet, self).update(**kwargs)
+
+
 class DaysBase(models.Model):
     """Abstract base class to handle event object that occurs on certain days"""
     start_date = models.DateField(verbose_name='Date of first event.')
@@ -114,16 +268,12 @@ class DaysBase(models.Model):
         default=False, verbose_name='Occurs on Saturday')
     on_sunday = models.BooleanField(
         default=False, verbose_name='Occurs on Sunday')
+    schedule_mask = models.PositiveSmallIntegerField(
+        default=0, editable=False,
+        help_text='Mirrors the on_* fields; bit n is set if the event occurs '
+        'on day n of the week (Monday is 0).')
 
-    days = (
-        {'abbrev': 'M', 'name': 'Monday', 'boolean_field': 'on_monday'},
-        {'abbrev': 'T', 'name': 'Tuesday', 'boolean_field': 'on_tuesday'},
-        {'abbrev': 'W', 'name': 'Wednesday', 'boolean_field': 'on_wednesday'},
-        {'abbrev': 'Th', 'name': 'Thursday', 'boolean_field': 'on_thursday'},
-        {'abbrev': 'F', 'name': 'Friday', 'boolean_field': 'on_friday'},
-        {'abbrev': 'Sat', 'name': 'Saturday', 'boolean_field': 'on_saturday'},
-        {'abbrev': 'Sun', 'name': 'Sunday', 'boolean_field': 'on_sunday'},
-    )
+    days = WEEK_DAYS
 
     class Meta:
         abstract = True
@@ -138,26 +288,8 @@ class DaysBase(models.Model):
         wrap:       boolean indicating if earlier days can be considered
         stop_before:index of the day that must end the sequence
         """
-        # check days following start_on until we find one during which the event
-        # doesn't occur, or we reach the end of the allowable sequence
-        end_on = None
-        for offset, day_tuple in enumerate(self.days[start_on:stop_before]):
-            if not getattr(self, day_tuple['boolean_field'], False):
-                break
-            end_on = start_on + offset
-
-        # if wrapping, find the final day of a sequence that starts on monday,
-        # and ends on start_on (at the latest)
-        if wrap and start_on > 0 and end_on == len(self.days)-1:
-            end_on_next_week = self.get_last_sequential_day_index(
-                wrap=False, stop_before=start_on)
-            end_on = (
-                end_on_next_week
-                if end_on_next_week is not None
-                else end_on
-            )
-
-        return end_on
+        return get_last_sequential_day_index(
+            self._week_booleans(), start_on, wrap, stop_before)
 
     def _week_booleans(self):
         """Return a list of booleans, indicating which days the event occurs"""
@@ -166,6 +298,10 @@ class DaysBase(models.Model):
             week.append(getattr(self, day['boolean_field'], False))
         return week
 
+    def get_schedule_mask(self):
+        """Return the 7-bit schedule mask matching the on_* fields"""
+        return week_to_mask(self._week_booleans())
+
     def has_weekly_schedule(self):
         """Return boolean indicate if any day-specific field has been marked"""
         return any(self._week_booleans())
@@ -177,51 +313,17 @@ class DaysBase(models.Model):
         """Return a string describing when the event occurs"""
         description_key = 'name' if verbose else 'abbrev'
         if verbose and self.end_date:
-            pluralize = self.end_date - self.start_date > timedelta(days=7)
-        else:
-            pluralize = False
-        week = self._week_booleans()
-        if all(week):
-            return u'All week'
-
-        # get all days & sequences when event occurs. Start from first day when
-        # the even doesn't occur when week-wrapping sequences are needed
-        start_on = week.index(False) if self.on_sunday else 0
-        description = ''
-        described = []
-        for day_idx in range(start_on, len(self.days)):
-            # check if day has already been described as part of a sequence
-            if day_idx in described:
-                continue
-
-            # ignore day if event doesn't occur
-            day_tuple = self.days[day_idx]
-            if not getattr(self, day_tuple['boolean_field'], False):
-                continue
-
-            # try to retrieve end of sequence, create appropriate description
-            sequence_end = self.get_last_sequential_day_index(start_on=day_idx)
-            if sequence_end == day_idx:
-                description += '{0}{1}, '.format(
-                    self.days[day_idx][description_key],
-                    's' if pluralize else '')
-                described.append(day_idx)
-            else:
-                sequence_description = '{day1}{plural}-{day2}{plural}, '.format(
-                    day1=self.days[day_idx][description_key],
-                    day2=self.days[sequence_end][description_key],
-                    plural='s' if pluralize else '')
-                description += sequence_description
-                if day_idx < sequence_end:
-                    described += range(day_idx, sequence_end+1)
-                else:
-                    described += range(day_idx, len(self.days))
-                    described += (
-                        range(0, sequence_end)
-                        if sequence_end > 0 else [0]
-                    )
-
-        return description.rstrip(', ')
+            if self.end_date - self.start_date > timedelta(days=7):
+                description_key = 'name_plural'
+        return WEEK_DESCRIPTIONS[self.get_schedule_mask()][description_key]
+
+    def save(self, *args, **kwargs):
+        self.schedule_mask = self.get_schedule_mask()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and \
+                DAY_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'schedule_mask'}
+        return super(DaysBase, self).save(*args, **kwargs)
 
 
 class AuditionManager(models.Manager):
@@ -234,6 +336,14 @@ class AuditionManager(models.Manager):
         ).order_by('start_date')
         return upcoming
 
+    def filter_past(self):
+        """Return auditions that have ended, most recent first"""
+        today = timezone.now()
+        return self.filter(
+            Q(end_date__isnull=False, end_date__lt=today)
+            | Q(end_date__isnull=True, start_date__lt=today)
+        ).order_by('-start_date')
+
 
 class Audition(models.Model):
     """Represents a casting call"""
@@ -280,6 +390,12 @@ class Audition(models.Model):
 
     objects = AuditionManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['end_date', 'start_date'], name='audition_end_start_idx'),
+        ]
+
     def get_title(self):
         """
         Assemble and return a string identifying this audition if a custom
@@ -350,13 +466,41 @@ class Audition(models.Model):
         return self.get_title()
 
 
+def latest_value(queryset, field_name):
+    """
+    Return a subquery selecting the greatest value of field_name in queryset,
+    which should be filtered against an OuterRef
+    """
+    return models.Subquery(
+        queryset.filter(**{'%s__isnull' % field_name: False}).order_by(
+            '-%s' % field_name).values(field_name)[:1]
+    )
+
+
 class ProductionCompanyManager(models.Manager):
     def filter_active(self):
         """Return ProductionCompany objects that been active in the past year"""
         one_year_ago = timezone.now() - timedelta(days=365)
         return ProductionCompany.objects.filter(
-            Q(production__start_date__gte=one_year_ago) |
-            Q(audition__start_date__gte=one_year_ago)).distinct()
+            Q(last_production_date__gte=one_year_ago) |
+            Q(last_audition_date__gte=one_year_ago))
+
+    def update_activity(self, pks=None):
+        """
+        Recompute the last production and audition dates of the companies
+        with the given primary keys, or of every company if none are given
+        """
+        companies = self.all() if pks is None else self.filter(pk__in=pks)
+        return companies.update(
+            last_production_date=latest_value(
+                Production.objects.filter(
+                    production_company=models.OuterRef('pk')),
+                'start_date'),
+            last_audition_date=latest_value(
+                Audition.objects.filter(
+                    production_company=models.OuterRef('pk')),
+                'start_date'),
+        )
 
 
 class ProductionCompany(models.Model):
@@ -387,6 +531,15 @@ class ProductionCompany(models.Model):
         help_text='This field will be used in the URL for '
         "this company's detail page.")
 
+    last_production_date = models.DateField(
+        null=True, blank=True, editable=False, db_index=True,
+        help_text='Start date of the most recent production, maintained by '
+        'signals and the recompute_activity command.')
+    last_audition_date = models.DateField(
+        null=True, blank=True, editable=False, db_index=True,
+        help_text='Start date of the most recent audition, maintained by '
+        'signals and the recompute_activity command.')
+
     objects = ProductionCompanyManager()
 
     class Meta:
@@ -417,7 +570,33 @@ class ProductionCompany(models.Model):
         return self.name
 
 
-class ProductionManager(models.Manager):
+class ProductionManager(models.Manager.from_queryset(DaysBaseQuerySet)):
+    def with_tile_data(self, productions=None):
+        """
+        Return Productions with the related objects and review flags used by
+        production tiles, so rendering a tile requires no further queries
+
+        productions - an optional Production queryset, such as one returned
+        by filter_current(); defaults to all productions
+        """
+        if productions is None:
+            productions = self.all()
+        reviews = Review.objects.filter(production=models.OuterRef('pk'))
+        external_reviews = ExternalReview.objects.filter(
+            production=models.OuterRef('pk'))
+        return productions.select_related(
+            'play', 'production_company', 'venue__address'
+        ).annotate(
+            has_reviews=models.Exists(reviews),
+            has_external_reviews=models.Exists(external_reviews),
+        ).prefetch_related(
+            models.Prefetch(
+                'review_set',
+                queryset=Review.objects.filter(is_published=True),
+                to_attr='prefetched_published_reviews'),
+            'externalreview_set',
+        )
+
     def filter_in_range(self, start_date, end_date):
         """Return Productions occurring in range [start_date, end_date]"""
         return self.filter(
@@ -425,6 +604,31 @@ class ProductionManager(models.Manager):
             Q(start_date__lte=start_date, end_date__isnull=False,
                 end_date__gte=start_date))
 
+    def filter_performing(self, start_date, end_date=None):
+        """
+        Return Productions with a performance in range [start_date, end_date],
+        or on start_date if no end_date is given
+        """
+        return self.filter(
+            productionoccurrence__date__gte=start_date,
+            productionoccurrence__date__lte=end_date or start_date,
+        ).distinct()
+
+    def filter_tonight(self):
+        """Return Productions with a performance today"""
+        return self.filter_performing(timezone.localdate())
+
+    def filter_weekdays(self, *day_indexes):
+        """
+        Return Productions scheduled on any of the given days of the week,
+        where Monday is 0 and Sunday is 6
+        """
+        mask = week_to_mask(
+            day_idx in day_indexes for day_idx in range(len(WEEK_DAYS)))
+        return self.annotate(
+            scheduled_days=models.F('schedule_mask').bitand(mask)
+        ).filter(scheduled_days__gt=0)
+
     def filter_current(self):
         """Return Productions that are occuring today """
         today = timezone.now()
@@ -469,6 +673,16 @@ class Production(DaysBase):
 
     objects = ProductionManager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['start_date', 'end_date'],
+                name='production_start_end_idx'),
+            models.Index(
+                fields=['end_date', 'start_date'],
+                name='production_end_start_idx'),
+        ]
+
     @property
     def title(self):
         title = self.play.title
@@ -509,8 +723,34 @@ class Production(DaysBase):
 
     def published_reviews(self):
         """Return this production's published reviews"""
+        if hasattr(self, 'prefetched_published_reviews'):
+            return self.prefetched_published_reviews
         return self.review_set.filter(is_published=True)
 
+    def get_performance_dates(self):
+        """Return the dates on which this Production is performed"""
+        start_date = self._meta.get_field('start_date').to_python(
+            self.start_date)
+        end_date = self._meta.get_field('end_date').to_python(self.end_date)
+        return get_performance_dates(
+            start_date, end_date, self.get_schedule_mask())
+
+    def rebuild_occurrences(self):
+        """
+        Update this Production's occurrences to match its performance dates,
+        deleting and creating only the rows that changed
+        """
+        dates = set(self.get_performance_dates())
+        existing = set(
+            self.productionoccurrence_set.values_list('date', flat=True))
+        if existing - dates:
+            self.productionoccurrence_set.filter(
+                date__in=existing - dates).delete()
+        ProductionOccurrence.objects.bulk_create([
+            ProductionOccurrence(production=self, date=performance_date)
+            for performance_date in sorted(dates - existing)
+        ])
+
     def get_slug(self):
         """Return a unique slug for this Production"""
         slug = u'{start_date}-{title}'.format(
@@ -526,6 +766,19 @@ class Production(DaysBase):
         return self.title
 
 
+class ProductionOccurrence(models.Model):
+    """A single date on which a production is performed"""
+    production = models.ForeignKey(Production, on_delete=models.CASCADE)
+    date = models.DateField(db_index=True)
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ('production', 'date')
+
+    def __str__(self):
+        return u'%s on %s' % (self.production, self.date.strftime('%m/%d/%y'))
+
+
 class Play(models.Model):
     """Represents the script of play"""
     title = models.CharField(max_length=150)
@@ -540,21 +793,46 @@ class Play(models.Model):
 
 
 class VenueManager(models.Manager):
+    def get_directory(self, venues=None):
+        """
+        Return a list of (city, venues) tuples sorted by city. The venues are
+        fetched with their address, home companies and a has_productions flag
+        in two queries, then grouped in memory.
+
+        venues - an optional Venue queryset to group; defaults to all venues
+        """
+        if venues is None:
+            venues = self.all()
+        productions = Production.objects.filter(venue=models.OuterRef('pk'))
+        venues = venues.select_related('address').annotate(
+            has_productions=models.Exists(productions)
+        ).prefetch_related(
+            'productioncompany_set'
+        ).order_by('address__city', 'name')
+
+        city_venues = OrderedDict()
+        for venue in venues:
+            city_venues.setdefault(venue.address.city, []).append(venue)
+        return list(city_venues.items())
+
     def filter_cities(self):
         """Return a dictionary that categorizes venues by city"""
-        cities = self.order_by('address__city').values_list(
-            'address__city', flat=True).distinct()
-
-        city_venues = {}
-        for city in cities:
-            city_venues[city] = self.filter(address__city=city)
-        return city_venues
+        return OrderedDict(self.get_directory())
 
     def filter_active(self):
         """Return Venue objects that been active in the past year"""
         one_year_ago = timezone.now() - timedelta(days=365)
-        return Venue.objects.filter(
-            production__start_date__gte=one_year_ago).distinct()
+        return Venue.objects.filter(last_production_date__gte=one_year_ago)
+
+    def update_activity(self, pks=None):
+        """
+        Recompute the last production date of the venues with the given
+        primary keys, or of every venue if none are given
+        """
+        venues = self.all() if pks is None else self.filter(pk__in=pks)
+        return venues.update(last_production_date=latest_value(
+            Production.objects.filter(venue=models.OuterRef('pk')),
+            'start_date'))
 
 
 class Venue(models.Model):
@@ -565,6 +843,10 @@ class Venue(models.Model):
     slug = models.SlugField(
         help_text='This field will be used in the URL for '
         "this venue's detail page.")
+    last_production_date = models.DateField(
+        null=True, blank=True, editable=False, db_index=True,
+        help_text='Start date of the most recent production, maintained by '
+        'signals and the recompute_activity command.')
 
     objects = VenueManager()
 
@@ -595,17 +877,11 @@ class Address(models.Model):
 
 class ArtsNewsManager(models.Manager):
     def filter_media(self):
-        """Return a list of all news items with feature media"""
-        video_news = self.filter(video_embed__isnull=False).exclude(
-            video_embed='')
-        slideshow_news = self.filter(newsslideshowimage__isnull=False)
-
-        # merge querysets into a list, ordered by created_on field
-        media_news = sorted(
-            list(video_news) + list(slideshow_news),
-            key=lambda news: news.created_on,
-            reverse=True)
-        return media_news
+        """Return news items with feature media, newest first"""
+        return self.filter(
+            Q(video_embed__isnull=False, video_embed__gt='') |
+            Q(newsslideshowimage__isnull=False)
+        ).distinct().order_by('-created_on')
 
 
 class ArtsNews(models.Model):
@@ -660,6 +936,9 @@ class ArtsNews(models.Model):
     class Meta:
         ordering = ['-created_on']
         verbose_name_plural = 'arts news items'
+        indexes = [
+            models.Index(fields=['-created_on'], name='artsnews_created_idx'),
+        ]
 
     def has_media(self):
         """Check if this news item has a video or images to be featured"""
@@ -697,14 +976,38 @@ class ReviewerManager(models.Manager):
     def filter_active(self):
         """Return Reviewers who have published reviews recently"""
         six_months_ago = timezone.now() - timedelta(days=6*365/12)
-        recent_reviewers = Reviewer.objects.filter(
-            review__published_on__gte=six_months_ago)
-        return recent_reviewers.distinct()
+        return Reviewer.objects.filter(last_review_on__gte=six_months_ago)
 
     def filter_inactive(self):
         """Return Reviewers who have not published reviews recently"""
-        recent_reviewer_ids = self.filter_active().values_list('id', flat=True)
-        return self.exclude(id__in=recent_reviewer_ids).order_by('last_name')
+        six_months_ago = timezone.now() - timedelta(days=6*365/12)
+        return self.exclude(
+            last_review_on__gte=six_months_ago).order_by('last_name')
+
+    def annotate_review_counts(self, reviewers=None):
+        """
+        Annotate the given Reviewers, or every Reviewer if none are given,
+        with their total and published review counts and the publication time
+        of their latest published review
+        """
+        reviewers = self.all() if reviewers is None else reviewers
+        published = Q(review__is_published=True)
+        return reviewers.annotate(
+            total_review_count=models.Count('review'),
+            published_review_count=models.Count('review', filter=published),
+            last_published_on=models.Max(
+                'review__published_on', filter=published),
+        )
+
+    def update_activity(self, pks=None):
+        """
+        Recompute the last review publication time of the reviewers with the
+        given primary keys, or of every reviewer if none are given
+        """
+        reviewers = self.all() if pks is None else self.filter(pk__in=pks)
+        return reviewers.update(last_review_on=latest_value(
+            Review.objects.filter(reviewer=models.OuterRef('pk')),
+            'published_on'))
 
 
 class Reviewer(models.Model):
@@ -716,6 +1019,10 @@ class Reviewer(models.Model):
         max_length=200, null=True, blank=True,
         format='image', directory='headshots')
     bio = models.TextField(null=True, blank=True)
+    last_review_on = models.DateTimeField(
+        null=True, blank=True, editable=False, db_index=True,
+        help_text='Publication time of the most recent review, maintained by '
+        'signals and the recompute_activity command.')
 
     objects = ReviewerManager()
 
@@ -771,3 +1078,76 @@ class ProductionPoster(SlideshowImage):
 
     class Meta:
         ordering = ['production', 'order']
+
+
+class SearchQueueEntry(models.Model):
+    """An object whose search index documents need to be updated or removed"""
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = (
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+    )
+
+    model_label = models.CharField(max_length=100)
+    object_pk = models.PositiveIntegerField()
+    action = models.CharField(max_length=6, choices=ACTION_CHOICES)
+    queued_on = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['queued_on']
+        unique_together = ('model_label', 'object_pk')
+        verbose_name_plural = 'search queue entries'
+
+    def __str__(self):
+        return u'%s %s.%s' % (self.action, self.model_label, self.object_pk)
+
+
+class SuggestionChange(models.Model):
+    """
+    An object whose typeahead suggestion was added, changed or removed, read
+    by each process to update its suggestion index (see base.typeahead)
+    """
+    model_label = models.CharField(max_length=100)
+    object_pk = models.PositiveIntegerField()
+    changed_on = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['changed_on']
+
+    def __str__(self):
+        return u'%s.%s' % (self.model_label, self.object_pk)
+
+
+@deconstructible
+class OutboxStorage(FileSystemStorage):
+    """Stores contact form attachments outside of the public media root"""
+    def __init__(self):
+        super(OutboxStorage, self).__init__(
+            location=settings.CONTACT_OUTBOX_ROOT, base_url=None)
+
+
+def outbox_upload_to(instance, filename):
+    """Keep each attachment's name by giving it a directory of its own"""
+    return '%s/%s' % (uuid.uuid4().hex, filename)
+
+
+class ContactMessage(models.Model):
+    """A contact form submission waiting to be emailed to the site's editors"""
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    reply_to = models.EmailField()
+    attachment = models.FileField(
+        upload_to=outbox_upload_to, storage=OutboxStorage(), max_length=255,
+        null=True, blank=True)
+    created_on = models.DateTimeField(default=timezone.now)
+    sent_on = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_on = models.DateTimeField(default=timezone.now, db_index=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ['next_attempt_on']
+
+    def __str__(self):
+        return self.subject
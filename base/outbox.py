@@ -0,0 +1,222 @@
+import base64
+import mimetypes
+import os
+import smtplib
+import uuid
+from datetime import timedelta
+from email.mime.base import MIMEBase
+from tempfile import TemporaryFile
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+from django.core.mail.message import sanitize_address
+from django.utils import timezone
+
+from base.models import ContactMessage
+
+# Delay before the first retry of a failed message, doubled after each attempt
+RETRY_DELAY = timedelta(minutes=1)
+
+# How long a claimed message is withheld from other senders, in case the
+# sender that claimed it dies before recording the outcome
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Bytes of an attachment encoded at a time: a multiple of 57, the number of
+# bytes base64 encodes into a full 76 character line
+ENCODE_CHUNK_SIZE = 57 * 1024
+
+# Bytes of a spooled message sent to the mail server at a time
+SEND_CHUNK_SIZE = 64 * 1024
+
+
+def build_email(message, connection=None, attach=True):
+    """
+    Return the EmailMessage delivering a queued contact message. Unless
+    attach is False, the attachment is read into the message.
+    """
+    email = EmailMessage(
+        subject=message.subject,
+        body=message.body,
+        to=settings.DEFAULT_CONTACT_EMAILS,
+        headers={'Reply-To': message.reply_to},
+        connection=connection)
+    if attach and message.attachment:
+        with message.attachment.open('rb') as attachment:
+            email.attach(
+                os.path.basename(message.attachment.name), attachment.read())
+    return email
+
+
+def write_mime(message, email, out):
+    """
+    Write the MIME form of the email, with the message's attachment, to the
+    binary file out. The attachment is encoded a chunk at a time, so it is
+    never held in memory whole.
+    """
+    if not message.attachment:
+        out.write(email.message().as_bytes(linesep='\r\n'))
+        return
+
+    filename = os.path.basename(message.attachment.name)
+    mimetype = mimetypes.guess_type(filename)[0] or \
+        'application/octet-stream'
+    try:
+        filename.encode('ascii')
+    except UnicodeEncodeError:
+        filename = ('utf-8', '', filename)
+
+    # build the message around a placeholder, then stream the attachment
+    # into its place
+    placeholder = uuid.uuid4().hex
+    part = MIMEBase(*mimetype.split('/', 1))
+    part.set_payload(placeholder)
+    part['Content-Transfer-Encoding'] = 'base64'
+    part.add_header('Content-Disposition', 'attachment', filename=filename)
+    email.attach(part)
+    head, tail = email.message().as_bytes(linesep='\r\n').split(
+        placeholder.encode('ascii'))
+
+    out.write(head)
+    with message.attachment.open('rb') as attachment:
+        separator = b''
+        for chunk in iter(lambda: attachment.read(ENCODE_CHUNK_SIZE), b''):
+            encoded = base64.encodebytes(chunk).rstrip(b'\n')
+            out.write(separator + encoded.replace(b'\n', b'\r\n'))
+            separator = b'\r\n'
+    out.write(tail)
+
+
+def send_spooled(connection, email, spool):
+    """
+    Send the MIME message in the binary file spool over an open SMTP
+    connection, a chunk at a time. Raises an SMTPException if the server
+    refuses it.
+    """
+    smtp = connection.connection
+    encoding = email.encoding or settings.DEFAULT_CHARSET
+    from_email = sanitize_address(email.from_email, encoding)
+    recipients = [
+        sanitize_address(address, encoding) for address in email.recipients()
+    ]
+
+    smtp.ehlo_or_helo_if_needed()
+    code, response = smtp.mail(from_email)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, response, from_email)
+    refused = {}
+    for recipient in recipients:
+        code, response = smtp.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        smtp.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+
+    code, response = smtp.docmd('data')
+    if code != 354:
+        raise smtplib.SMTPDataError(code, response)
+    buffered = []
+    buffered_size = 0
+    line = b''
+    for line in spool:
+        # lines beginning with a period are escaped by doubling it
+        if line.startswith(b'.'):
+            line = b'.' + line
+        buffered.append(line)
+        buffered_size += len(line)
+        if buffered_size >= SEND_CHUNK_SIZE:
+            smtp.send(b''.join(buffered))
+            buffered, buffered_size = [], 0
+    if not line.endswith(b'\r\n'):
+        buffered.append(b'\r\n')
+    buffered.append(b'.\r\n')
+    smtp.send(b''.join(buffered))
+    code, response = smtp.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, response)
+
+
+def deliver(message, connection):
+    """
+    Send a queued message. Over SMTP, the message is spooled to a temporary
+    file and streamed to the server; other backends are given the message
+    with its attachment read into memory.
+    """
+    if not isinstance(connection, SMTPBackend):
+        build_email(message, connection).send()
+        return
+
+    email = build_email(message, connection, attach=False)
+    with TemporaryFile() as spool:
+        write_mime(message, email, spool)
+        spool.seek(0)
+        send_spooled(connection, email, spool)
+
+
+def get_pending(max_attempts):
+    """Return the unsent messages due for an attempt, oldest first"""
+    return ContactMessage.objects.filter(
+        sent_on__isnull=True, attempts__lt=max_attempts,
+        next_attempt_on__lte=timezone.now())
+
+
+def claim(message):
+    """
+    Atomically take a due message for sending, counting the attempt. Returns
+    False if another sender has claimed or sent it since it was read.
+    """
+    next_attempt_on = timezone.now() + CLAIM_TIMEOUT
+    claimed = ContactMessage.objects.filter(
+        pk=message.pk, sent_on__isnull=True, attempts=message.attempts,
+        next_attempt_on=message.next_attempt_on,
+    ).update(attempts=message.attempts + 1, next_attempt_on=next_attempt_on)
+    if not claimed:
+        return False
+    message.attempts += 1
+    message.next_attempt_on = next_attempt_on
+    return True
+
+
+def send_pending(batch_size=50, max_attempts=5, connection=None):
+    """
+    Send up to batch_size due messages over one mail server connection and
+    return the number sent. Each message is claimed before it is sent, so
+    concurrent senders never send it twice. A message that fails is retried
+    later, with an exponentially increasing delay, until it has been
+    attempted max_attempts times.
+    """
+    messages = list(get_pending(max_attempts)[:batch_size])
+    if not messages:
+        return 0
+
+    connection = connection or get_connection()
+    sent = 0
+    try:
+        for message in messages:
+            # senders started by overlapping cron runs may read the same rows
+            if not claim(message):
+                continue
+            try:
+                # reopens the connection if the previous message closed it
+                connection.open()
+                deliver(message, connection)
+            except Exception as error:
+                connection.close()
+                message.last_error = '%s: %s' % (type(error).__name__, error)
+                message.next_attempt_on = timezone.now() + \
+                    RETRY_DELAY * 2 ** (message.attempts - 1)
+                message.save(update_fields=[
+                    'attempts', 'last_error', 'next_attempt_on'])
+                continue
+
+            message.sent_on = timezone.now()
+            message.last_error = ''
+            if message.attachment:
+                message.attachment.delete(save=False)
+            message.save(update_fields=[
+                'attempts', 'last_error', 'sent_on', 'attachment'])
+            sent += 1
+    finally:
+        connection.close()
+    return sent
@@ -0,0 +1,240 @@
+import hashlib
+import re
+import threading
+from contextlib import ExitStack, contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.db.models import SlugField
+from django.http import HttpResponse
+from django.utils import timezone
+
+from base import generations
+
+# Tag of every cached page, bumped by clear()
+ALL_PAGES_TAG = 'all'
+
+# Routes of base.urls whose responses are not cached: the contact form
+# renders a CSRF token for each visitor, and the search suggestions and feed
+# are cached by their own views
+UNCACHED_URL_NAMES = frozenset([
+    'contact', 'contact_thanks', 'search_suggestions', 'aggregated_rss_feed',
+])
+
+# Response headers describing a single request, not stored with its page
+UNCACHED_HEADERS = ('Server-Timing',)
+
+TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+[`"]?(\w+)[`"]?')
+
+# The tags being recorded for the page rendering in this thread, if any
+_recording = threading.local()
+
+# For each database alias, the tag and single object lookups of each table
+_tables = {}
+
+
+def model_tag(model):
+    """Return the tag of the pages that list a model's objects"""
+    return model._meta.concrete_model._meta.label_lower
+
+
+def instance_tag(model, pk):
+    """Return the tag of the pages that show the object of a model"""
+    return '%s:%s' % (model_tag(model), pk)
+
+
+def _get_tables(connection):
+    """
+    Return a dictionary mapping the name of each table of the base app to its
+    tag and the conditions that select a single object from it: equality on
+    its primary key or slug.
+    """
+    if connection.alias not in _tables:
+        quote = connection.ops.quote_name
+        tables = {}
+        models = apps.get_app_config('base').get_models(
+            include_auto_created=True)
+        for model in models:
+            opts = model._meta
+            columns = [opts.pk.column] + [
+                field.column for field in opts.concrete_fields
+                if isinstance(field, SlugField)]
+            tables[opts.db_table] = (model_tag(model), [
+                '%s.%s = %%s' % (quote(opts.db_table), quote(column))
+                for column in columns])
+        _tables[connection.alias] = tables
+    return _tables[connection.alias]
+
+
+def _parse_query(sql, connection):
+    """
+    Return the names of the base app tables a SELECT statement reads, main
+    table first, its WHERE clause, and whether it selects a single object
+    by its primary key or slug
+    """
+    tables = _get_tables(connection)
+    names = [name for name in TABLE_RE.findall(sql) if name in tables]
+    where = sql.partition(' WHERE ')[2]
+    single = bool(names) and ' OR ' not in where and any(
+        lookup in where for lookup in tables[names[0]][1])
+    return names, where, single
+
+
+def get_query_tags(sql, connection):
+    """
+    Return the tags of the models a SELECT statement reads. A statement that
+    selects a single object by its primary key or slug depends only on the
+    objects loaded, which record_instance() tags, and on the other tables
+    its conditions refer to; the tables joined only to load related objects
+    are left out.
+    """
+    tables = _get_tables(connection)
+    names, where, single = _parse_query(sql, connection)
+    if single:
+        quote = connection.ops.quote_name
+        names = [
+            name for name in names[1:] if '%s.' % quote(name) in where]
+    return [tables[name][0] for name in names]
+
+
+def get_lookup_tags(sql, connection):
+    """
+    Return the tags of every model a SELECT statement of a single object
+    reads, or None for other statements. A page is tagged with them when
+    the lookup loads no object, since saving any of them may make it match.
+    """
+    names, where, single = _parse_query(sql, connection)
+    if not single:
+        return None
+    tables = _get_tables(connection)
+    return [tables[name][0] for name in names]
+
+
+def _end_lookup():
+    """Tag the page with the last single object lookup if it found none"""
+    lookup = getattr(_recording, 'lookup', None)
+    if lookup is not None:
+        _recording.tags.update(lookup)
+        _recording.lookup = None
+
+
+def _record_query(execute, sql, params, many, context):
+    tags = getattr(_recording, 'tags', None)
+    if tags is not None and sql.lstrip()[:6].upper() == 'SELECT':
+        connection = context['connection']
+        # the objects a query loads are created before the next one runs
+        _end_lookup()
+        _recording.lookup = get_lookup_tags(sql, connection)
+        tags.update(get_query_tags(sql, connection))
+    return execute(sql, params, many, context)
+
+
+def record_instance(instance):
+    """Tag the page being recorded, if any, with an object it loaded"""
+    tags = getattr(_recording, 'tags', None)
+    if tags is not None and instance.pk is not None:
+        tags.add(instance_tag(type(instance), instance.pk))
+        lookup = getattr(_recording, 'lookup', None)
+        if lookup is not None and lookup[0] == model_tag(type(instance)):
+            _recording.lookup = None
+
+
+@contextmanager
+def recording():
+    """
+    Collect the tags of the page rendered within the block: the objects it
+    loaded, the models whose tables it queried, and the models whose cached
+    fragments it used
+    """
+    tags = set([ALL_PAGES_TAG])
+    _recording.tags = tags
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(_record_query))
+            models = stack.enter_context(generations.tracking_reads())
+            yield tags
+            _end_lookup()
+            tags.update(model_tag(model) for model in models)
+    finally:
+        _recording.tags = None
+        _recording.lookup = None
+
+
+def get_page_key(request):
+    """
+    Return the cache key of the page for a request: its URL, the active
+    timezone, and the current date, since pages listing upcoming dates change
+    at midnight without any object being saved
+    """
+    parts = [
+        request.build_absolute_uri(),
+        timezone.get_current_timezone_name(),
+        timezone.localdate().isoformat(),
+    ]
+    return 'page:%s' % hashlib.md5(
+        '|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def is_cacheable_response(request, response):
+    """
+    Return whether a response may be served to every anonymous visitor:
+    a complete page that neither sets cookies nor depends on the session
+    """
+    return (
+        response.status_code == 200 and
+        not response.streaming and
+        not response.cookies and
+        'private' not in response.get('Cache-Control', '') and
+        not request.META.get('CSRF_COOKIE_USED') and
+        not request.session.modified
+    )
+
+
+def get_page(key):
+    """
+    Return the cached response for a page key, or None if it is missing or
+    any of the objects or models it was tagged with has changed since
+    """
+    page = cache.get(key)
+    if page is None or \
+            generations.get_tag_generations(page['tags']) != page['tags']:
+        return None
+    response = HttpResponse(page['content'], status=page['status'])
+    for header, value in page['headers']:
+        response[header] = value
+    return response
+
+
+def set_page(key, response, tags):
+    """
+    Cache a response, along with the current generations of its tags. An
+    object saved while the page rendered may be missed, so pages also expire
+    after PAGE_CACHE_TIMEOUT seconds.
+    """
+    cache.set(key, {
+        'content': response.content,
+        'status': response.status_code,
+        'headers': [
+            (header, value) for header, value in response.items()
+            if header not in UNCACHED_HEADERS],
+        'tags': generations.get_tag_generations(tags),
+    }, settings.PAGE_CACHE_TIMEOUT)
+
+
+def invalidate(model, pks=()):
+    """
+    Expire the cached pages that listed a model's objects, and those that
+    showed any of its objects with the given primary keys
+    """
+    generations.bump_tag_generation(model_tag(model))
+    for pk in pks:
+        generations.bump_tag_generation(instance_tag(model, pk))
+
+
+def clear():
+    """Expire every cached page"""
+    generations.bump_tag_generation(ALL_PAGES_TAG)
@@ -0,0 +1,181 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+
+class InvalidCursor(Exception):
+    """Raised when a pagination cursor cannot be decoded"""
+    pass
+
+
+class KeysetPage(object):
+    """A page of objects, with opaque cursors to the pages around it"""
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator(object):
+    """
+    Paginate a queryset by seeking past the ordering key of the last object
+    shown, rather than counting and skipping rows with OFFSET. Every page costs
+    the same, however deep, but pages are not numbered.
+
+    queryset - the objects to paginate
+    per_page - the number of objects on each page
+    ordering - field names to order by, optionally prefixed with '-'. Together
+        they must be unique, so the last should be 'id'. Objects whose value
+        of a nullable field is null are ordered after the others.
+    """
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = list(ordering)
+        self.keys = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+        self.fields = [
+            queryset.model._meta.get_field(name) for name, _ in self.keys
+        ]
+
+    def get_ordering(self, reverse=False):
+        """
+        Return the expressions ordering the queryset, with null values last,
+        or the opposite ordering if reverse is true
+        """
+        ordering = []
+        for (name, descending), field in zip(self.keys, self.fields):
+            expression = F(name).desc if descending != reverse else F(name).asc
+            if not field.null:
+                ordering.append(expression())
+            elif reverse:
+                ordering.append(expression(nulls_first=True))
+            else:
+                ordering.append(expression(nulls_last=True))
+        return ordering
+
+    def encode_cursor(self, direction, obj):
+        """Return an opaque token for the page before or after obj"""
+        values = [
+            None if field.value_from_object(obj) is None
+            else field.value_to_string(obj)
+            for field in self.fields
+        ]
+        data = json.dumps([direction] + values).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return the direction and key values encoded in cursor"""
+        try:
+            data = base64.urlsafe_b64decode(
+                str(cursor) + '=' * (-len(cursor) % 4))
+            decoded = json.loads(data.decode('utf-8'))
+            direction, values = decoded[0], decoded[1:]
+            if direction not in ('next', 'previous') or \
+                    len(values) != len(self.fields):
+                raise InvalidCursor(cursor)
+            values = [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (IndexError, KeyError, TypeError, ValueError, ValidationError):
+            raise InvalidCursor(cursor)
+        if any(value is None and not field.null
+               for field, value in zip(self.fields, values)):
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def _seek_key(self, index, value, reverse):
+        """
+        Return a Q object matching the objects whose value of the key at index
+        comes after value in the ordering, or before it if reverse is true
+        """
+        (name, descending), field = self.keys[index], self.fields[index]
+        if value is None:
+            # nulls are last: nothing comes after them, everything else before
+            if reverse:
+                return Q(**{'%s__isnull' % name: False})
+            return Q(pk__in=[])
+        lookup = 'lt' if descending != reverse else 'gt'
+        condition = Q(**{'%s__%s' % (name, lookup): value})
+        if field.null and not reverse:
+            condition |= Q(**{'%s__isnull' % name: True})
+        return condition
+
+    def seek_filter(self, values, reverse=False):
+        """
+        Return a Q object matching the objects after the given key values in
+        the ordering, or before them if reverse is true
+        """
+        seek = Q()
+        for index in range(len(self.keys)):
+            condition = self._seek_key(index, values[index], reverse)
+            for (prior_name, _), prior_value in zip(self.keys, values[:index]):
+                if prior_value is None:
+                    condition &= Q(**{'%s__isnull' % prior_name: True})
+                else:
+                    condition &= Q(**{prior_name: prior_value})
+            seek |= condition
+
+        # a redundant range on the leading key lets the database seek its index
+        (name, descending), field = self.keys[0], self.fields[0]
+        if values[0] is None:
+            return seek if reverse else Q(**{'%s__isnull' % name: True}) & seek
+        lookup = 'lte' if descending != reverse else 'gte'
+        seek_range = Q(**{'%s__%s' % (name, lookup): values[0]})
+        if field.null and not reverse:
+            seek_range |= Q(**{'%s__isnull' % name: True})
+        return seek_range & seek
+
+    def page(self, cursor=None):
+        """
+        Return the KeysetPage identified by cursor, or the first page if no
+        cursor is given. Raise InvalidCursor if cursor cannot be decoded.
+        """
+        direction, values = 'next', None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+        reverse = direction == 'previous'
+
+        queryset = self.queryset.order_by(*self.get_ordering(reverse))
+        if values is not None:
+            queryset = queryset.filter(self.seek_filter(values, reverse))
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if reverse:
+            object_list.reverse()
+
+        if not object_list:
+            return self.page() if values is not None else KeysetPage([])
+
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else values is not None
+        return KeysetPage(
+            object_list,
+            next_cursor=(
+                self.encode_cursor('next', object_list[-1])
+                if has_next else None),
+            previous_cursor=(
+                self.encode_cursor('previous', object_list[0])
+                if has_previous else None),
+        )
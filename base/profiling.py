@@ -0,0 +1,106 @@
+import json
+import math
+import os
+import signal
+import tempfile
+import threading
+from collections import deque
+
+from django.conf import settings
+
+# Signal asking a process to write its buffered profiles to a file, sent by
+# the dump_request_profiles command
+DUMP_SIGNAL = signal.SIGUSR2
+
+# The request profiles of this process, newest last
+_buffer = None
+
+
+def _get_buffer():
+    global _buffer
+    size = getattr(settings, 'PROFILING_BUFFER_SIZE', 500)
+    if _buffer is None or _buffer.maxlen != size:
+        _buffer = deque(_buffer or (), maxlen=size)
+    return _buffer
+
+
+def percentile(values, pct):
+    """Return the nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    rank = int(math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(len(ordered), max(1, rank)) - 1]
+
+
+def record_profile(profile):
+    """
+    Append a request profile to this process's ring buffer, dropping the
+    oldest profile once the buffer is full
+    """
+    _get_buffer().append(profile)
+
+
+def get_profiles():
+    """Return the request profiles buffered by this process, oldest first"""
+    return list(_get_buffer())
+
+
+def clear_profiles():
+    """Empty the ring buffer"""
+    _get_buffer().clear()
+
+
+def get_dump_paths(pid):
+    """
+    Return the paths of the file in which the dump_request_profiles command
+    asks a process for its profiles, and of the file the process answers in
+    """
+    directory = getattr(
+        settings, 'PROFILING_DUMP_DIR',
+        os.path.join(tempfile.gettempdir(), 'livetheatre_profiles'))
+    return (
+        os.path.join(directory, '%s.request.json' % pid),
+        os.path.join(directory, '%s.json' % pid),
+    )
+
+
+def write_profiles():
+    """
+    Answer a request for this process's profiles, written by the
+    dump_request_profiles command, emptying the buffer if it asks to
+    """
+    request_path, dump_path = get_dump_paths(os.getpid())
+    try:
+        with open(request_path) as request_file:
+            request = json.load(request_file)
+    except (OSError, ValueError):
+        return
+    profiles = get_profiles()
+    if request.get('clear'):
+        clear_profiles()
+    # written to another file first, so the command never reads half of it
+    with open(dump_path + '.tmp', 'w') as dump_file:
+        json.dump(profiles, dump_file)
+    os.replace(dump_path + '.tmp', dump_path)
+
+
+def install_dump_handler():
+    """
+    Write this process's profiles when it receives DUMP_SIGNAL. Signal
+    handlers can only be set from the main thread, so processes serving
+    requests from other threads, such as runserver, are not dumped.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        return False
+    signal.signal(DUMP_SIGNAL, lambda signum, frame: write_profiles())
+    return True
+
+
+def format_server_timing(profile):
+    """Return the value of a Server-Timing header describing a profile"""
+    return ', '.join([
+        'db;dur=%.1f;desc="%s queries"' % (
+            profile['db_ms'], profile['queries']),
+        'view;dur=%.1f' % profile['view_ms'],
+        'render;dur=%.1f' % profile['render_ms'],
+        'total;dur=%.1f' % profile['total_ms'],
+    ])
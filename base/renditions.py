@@ -0,0 +1,75 @@
+from filebrowser.base import FileObject
+from filebrowser.settings import VERSIONS
+from filebrowser.utils import get_modified_time
+
+from base.models import (
+    Audition, NewsSlideshowImage, Production, ProductionCompany,
+    ProductionPoster, Review, Reviewer)
+
+# Sizes generated for each image, as filebrowser versions, smallest first
+RENDITIONS = ('thumbnail', 'tile', 'feature')
+
+# Image fields whose files have renditions
+IMAGE_FIELDS = (
+    (Production, 'poster'),
+    (ProductionCompany, 'logo'),
+    (Review, 'cover_image'),
+    (Reviewer, 'headshot'),
+    (Audition, 'poster'),
+    (NewsSlideshowImage, 'image'),
+    (ProductionPoster, 'image'),
+)
+
+
+def get_image_paths():
+    """Return the distinct paths of the images in every image field"""
+    paths = set()
+    for model, field_name in IMAGE_FIELDS:
+        paths.update(
+            str(path) for path in model.objects.exclude(**{
+                field_name: ''}).values_list(field_name, flat=True)
+            if path)
+    return sorted(paths)
+
+
+def generate_renditions(fileobject):
+    """
+    Generate the missing or outdated renditions of an image, returning the
+    number generated. Files that are not images, or do not exist, are skipped.
+    """
+    if fileobject.filetype != 'Image' or fileobject.is_version or \
+            not fileobject.exists:
+        return 0
+    storage = fileobject.site.storage
+    modified = get_modified_time(storage, fileobject.path)
+    generated = 0
+    for name in RENDITIONS:
+        path = fileobject.version_path(name)
+        if storage.exists(path) and \
+                get_modified_time(storage, path) >= modified:
+            continue
+        fileobject.version_generate(name)
+        generated += 1
+    return generated
+
+
+def generate_path_renditions(path):
+    """Generate the renditions of the image at a path in the storage"""
+    return generate_renditions(FileObject(path))
+
+
+def get_renditions(fileobject):
+    """
+    Return (name, url, width) for each rendition of an image that has been
+    generated. Only checks for their files; does not generate them.
+    """
+    if not fileobject or fileobject.is_version:
+        return []
+    storage = fileobject.site.storage
+    renditions = []
+    for name in RENDITIONS:
+        path = fileobject.version_path(name)
+        if storage.exists(path):
+            renditions.append(
+                (name, storage.url(path), VERSIONS[name]['width']))
+    return renditions
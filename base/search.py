@@ -0,0 +1,146 @@
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.encoding import force_text
+from haystack.backends.whoosh_backend import (
+    WhooshEngine, WhooshSearchBackend)
+from haystack.constants import DJANGO_CT
+from haystack.utils import get_model_ct
+from whoosh import sorting
+from whoosh.analysis import STOP_WORDS
+from whoosh.fields import ID
+from whoosh.query import And
+
+# a quoted phrase, optionally excluded with '-', or a single term
+QUERY_TOKEN_RE = re.compile(r'-?"[^"]*"?|\S+')
+
+
+def normalize_query(query):
+    """
+    Return a canonical form of a search query: lowercase, single-spaced, and
+    without the stop words the index ignores. Quoted phrases are kept whole.
+    """
+    tokens = [
+        ' '.join(token.split())
+        for token in QUERY_TOKEN_RE.findall(query.lower())
+    ]
+    terms = [
+        token for token in tokens
+        if '"' in token or token.lstrip('-') not in STOP_WORDS
+    ]
+    return ' '.join(terms or tokens)
+
+
+class LRUCache(object):
+    """A thread-safe mapping that discards its least recently used items"""
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._items.move_to_end(key)
+            except KeyError:
+                return default
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+
+# pages of search results, keyed on the search index generation
+results_cache = LRUCache(getattr(settings, 'SEARCH_CACHE_SIZE', 256))
+
+
+class FacetedWhooshSearchBackend(WhooshSearchBackend):
+    """
+    A Whoosh backend that indexes facet fields as exact values and counts
+    field facets, which haystack's Whoosh backend ignores
+    """
+    def build_schema(self, fields):
+        content_field_name, schema = super(
+            FacetedWhooshSearchBackend, self).build_schema(fields)
+        for field_class in fields.values():
+            if getattr(field_class, 'facet_for', None) and \
+                    field_class.field_type == 'string':
+                schema.remove(field_class.index_fieldname)
+                schema.add(field_class.index_fieldname, ID(
+                    stored=True, sortable=True))
+        return content_field_name, schema
+
+    def search(self, query_string, facets=None, **kwargs):
+        # the parent adds to narrow_queries, which are needed again below
+        search_kwargs = dict(kwargs)
+        if kwargs.get('narrow_queries'):
+            search_kwargs['narrow_queries'] = set(kwargs['narrow_queries'])
+        results = super(FacetedWhooshSearchBackend, self).search(
+            query_string, **search_kwargs)
+        if facets and results.get('hits'):
+            results['facets'] = {
+                'fields': self.count_field_facets(
+                    query_string, facets, **kwargs),
+            }
+        return results
+
+    def count_field_facets(self, query_string, fields, narrow_queries=None,
+                           models=None, limit_to_registered_models=None,
+                           **kwargs):
+        """
+        Return a dictionary of (value, count) lists, most common first, for
+        each of the fields among the documents matching the query. Documents
+        without a value for a field are not counted.
+        """
+        narrow_queries = set(narrow_queries or [])
+        if limit_to_registered_models is None:
+            limit_to_registered_models = getattr(
+                settings, 'HAYSTACK_LIMIT_TO_REGISTERED_MODELS', True)
+        if models:
+            model_choices = sorted(get_model_ct(model) for model in models)
+        elif limit_to_registered_models:
+            model_choices = self.build_models_list()
+        else:
+            model_choices = []
+        if model_choices:
+            narrow_queries.add(' OR '.join(
+                '%s:%s' % (DJANGO_CT, model_ct) for model_ct in model_choices))
+
+        query = self.parser.parse(force_text(query_string))
+        narrow_query = None
+        if narrow_queries:
+            narrow_query = And([
+                self.parser.parse(force_text(narrow))
+                for narrow in narrow_queries
+            ])
+        groupedby = dict(
+            (field, sorting.FieldFacet(field, maptype=sorting.Count))
+            for field in fields
+        )
+        with self.index.refresh().searcher() as searcher:
+            results = searcher.search(
+                query, filter=narrow_query, groupedby=groupedby, limit=1)
+            return dict(
+                (field, sorted(
+                    (item for item in results.groups(field).items()
+                     if item[0]),
+                    key=lambda item: (-item[1], item[0])))
+                for field in fields
+            )
+
+
+class FacetedWhooshEngine(WhooshEngine):
+    backend = FacetedWhooshSearchBackend
@@ -1,42 +1,127 @@
+from django.utils.html import escape, strip_tags
+from django.utils.text import Truncator, capfirst
 from haystack import indexes
 from base.models import (
     Review, Audition, ProductionCompany, Production, ArtsNews
 )
 
 
-class ReviewIndex(indexes.SearchIndex, indexes.Indexable):
+class ResultIndex(indexes.SearchIndex):
+    """
+    Stores the fields displayed on the search results page, so results can be
+    rendered without loading their objects from the database, and the fields
+    results can be filtered and faceted on
+    """
     text = indexes.CharField(document=True, use_template=True)
+    title = indexes.CharField(model_attr='title', indexed=False)
+    url = indexes.CharField(model_attr='get_absolute_url', indexed=False)
+    duration = indexes.CharField(default='', indexed=False)
+    summary = indexes.CharField(indexed=False)
+    kind = indexes.CharField(indexed=False, faceted=True)
+    city = indexes.CharField(null=True, faceted=True)
+    company = indexes.CharField(null=True, faceted=True)
+    start_date = indexes.DateField(null=True)
+    end_date = indexes.DateField(null=True)
+
+    summary_words = 50
+
+    def prepare_summary(self, obj):
+        """Return the object's lede, or the start of its content, as HTML"""
+        if getattr(obj, 'lede', None):
+            return escape(obj.lede)
+        text = getattr(obj, 'content', None) or \
+            getattr(obj, 'description', None) or ''
+        return Truncator(strip_tags(text)).words(self.summary_words, html=True)
+
+    def prepare_kind(self, obj):
+        return capfirst(self.get_model()._meta.verbose_name)
+
+    def prepare_city(self, obj):
+        return None
+
+    def prepare_company(self, obj):
+        return None
+
+
+class ReviewIndex(ResultIndex, indexes.Indexable):
+    title = indexes.CharField(model_attr='get_title', indexed=False)
 
     def get_model(self):
         return Review
 
     def index_queryset(self, using=None):
-        return self.get_model().objects.filter(is_published=True)
+        return self.get_model().objects.filter(
+            is_published=True).select_related(
+                'production__play', 'production__production_company',
+                'production__venue__address', 'reviewer')
 
+    def prepare_city(self, obj):
+        return obj.production.venue.address.city
 
-class AuditionIndex(indexes.SearchIndex, indexes.Indexable):
-    text = indexes.CharField(document=True, use_template=True)
+    def prepare_company(self, obj):
+        company = obj.production.production_company
+        return company.name if company else None
+
+
+class AuditionIndex(ResultIndex, indexes.Indexable):
+    title = indexes.CharField(model_attr='get_title', indexed=False)
+    start_date = indexes.DateField(model_attr='start_date', null=True)
 
     def get_model(self):
         return Audition
 
+    def index_queryset(self, using=None):
+        return self.get_model().objects.select_related(
+            'play', 'production_company')
 
-class ProductionCompanyIndex(indexes.SearchIndex, indexes.Indexable):
-    text = indexes.CharField(document=True, use_template=True)
+    def prepare_company(self, obj):
+        company = obj.production_company
+        return company.name if company else None
+
+    def prepare_end_date(self, obj):
+        return obj.end_date or obj.start_date
+
+
+class ProductionCompanyIndex(ResultIndex, indexes.Indexable):
+    title = indexes.CharField(model_attr='name', indexed=False)
 
     def get_model(self):
         return ProductionCompany
 
+    def prepare_company(self, obj):
+        return obj.name
 
-class ProductionIndex(indexes.SearchIndex, indexes.Indexable):
-    text = indexes.CharField(document=True, use_template=True)
+
+class ProductionIndex(ResultIndex, indexes.Indexable):
+    duration = indexes.CharField(
+        model_attr='detailed_duration', indexed=False)
+    start_date = indexes.DateField(model_attr='start_date', null=True)
 
     def get_model(self):
         return Production
 
+    def index_queryset(self, using=None):
+        return self.get_model().objects.select_related(
+            'play', 'production_company', 'venue__address')
 
-class ArtsNewsIndex(indexes.SearchIndex, indexes.Indexable):
-    text = indexes.CharField(document=True, use_template=True)
+    def prepare_city(self, obj):
+        return obj.venue.address.city
 
+    def prepare_company(self, obj):
+        company = obj.production_company
+        return company.name if company else None
+
+    def prepare_end_date(self, obj):
+        return obj.end_date or obj.start_date
+
+
+class ArtsNewsIndex(ResultIndex, indexes.Indexable):
     def get_model(self):
         return ArtsNews
+
+    def index_queryset(self, using=None):
+        return self.get_model().objects.select_related('related_company')
+
+    def prepare_company(self, obj):
+        company = obj.related_company
+        return company.name if company else None
@@ -0,0 +1,161 @@
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_init, post_save)
+from django.dispatch import receiver
+from filebrowser.signals import filebrowser_post_upload
+
+from base import generations, pagecache
+from base.renditions import generate_renditions
+from base.typeahead import SOURCE_MODELS, suggestions
+from base.models import (
+    Audition, Production, ProductionCompany, ProductionOccurrence, Review,
+    Reviewer, Venue)
+
+# Production fields that determine its performance dates
+SCHEDULE_FIELDS = set(
+    ['start_date', 'end_date', 'schedule_mask'] +
+    [day['boolean_field'] for day in Production.days]
+)
+
+# Foreign keys to the objects whose activity dates depend on each model
+ACTIVITY_PARENTS = {
+    Production: ('production_company_id', 'venue_id'),
+    Audition: ('production_company_id',),
+    Review: ('reviewer_id',),
+}
+
+
+def get_activity_parents(instance, field):
+    """
+    Return the primary keys of the object a foreign key refers to, and the
+    one it referred to when loaded, if it has since been reassigned
+    """
+    pks = set([getattr(instance, field),
+               instance._loaded_parents.get(field)])
+    pks.discard(None)
+    instance._loaded_parents[field] = getattr(instance, field)
+    return sorted(pks)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_model_generation(sender, **kwargs):
+    """Invalidate cached fragments built from the saved or deleted model"""
+    if sender._meta.app_label == 'base' and \
+            sender.__name__ in generations.GENERATION_MODELS:
+        generations.bump_generation(sender)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_cached_pages(sender, instance, **kwargs):
+    """Expire the cached pages that showed or listed the saved object"""
+    if sender._meta.app_label == 'base':
+        pagecache.invalidate(sender, [instance.pk])
+
+
+@receiver(m2m_changed)
+def invalidate_cached_relation_pages(sender, instance, action, **kwargs):
+    """Expire the cached pages that showed a changed many-to-many relation"""
+    if sender._meta.app_label == 'base' and action.startswith('post_'):
+        pagecache.invalidate(sender)
+        pagecache.invalidate(type(instance), [instance.pk])
+
+
+def record_page_dependency(sender, instance, **kwargs):
+    """
+    Tag the cached page being rendered, if any, with a loaded object.
+    Connected to the models of the base app in BaseConfig.ready().
+    """
+    pagecache.record_instance(instance)
+
+
+@receiver(post_save, sender=Production)
+def rebuild_production_occurrences(sender, instance, raw=False,
+                                   update_fields=None, **kwargs):
+    """Keep a Production's occurrences in sync with its schedule"""
+    if raw or (update_fields and
+               not SCHEDULE_FIELDS.intersection(update_fields)):
+        return
+    instance.rebuild_occurrences()
+    # created in bulk, without post_save
+    pagecache.invalidate(ProductionOccurrence)
+
+
+@receiver(post_init, sender=Production)
+@receiver(post_init, sender=Audition)
+@receiver(post_init, sender=Review)
+def remember_activity_parents(sender, instance, **kwargs):
+    """
+    Remember the objects whose activity dates depend on a loaded object, so
+    they are refreshed too if it is reassigned
+    """
+    # read from __dict__, since deferred fields would otherwise be queried
+    instance._loaded_parents = dict(
+        (field, instance.__dict__.get(field))
+        for field in ACTIVITY_PARENTS[sender])
+
+
+@receiver(post_save, sender=Production)
+@receiver(post_delete, sender=Production)
+def update_production_activity(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the last production date of a Production's company and venue,
+    and of those it was moved from
+    """
+    if raw:
+        return
+    company_pks = get_activity_parents(instance, 'production_company_id')
+    if company_pks:
+        ProductionCompany.objects.update_activity(company_pks)
+        pagecache.invalidate(ProductionCompany, company_pks)
+    venue_pks = get_activity_parents(instance, 'venue_id')
+    Venue.objects.update_activity(venue_pks)
+    pagecache.invalidate(Venue, venue_pks)
+
+
+@receiver(post_save, sender=Audition)
+@receiver(post_delete, sender=Audition)
+def update_audition_activity(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the last audition date of an Audition's company, and of the one
+    it was moved from
+    """
+    if raw:
+        return
+    company_pks = get_activity_parents(instance, 'production_company_id')
+    if company_pks:
+        ProductionCompany.objects.update_activity(company_pks)
+        pagecache.invalidate(ProductionCompany, company_pks)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_review_activity(sender, instance, raw=False, **kwargs):
+    """
+    Refresh the last review publication time of a Review's reviewer, and of
+    the one it was moved from
+    """
+    if not raw:
+        reviewer_pks = get_activity_parents(instance, 'reviewer_id')
+        Reviewer.objects.update_activity(reviewer_pks)
+        pagecache.invalidate(Reviewer, reviewer_pks)
+
+
+@receiver(post_save)
+def update_suggestion(sender, instance, raw=False, **kwargs):
+    """Add or replace a saved object's typeahead suggestion"""
+    if not raw and sender in SOURCE_MODELS:
+        suggestions.update(instance)
+
+
+@receiver(post_delete)
+def remove_suggestion(sender, instance, **kwargs):
+    """Remove a deleted object's typeahead suggestion"""
+    if sender in SOURCE_MODELS:
+        suggestions.remove(instance)
+
+
+@receiver(filebrowser_post_upload)
+def generate_upload_renditions(sender, file, **kwargs):
+    """Generate the renditions of an image uploaded through FileBrowser"""
+    generate_renditions(file)
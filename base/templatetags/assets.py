@@ -0,0 +1,24 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from base.assets import get_asset_paths
+
+register = template.Library()
+
+
+@register.simple_tag
+def asset(name):
+    """
+    Return the elements including a bundle of stylesheets or scripts: the
+    hashed bundle written by the build_assets command, or the files it
+    bundles if the assets have not been built:
+
+        {% asset 'site.css' %}
+    """
+    if name.endswith('.css'):
+        element = '<link rel="stylesheet" href="{}">'
+    else:
+        element = '<script src="{}"></script>'
+    return format_html_join(
+        '\n', element, ((static(path),) for path in get_asset_paths(name)))
@@ -0,0 +1,19 @@
+from django import template
+from django.apps import apps
+
+from base.generations import get_generations
+
+register = template.Library()
+
+
+@register.simple_tag
+def generation(*model_names):
+    """
+    Return a version string for the named base models, to be used as a
+    vary_on argument of the {% cache %} tag:
+
+        {% generation 'Review' 'Production' as review_generation %}
+        {% cache 86400 recent_reviews review_generation %}
+    """
+    models = [apps.get_model('base', name) for name in model_names]
+    return get_generations(*models)
@@ -0,0 +1,31 @@
+from django import template
+from django.utils.html import format_html
+
+from base.renditions import get_renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def image_attrs(image, rendition='tile'):
+    """
+    Return the src, srcset and sizes attributes of an img element displaying
+    an image at about the width of the named rendition. Browsers choose a
+    larger rendition on high density screens, and the original image is used
+    until renditions have been generated:
+
+        <img {% image_attrs production.poster 'tile' %} alt="..." />
+    """
+    renditions = get_renditions(image)
+    if not renditions:
+        return format_html('src="{}"', image.url if image else '')
+
+    urls = dict((name, url) for name, url, width in renditions)
+    widths = dict((name, width) for name, url, width in renditions)
+    if rendition not in urls:
+        rendition = renditions[-1][0]
+    return format_html(
+        'src="{}" srcset="{}" sizes="{}px"',
+        urls[rendition],
+        ', '.join('%s %sw' % (url, width) for name, url, width in renditions),
+        widths[rendition])
@@ -11,7 +11,7 @@ from base.admin import (
     ProductionAdmin, ProductionPosterInline, ReviewAdmin, ReviewerAdmin,
     VenueAdmin
 )
-from base.models import Review
+from base.models import Review, Reviewer
 from base.tests.fixtures import ReviewFactory
 
 
@@ -214,15 +214,26 @@ class ReviewerAdminTestCase(TestCase):
     def test_class_attributes(self):
         self.assertTrue(ReviewerAdmin.actions_on_bottom)
         self.assertTrue(ReviewerAdmin.save_on_top)
-        self.assertTrue(
+        self.assertEqual(
             ReviewerAdmin.list_display,
-            ('full_name', 'review_count')
+            ('full_name', 'review_count', 'published_review_count',
+             'last_published_on')
         )
         self.assertIsInstance(
             ReviewerAdmin.formfield_overrides[models.TextField]['widget'],
             TinyMCE
         )
 
+    def test_get_queryset(self):
+        review = ReviewFactory(is_published=True)
+        ReviewFactory(is_published=False, reviewer=review.reviewer)
+        reviewer_admin = ReviewerAdmin(Reviewer, admin.site)
+        reviewer = reviewer_admin.get_queryset(HttpRequest()).get()
+        self.assertEqual(reviewer_admin.review_count(reviewer), 2)
+        self.assertEqual(reviewer_admin.published_review_count(reviewer), 1)
+        self.assertEqual(
+            reviewer_admin.last_published_on(reviewer), review.published_on)
+
 
 class ExternalReviewAdminTestCase(TestCase):
     def test_class_attributes(self):
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from base.assets import (
+    BUNDLES, absolute_css_urls, build_assets, get_asset_paths, load_manifest,
+    minify_css, minify_js)
+
+
+class MinifyTestCase(TestCase):
+    def test_minify_css(self):
+        self.assertEqual(
+            minify_css(
+                '/* comment */\n/*! license */\na > b,\n  c {\n'
+                '    color: red;\n    margin: 0 auto;\n}\n'),
+            '/*! license */ a>b,c{color: red;margin: 0 auto}')
+
+    def test_minify_js(self):
+        self.assertEqual(
+            minify_js('$(function() {\n\n    go()\n    stop();\n});\n'),
+            '$(function() {\ngo()\nstop();\n});')
+
+    @override_settings(STATIC_URL='/static/')
+    def test_absolute_css_urls(self):
+        self.assertEqual(
+            absolute_css_urls(
+                "a{background:url('../img/a.png')} "
+                'b{background:url(/static/img/b.png)} '
+                'c{background:url(data:image/png;base64,AAAA)} '
+                'd{src:url("../fonts/d.eot?#iefix")}',
+                'css/site.css'),
+            "a{background:url('/static/img/a.png')} "
+            'b{background:url(/static/img/b.png)} '
+            'c{background:url(data:image/png;base64,AAAA)} '
+            'd{src:url("/static/fonts/d.eot?#iefix")}')
+
+
+class BuildAssetsTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        settings_override = override_settings(STATIC_ROOT=self.tempdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_build_assets(self):
+        self.assertEqual(load_manifest(), {})
+        self.assertEqual(get_asset_paths('site.js'), list(BUNDLES['site.js']))
+
+        manifest = build_assets()
+        self.assertEqual(list(manifest), list(BUNDLES))
+        self.assertRegex(
+            manifest['site.js'], r'^assets/site\.[0-9a-f]{12}\.js$')
+        with open(os.path.join(
+                self.tempdir.name, 'assets', 'manifest.json')) as f:
+            self.assertEqual(json.load(f), manifest)
+        self.assertEqual(load_manifest(), manifest)
+        self.assertEqual(get_asset_paths('site.js'), [manifest['site.js']])
+
+        path = os.path.join(self.tempdir.name, manifest['site.css'])
+        with open(path, 'rb') as bundle, open(path + '.gz', 'rb') as zipped:
+            content = bundle.read()
+            self.assertEqual(gzip.decompress(zipped.read()), content)
+        self.assertIn(b'.navbar', content)
+
+        # the same sources produce the same names
+        self.assertEqual(build_assets(), manifest)
+
+    def test_asset_tag(self):
+        template = Template("{% load assets %}{% asset 'site.css' %}")
+        self.assertEqual(
+            template.render(Context()),
+            '<link rel="stylesheet" href="/static/css/livetheatre.css">')
+
+        manifest = build_assets()
+        self.assertEqual(
+            Template("{% load assets %}{% asset 'site.js' %}").render(
+                Context()),
+            '<script src="/static/%s"></script>' % manifest['site.js'])
+
+    def test_serve_asset(self):
+        manifest = build_assets()
+        name = os.path.basename(manifest['site.css'])
+        url = reverse('asset', args=[name])
+        self.assertEqual(url, '/static/' + manifest['site.css'])
+
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(
+            response['Cache-Control'],
+            'public, max-age=31536000, immutable')
+        content = b''.join(response.streaming_content)
+        self.assertIn(b'.navbar', content)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), content)
+
+        for header in ('gzip;q=0', 'br, gzip; q=0', '*;q=0', 'identity'):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING=header)
+            self.assertNotIn('Content-Encoding', response)
+            self.assertIn('Accept-Encoding', response['Vary'])
+            self.assertEqual(b''.join(response.streaming_content), content)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='*')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        response = self.client.get(reverse('asset', args=['missing.css']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_command(self):
+        stdout = StringIO()
+        call_command('build_assets', stdout=stdout)
+        for name, path in load_manifest().items():
+            self.assertIn('%s: %s (' % (name, path), stdout.getvalue())
@@ -0,0 +1,14 @@
+from django.test import TestCase, override_settings
+
+from base.checks import check_shared_cache
+
+
+class CheckSharedCacheTestCase(TestCase):
+    def test_shared_cache(self):
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_local_cache(self):
+        warning, = check_shared_cache(None)
+        self.assertEqual(warning.id, 'base.W001')
@@ -0,0 +1,228 @@
+import json
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db.models import Q
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from haystack import connections
+from haystack.query import SearchQuerySet
+from mock import patch
+
+from base import profiling, urls
+from base.models import (
+    ArtsNews, Audition, Production, ProductionCompany, ProductionOccurrence,
+    Review, Reviewer, Venue)
+from base.profiling import clear_profiles, get_profiles, record_profile
+from base.tests.fixtures import ProductionFactory, ReviewFactory
+
+
+def generate_dataset(**options):
+    options.setdefault('years', 2)
+    call_command(
+        'generate_dataset', companies=3, venues=3, reviewers=2,
+        productions_per_year=5, reviews_per_year=3, auditions_per_year=4,
+        news_per_year=6, seed=1, stdout=StringIO(), **options)
+
+
+class GenerateDatasetCommandTestCase(TestCase):
+    def test_handle(self):
+        generate_dataset()
+        self.assertEqual(Production.objects.count(), 10)
+        self.assertEqual(Review.objects.count(), 6)
+        self.assertEqual(Audition.objects.count(), 8)
+        self.assertEqual(ArtsNews.objects.count(), 12)
+
+        production = Production.objects.first()
+        self.assertEqual(
+            list(production.productionoccurrence_set.values_list(
+                'date', flat=True)),
+            production.get_performance_dates())
+
+    def test_handle_preserves_created_on(self):
+        generate_dataset(years=3)
+        years = ArtsNews.objects.dates('created_on', 'year')
+        self.assertEqual(len(years), 3)
+
+    def test_handle_appends(self):
+        generate_dataset()
+        occurrences = ProductionOccurrence.objects.count()
+        generate_dataset()
+        self.assertEqual(Production.objects.count(), 20)
+        self.assertEqual(
+            ProductionOccurrence.objects.count(), occurrences * 2)
+
+    def test_handle_updates_activity(self):
+        generate_dataset(years=1)
+        self.assertEqual(
+            ProductionCompany.objects.filter_active().count(),
+            ProductionCompany.objects.filter(
+                Q(production__isnull=False) | Q(audition__isnull=False)
+            ).distinct().count())
+
+
+class BenchmarkViewsCommandTestCase(TestCase):
+    def test_handle(self):
+        generate_dataset(years=1)
+        cache.set('unrelated', 1)
+        stdout = StringIO()
+        call_command(
+            'benchmark_views', repeat=2, stdout=stdout, stderr=StringIO())
+        self.assertEqual(cache.get('unrelated'), 1)
+
+        report = json.loads(stdout.getvalue())
+        self.assertEqual(report['row_counts']['Production'], 5)
+        self.assertEqual(
+            set(view['name'] for view in report['views']),
+            set(pattern.name for pattern in urls.urlpatterns))
+        for view in report['views']:
+            self.assertEqual(view['status'], 200, view['path'])
+            self.assertGreaterEqual(
+                view['latency_ms']['p99'], view['latency_ms']['p50'])
+            self.assertGreater(view['peak_memory_kb'], 0)
+
+    @override_settings(PAGE_CACHE_ENABLED=True)
+    def test_handle_page_cache(self):
+        generate_dataset(years=1)
+        stdout = StringIO()
+        call_command(
+            'benchmark_views', repeat=2, url=['reviews'],
+            stdout=stdout, stderr=StringIO())
+
+        view, = json.loads(stdout.getvalue())['views']
+        self.assertGreater(view['queries'], 0)
+
+
+class RecomputeActivityCommandTestCase(TestCase):
+    def test_handle(self):
+        production = ProductionFactory(start_date=timezone.now())
+        review = ReviewFactory(is_published=True)
+        Venue.objects.update(last_production_date=None)
+        Reviewer.objects.update(last_review_on=None)
+
+        call_command('recompute_activity', stdout=StringIO())
+        self.assertIn(production.venue, Venue.objects.filter_active())
+        self.assertEqual(
+            list(Reviewer.objects.filter_active()), [review.reviewer])
+
+
+class ProcessSearchQueueCommandTestCase(TestCase):
+    @patch('base.management.commands.process_search_queue.process_queue')
+    def test_handle(self, mock_process_queue):
+        mock_process_queue.side_effect = [2, 2, 1, 0]
+        stdout = StringIO()
+        call_command('process_search_queue', batch_size=2, stdout=stdout)
+        self.assertEqual(mock_process_queue.call_count, 4)
+        mock_process_queue.assert_called_with(2)
+        self.assertEqual(stdout.getvalue(), 'Processed 5 queued objects\n')
+
+
+class SendContactMessagesCommandTestCase(TestCase):
+    @patch('base.management.commands.send_contact_messages.send_pending')
+    def test_handle(self, mock_send_pending):
+        mock_send_pending.side_effect = [10, 3, 0]
+        stdout = StringIO()
+        call_command(
+            'send_contact_messages', batch_size=10, max_attempts=3,
+            stdout=stdout)
+        self.assertEqual(mock_send_pending.call_count, 3)
+        mock_send_pending.assert_called_with(10, 3)
+        self.assertEqual(stdout.getvalue(), 'Sent 13 contact messages\n')
+
+
+class DumpRequestProfilesCommandTestCase(TestCase):
+    def setUp(self):
+        self.dump_dir = tempfile.mkdtemp()
+        self.settings_override = override_settings(
+            PROFILING_DUMP_DIR=self.dump_dir)
+        self.settings_override.enable()
+        self.handler = signal.getsignal(profiling.DUMP_SIGNAL)
+        profiling.install_dump_handler()
+        clear_profiles()
+        for total_ms, url_name in [(10, 'home'), (30, 'home'), (50, 'news')]:
+            record_profile({
+                'url_name': url_name, 'path': '/', 'queries': 2,
+                'db_ms': 1.0, 'view_ms': 1.0, 'render_ms': 1.0,
+                'total_ms': total_ms,
+            })
+
+    def tearDown(self):
+        signal.signal(profiling.DUMP_SIGNAL, self.handler)
+        self.settings_override.disable()
+        shutil.rmtree(self.dump_dir)
+
+    def test_handle(self):
+        stdout = StringIO()
+        call_command('dump_request_profiles', os.getpid(), stdout=stdout)
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[1].startswith('news '))
+        self.assertTrue(lines[2].startswith('home '))
+        self.assertEqual(len(get_profiles()), 3)
+        self.assertEqual(os.listdir(self.dump_dir), [])
+
+    def test_handle_json(self):
+        stdout = StringIO()
+        call_command(
+            'dump_request_profiles', os.getpid(), as_json=True,
+            url_name='home', clear=True, stdout=stdout)
+        profiles = json.loads(stdout.getvalue())
+        self.assertEqual([p['total_ms'] for p in profiles], [10, 30])
+        self.assertEqual(get_profiles(), [])
+
+    def test_handle_unresponsive(self):
+        # a process without the handler is stopped by the signal
+        process = subprocess.Popen(['sleep', '10'])
+        self.addCleanup(process.wait)
+        with self.assertRaises(CommandError):
+            call_command(
+                'dump_request_profiles', process.pid, timeout=0.2,
+                stdout=StringIO())
+        self.assertEqual(os.listdir(self.dump_dir), [])
+
+
+class ReindexSearchCommandTestCase(TestCase):
+    def setUp(self):
+        self.index_path = tempfile.mkdtemp()
+        self.settings_override = override_settings(HAYSTACK_CONNECTIONS={
+            'default': dict(
+                settings.HAYSTACK_CONNECTIONS['default'],
+                PATH=self.index_path),
+        })
+        self.settings_override.enable()
+        # haystack reads its connections from the settings only once
+        self.connections_info = connections.connections_info
+        connections.connections_info = settings.HAYSTACK_CONNECTIONS
+        connections.reload('default')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        connections.connections_info = self.connections_info
+        connections.reload('default')
+        shutil.rmtree(self.index_path)
+
+    def test_handle(self):
+        for _ in range(3):
+            ReviewFactory(is_published=True)
+        ReviewFactory(is_published=False)
+        stdout = StringIO()
+        call_command(
+            'reindex_search', workers=1, chunk_size=2, batch_size=2,
+            stdout=stdout)
+        self.assertIn('Indexed 7 documents from 7 objects', stdout.getvalue())
+
+        results = SearchQuerySet().models(Review)
+        self.assertEqual(results.count(), 3)
+        call_command('reindex_search', 'base.review', workers=1, stdout=stdout)
+        self.assertEqual(results.all().count(), 3)
+
+    def test_handle_unknown_model(self):
+        with self.assertRaises(CommandError):
+            call_command('reindex_search', 'base.reviewer', workers=1)
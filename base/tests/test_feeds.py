@@ -1,6 +1,8 @@
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
 from django.utils import timezone
 
 from base.feeds import AggregatedFeed
@@ -12,12 +14,38 @@ from base.tests.fixtures import (
 
 class AggregatedFeedTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.feed = AggregatedFeed()
 
     def test_class_attributes(self):
         self.assertEqual(AggregatedFeed.title, 'CTX Live Theatre')
         self.assertEqual(AggregatedFeed.link, '/')
 
+    def test_call(self):
+        news = ArtsNewsFactory()
+        url = reverse('aggregated_rss_feed')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, news.title)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url)
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+            not_modified_since = self.client.get(
+                url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified_since.status_code, 304)
+
+        news.title = 'A new headline'
+        news.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'A new headline')
+
     def test_items(self):
         now = timezone.now()
         one_day_ago = now - timedelta(days=1)
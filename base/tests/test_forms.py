@@ -1,17 +1,21 @@
+from tempfile import TemporaryDirectory
+
 from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.forms import ValidationError
 from django.template.defaultfilters import filesizeformat
 from django.test import TestCase, override_settings
 from mock import patch
 
-from base.forms import ContactForm
+from base.forms import ContactForm, FilteredSearchForm
+from base.models import ContactMessage
 
 
 class MockAttachment(object):
     """Dummy attachment class for tests"""
     def __init__(self, name='name', size=100):
         self.name = name
-        self._size = size
+        self.size = size
 
     def read(self):
         pass
@@ -41,12 +45,18 @@ class ContactFormTestCase(TestCase):
                     u'Please keep your attachments smaller than {limit}. '
                     u'This file is {size}'.format(
                         limit=filesizeformat(settings.MAX_UPLOAD_SIZE),
-                        size=filesizeformat(large_attachment._size)
+                        size=filesizeformat(large_attachment.size)
                     )
                 )
             ])
         )
 
+    def test_clean_attachment_skipped(self):
+        form = ContactForm(skipped_files=set(['attachment']))
+        form.cleaned_data = {}
+        with self.assertRaises(ValidationError):
+            form.clean_attachment()
+
     def test_get_subject(self):
         self.form.cleaned_data = {
             'email': 'foo@bar.com',
@@ -69,22 +79,44 @@ class ContactFormTestCase(TestCase):
             )
         )
 
-    @override_settings(DEFAULT_CONTACT_EMAILS=['foo@bar.com'])
-    def test_send_message(self):
+    def test_queue_message(self):
         self.form.cleaned_data = {}
-        with patch('django.core.mail.EmailMessage.send') as mock_send:
-            with patch.object(self.form, 'clean') as mock_clean:
-                self.form.send_message()
+        with patch.object(self.form, 'clean') as mock_clean:
+            with patch.object(ContactMessage.objects, 'create'):
+                self.form.queue_message()
         mock_clean.assert_called_once_with()
-        mock_send.assert_called_once_with()
 
-        attachment = MockAttachment()
         self.form.cleaned_data = {
+            'subject': 'inquiry',
+            'email': 'foo@bar.com',
             'message': 'This is the message.',
-            'attachment': attachment,
+            'attachment': SimpleUploadedFile('notice.txt', b'contents'),
         }
-        with patch('django.core.mail.EmailMessage.send') as mock_send:
-            with patch('django.core.mail.EmailMessage.attach') as mock_attach:
-                self.form.send_message()
-        mock_attach.assert_called_once_with(attachment.name, attachment.read())
-        mock_send.assert_called_once_with()
+        storage = ContactMessage._meta.get_field('attachment').storage
+        with TemporaryDirectory() as location, \
+                patch.object(storage, 'location', location):
+            message = self.form.queue_message()
+            self.assertEqual(message.subject, self.form.get_subject())
+            self.assertEqual(message.body, 'This is the message.')
+            self.assertEqual(message.reply_to, 'foo@bar.com')
+            self.assertIsNone(message.sent_on)
+            self.assertTrue(message.attachment.name.endswith('/notice.txt'))
+            self.assertEqual(message.attachment.read(), b'contents')
+
+
+class FilteredSearchFormTestCase(TestCase):
+    def test_clean(self):
+        self.assertTrue(FilteredSearchForm({
+            'q': 'hamlet', 'company': 'Rude "Mechs"'}).is_valid())
+        form = FilteredSearchForm({'q': 'hamlet', 'city': 'A"b\'c'})
+        self.assertFalse(form.is_valid())
+        self.assertIn('city', form.errors)
+
+    def test_get_narrow_query(self):
+        form = FilteredSearchForm()
+        self.assertEqual(
+            form.get_narrow_query('city', 'Round Rock'),
+            'city_exact:"Round Rock"')
+        self.assertEqual(
+            form.get_narrow_query('company', 'Rude "Mechs"'),
+            'company_exact:\'Rude "Mechs"\'')
@@ -0,0 +1,122 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from mock import Mock, patch
+
+from base.generations import (
+    bump_generation, bump_search_index_generation, bump_tag_generation,
+    get_generation, get_generations, get_or_set_versioned,
+    get_search_index_generation, get_tag_generations, tracking_reads
+)
+from base.models import ArtsNews, ProductionPoster, Review
+from base.tests.fixtures import ArtsNewsFactory, ProductionPosterFactory
+
+
+class GenerationsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_generation(self):
+        generation = get_generation(ArtsNews)
+        self.assertIsInstance(generation, int)
+        self.assertEqual(get_generation(ArtsNews), generation)
+
+    def test_bump_generation(self):
+        generation = get_generation(ArtsNews)
+        bump_generation(ArtsNews)
+        self.assertEqual(get_generation(ArtsNews), generation + 1)
+
+        cache.clear()
+        with patch('time.time', return_value=generation / 1000.0 + 1):
+            self.assertGreater(bump_generation(ArtsNews), generation)
+
+    def test_bump_search_index_generation(self):
+        generation = get_search_index_generation()
+        self.assertEqual(get_search_index_generation(), generation)
+        bump_search_index_generation()
+        self.assertEqual(get_search_index_generation(), generation + 1)
+
+    def test_get_generations(self):
+        self.assertEqual(
+            get_generations(ArtsNews, Review),
+            '%s.%s' % (get_generation(ArtsNews), get_generation(Review))
+        )
+
+    def test_tracking_reads(self):
+        get_generation(Review)
+        with tracking_reads() as models:
+            get_generations(ArtsNews, ProductionPoster)
+        get_generation(Review)
+        self.assertEqual(models, set([ArtsNews, ProductionPoster]))
+
+    def test_tag_generations(self):
+        generations = get_tag_generations(['a', 'b'])
+        self.assertEqual(sorted(generations), ['a', 'b'])
+        self.assertEqual(get_tag_generations(['a', 'b']), generations)
+
+        bump_tag_generation('a')
+        self.assertEqual(get_tag_generations(['a']), {
+            'a': generations['a'] + 1})
+        self.assertEqual(get_tag_generations(['b']), {'b': generations['b']})
+
+    def test_signals_bump_generation(self):
+        generation = get_generation(ArtsNews)
+        news = ArtsNewsFactory()
+        self.assertEqual(get_generation(ArtsNews), generation + 1)
+        news.delete()
+        self.assertEqual(get_generation(ArtsNews), generation + 2)
+
+        generation = get_generation(ProductionPoster)
+        ProductionPosterFactory()
+        self.assertEqual(get_generation(ProductionPoster), generation)
+
+    def test_get_or_set_versioned(self):
+        loader = Mock(return_value='value')
+        self.assertEqual(
+            get_or_set_versioned('name', (ArtsNews,), loader), 'value')
+        self.assertEqual(
+            get_or_set_versioned('name', (ArtsNews,), loader), 'value')
+        self.assertEqual(loader.call_count, 1)
+
+        get_or_set_versioned('name', (ArtsNews,), loader, 'other')
+        self.assertEqual(loader.call_count, 2)
+
+        bump_generation(ArtsNews)
+        get_or_set_versioned('name', (ArtsNews,), loader)
+        self.assertEqual(loader.call_count, 3)
+
+    @override_settings(VERSIONED_CACHE_TIMEOUT=60)
+    def test_get_or_set_versioned_timeout(self):
+        with patch.object(cache, 'get_or_set') as mock_get_or_set:
+            get_or_set_versioned('name', (ArtsNews,), Mock())
+        self.assertEqual(mock_get_or_set.call_args[0][2], 60)
+
+    def test_shared_cache(self):
+        # two processes, each with its own instance of the shared backend
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        first_cache = FileBasedCache(location, {})
+        second_cache = FileBasedCache(location, {})
+        loader = Mock(return_value='value')
+
+        with patch('base.generations.cache', first_cache):
+            get_or_set_versioned('name', (ArtsNews,), loader)
+        with patch('base.generations.cache', second_cache):
+            get_or_set_versioned('name', (ArtsNews,), loader)
+            self.assertEqual(loader.call_count, 1)
+            bump_generation(ArtsNews)
+        with patch('base.generations.cache', first_cache):
+            get_or_set_versioned('name', (ArtsNews,), loader)
+        self.assertEqual(loader.call_count, 2)
+
+    def test_generation_tag(self):
+        template = Template(
+            "{% load generations %}{% generation 'ArtsNews' 'Review' %}")
+        self.assertEqual(
+            template.render(Context()),
+            get_generations(ArtsNews, Review)
+        )
@@ -0,0 +1,84 @@
+from django.test import TestCase
+from haystack import connections
+from haystack.backends.whoosh_backend import WhooshSearchBackend
+from mock import patch
+
+from base.indexing import enqueue, is_indexed, process_queue
+from base.models import Review, Reviewer, SearchQueueEntry
+from base.tests.fixtures import ArtsNewsFactory, ReviewFactory
+
+
+class IsIndexedTestCase(TestCase):
+    def test_is_indexed(self):
+        self.assertTrue(is_indexed(Review))
+        self.assertFalse(is_indexed(Reviewer))
+
+
+class EnqueueTestCase(TestCase):
+    def test_enqueue(self):
+        enqueue(Review, 1, SearchQueueEntry.UPDATE)
+        entry = SearchQueueEntry.objects.get()
+        self.assertEqual(entry.model_label, 'base.review')
+        self.assertEqual(entry.object_pk, 1)
+        self.assertEqual(entry.action, SearchQueueEntry.UPDATE)
+
+        enqueue(Review, 1, SearchQueueEntry.DELETE)
+        later_entry = SearchQueueEntry.objects.get()
+        self.assertEqual(later_entry.action, SearchQueueEntry.DELETE)
+        self.assertGreaterEqual(later_entry.queued_on, entry.queued_on)
+
+    def test_signals(self):
+        review = ReviewFactory()
+        review.save()
+        self.assertEqual(
+            SearchQueueEntry.objects.filter(model_label='base.review').count(),
+            1)
+        self.assertFalse(
+            SearchQueueEntry.objects.filter(model_label='base.reviewer'))
+
+        review.delete()
+        self.assertEqual(
+            SearchQueueEntry.objects.get(model_label='base.review').action,
+            SearchQueueEntry.DELETE)
+
+
+@patch.object(WhooshSearchBackend, 'remove')
+@patch.object(WhooshSearchBackend, 'update')
+class ProcessQueueTestCase(TestCase):
+    def test_process_queue(self, mock_update, mock_remove):
+        published = ReviewFactory(is_published=True)
+        unpublished = ReviewFactory(is_published=False)
+        news = ArtsNewsFactory()
+        SearchQueueEntry.objects.all().delete()
+        for obj in [published, unpublished, news]:
+            enqueue(type(obj), obj.pk, SearchQueueEntry.UPDATE)
+        enqueue(Review, 1000, SearchQueueEntry.DELETE)
+
+        self.assertEqual(process_queue(), 4)
+        self.assertFalse(SearchQueueEntry.objects.exists())
+        index = connections['default'].get_unified_index()
+        mock_update.assert_any_call(index.get_index(Review), [published])
+        mock_update.assert_any_call(index.get_index(type(news)), [news])
+        removed = set(call[0][0] for call in mock_remove.call_args_list)
+        self.assertEqual(
+            removed,
+            set(['base.review.%s' % unpublished.pk, 'base.review.1000']))
+
+    def test_process_queue_batches(self, mock_update, mock_remove):
+        for _ in range(3):
+            ArtsNewsFactory()
+        self.assertEqual(process_queue(batch_size=2), 2)
+        self.assertEqual(SearchQueueEntry.objects.count(), 1)
+        self.assertEqual(process_queue(batch_size=2), 1)
+        self.assertEqual(process_queue(batch_size=2), 0)
+
+    def test_process_queue_requeued(self, mock_update, mock_remove):
+        news = ArtsNewsFactory()
+
+        def requeue(*args, **kwargs):
+            news.save()
+        mock_update.side_effect = requeue
+
+        self.assertEqual(process_queue(), 1)
+        self.assertEqual(
+            SearchQueueEntry.objects.get().object_pk, news.pk)
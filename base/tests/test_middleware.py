@@ -1,11 +1,18 @@
 import pytz
 
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
 from django.http import HttpRequest
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.urls import reverse
 from django.utils import timezone
 from mock import patch
 
-from base.middleware import TexasTimezoneMiddleware
+from base.middleware import (
+    PageCacheMiddleware, ProfilingMiddleware, TexasTimezoneMiddleware)
+from base.profiling import clear_profiles, get_profiles
+from base.tests.fixtures import ProductionFactory, ReviewFactory
 
 
 class TexasTimezoneMiddlewareTestCase(TestCase):
@@ -23,3 +30,96 @@ class TexasTimezoneMiddlewareTestCase(TestCase):
             with patch.object(timezone, 'activate'):
                 middleware.process_request(request)
         mock_timezone.assert_called_once_with('US/Eastern')
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(PAGE_CACHE_ENABLED=False)
+    def test_init(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            PageCacheMiddleware()
+
+    def test_call(self):
+        production = ProductionFactory(play__title='Hamlet')
+        other_production = ProductionFactory(play__title='Macbeth')
+        url = production.get_absolute_url()
+        other_url = other_production.get_absolute_url()
+        content = self.client.get(url).content
+        self.client.get(other_url)
+        self.client.get(reverse('productions_upcoming'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.content, content)
+
+        # only the pages showing or listing the saved production expire
+        production.play.title = 'Hedda Gabler'
+        production.play.save()
+        production.save()
+        with self.assertNumQueries(0):
+            self.client.get(other_url)
+        self.assertContains(
+            self.client.get(production.get_absolute_url()), 'Hedda Gabler')
+        self.assertContains(
+            self.client.get(reverse('productions_upcoming')), 'Hedda Gabler')
+
+    def test_call_timezone(self):
+        url = reverse('about')
+        self.client.get(url)
+        session = self.client.session
+        session['timezone'] = 'US/Eastern'
+        session.save()
+        with patch('base.pagecache.set_page') as mock_set_page:
+            self.client.get(url)
+        self.assertTrue(mock_set_page.called)
+
+    def test_call_uncached(self):
+        ReviewFactory(is_published=True)
+        User.objects.create_user('critic', password='password')
+        self.client.get(reverse('contact'))
+        self.client.login(username='critic', password='password')
+        self.client.get(reverse('reviews'))
+        with patch('base.pagecache.get_page') as mock_get_page:
+            response = self.client.get(reverse('reviews'))
+            self.assertEqual(response.status_code, 200)
+            self.client.logout()
+            self.client.get(reverse('contact'))
+            self.client.post(reverse('reviews'))
+        self.assertFalse(mock_get_page.called)
+
+
+@override_settings(PROFILING_ENABLED=True)
+class ProfilingMiddlewareTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_profiles()
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_init(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware()
+
+    def test_call(self):
+        ReviewFactory(is_published=True)
+        response = self.client.get(reverse('reviews'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('render;dur=', response['Server-Timing'])
+
+        profile, = get_profiles()
+        self.assertEqual(profile['url_name'], 'reviews')
+        self.assertEqual(profile['path'], reverse('reviews'))
+        self.assertEqual(profile['status'], 200)
+        self.assertGreater(profile['queries'], 0)
+        self.assertGreater(profile['render_ms'], 0)
+        self.assertGreaterEqual(
+            profile['total_ms'], profile['view_ms'] + profile['render_ms'])
+
+    def test_call_unresolved(self):
+        response = self.client.get('/does-not-exist/')
+        self.assertEqual(response.status_code, 404)
+        profile, = get_profiles()
+        self.assertIsNone(profile['url_name'])
+        self.assertEqual(profile['render_ms'], 0)
@@ -1,4 +1,4 @@
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from django.test import TestCase
 from django.utils import timezone
@@ -6,7 +6,7 @@ from mock import patch
 
 from base.models import (
     Audition, AuditionManager, DaysBase, Production, Reviewer, Venue, ArtsNews,
-    ProductionCompany, SlideshowImage
+    ProductionCompany, SlideshowImage, mask_to_week
 )
 from base.tests.fixtures import (
     AddressFactory, ArtsNewsFactory, AuditionFactory, ExternalReviewFactory,
@@ -115,6 +115,16 @@ class DaysBaseTestCase(TestCase):
             [True, False, True, True, False, True, False]
         )
 
+    def test_get_schedule_mask(self):
+        days_base = DaysBase()
+        self.assertEqual(days_base.get_schedule_mask(), 0)
+        days_base = DaysBase(on_monday=True, on_saturday=True, on_sunday=True)
+        self.assertEqual(days_base.get_schedule_mask(), 0b1100001)
+        self.assertEqual(
+            mask_to_week(days_base.get_schedule_mask()),
+            days_base._week_booleans()
+        )
+
     def test_has_weekly_schedule(self):
         days_base = DaysBase()
         self.assertFalse(days_base.has_weekly_schedule())
@@ -179,6 +189,30 @@ class AuditionManagerTestCase(TestCase):
         self.assertIn(ongoing_audition, upcoming)
         self.assertIn(future_audition, upcoming)
 
+    def test_filter_past(self):
+        today = timezone.now()
+        yesterday = today - timedelta(days=1)
+        tomorrow = today + timedelta(days=1)
+
+        past_audition = AuditionFactory(start_date=yesterday)
+        ended_audition = AuditionFactory(
+            start_date=today - timedelta(days=3),
+            end_date=yesterday
+        )
+        ongoing_audition = AuditionFactory(
+            start_date=yesterday,
+            end_date=tomorrow
+        )
+        future_audition = AuditionFactory(start_date=tomorrow)
+
+        past = Audition.objects.filter_past()
+        self.assertEqual(list(past), [past_audition, ended_audition])
+        self.assertEqual(
+            set(past) | set(Audition.objects.filter_upcoming()),
+            set(Audition.objects.all()))
+        self.assertNotIn(ongoing_audition, past)
+        self.assertNotIn(future_audition, past)
+
 
 class AuditionTestCase(TestCase):
     def test_assigned_manager(self):
@@ -381,6 +415,47 @@ class ProductionCompanyManagerTestCase(TestCase):
         self.assertNotIn(inactive_audition_company, active_companies)
         self.assertNotIn(inactive_company, active_companies)
 
+    def test_update_activity(self):
+        company = ProductionCompanyFactory()
+        production = ProductionFactory(
+            production_company=company, start_date=date(2015, 3, 1))
+        AuditionFactory(
+            production_company=company, start_date=date(2015, 1, 1))
+        company.refresh_from_db()
+        self.assertEqual(company.last_production_date, date(2015, 3, 1))
+        self.assertEqual(company.last_audition_date, date(2015, 1, 1))
+
+        # bulk updates bypass the signals until activity is recomputed
+        Production.objects.update(start_date=date(2016, 3, 1))
+        company.refresh_from_db()
+        self.assertEqual(company.last_production_date, date(2015, 3, 1))
+        self.assertEqual(ProductionCompany.objects.update_activity(), 1)
+        company.refresh_from_db()
+        self.assertEqual(company.last_production_date, date(2016, 3, 1))
+
+        production.delete()
+        company.refresh_from_db()
+        self.assertIsNone(company.last_production_date)
+        self.assertEqual(company.last_audition_date, date(2015, 1, 1))
+
+    def test_update_activity_reassigned(self):
+        company = ProductionCompanyFactory()
+        other_company = ProductionCompanyFactory()
+        production = ProductionFactory(
+            production_company=company, start_date=date(2015, 3, 1))
+        audition = AuditionFactory(
+            production_company=company, start_date=date(2015, 1, 1))
+
+        production.production_company = other_company
+        production.save()
+        audition.production_company = None
+        audition.save()
+        company.refresh_from_db()
+        other_company.refresh_from_db()
+        self.assertIsNone(company.last_production_date)
+        self.assertIsNone(company.last_audition_date)
+        self.assertEqual(other_company.last_production_date, date(2015, 3, 1))
+
 
 class ProductionCompanyTestCase(TestCase):
     def setUp(self):
@@ -427,6 +502,50 @@ class ProductionCompanyTestCase(TestCase):
 
 
 class ProductionManagerTestCase(TestCase):
+    def test_with_tile_data(self):
+        reviewed = ProductionFactory(
+            production_company=ProductionCompanyFactory())
+        published_review = ReviewFactory(
+            production=reviewed, is_published=True)
+        ReviewFactory(production=reviewed, is_published=False)
+        external_review = ExternalReviewFactory(production=reviewed)
+        unreviewed = ProductionFactory()
+
+        with self.assertNumQueries(3):
+            productions = {
+                production.pk: production
+                for production in Production.objects.with_tile_data()
+            }
+        with self.assertNumQueries(0):
+            production = productions[reviewed.pk]
+            self.assertTrue(production.has_reviews)
+            self.assertTrue(production.has_external_reviews)
+            self.assertEqual(
+                production.published_reviews(), [published_review])
+            self.assertEqual(
+                list(production.externalreview_set.all()), [external_review])
+            self.assertIsNotNone(production.venue.address.city)
+            self.assertIsNotNone(production.production_company.name)
+            self.assertIsNotNone(production.play.title)
+
+            production = productions[unreviewed.pk]
+            self.assertFalse(production.has_reviews)
+            self.assertFalse(production.has_external_reviews)
+
+    def test_with_tile_data_queryset(self):
+        production = ProductionFactory()
+        ProductionFactory()
+        current = Production.objects.filter_current()
+        self.assertNotIn('has_reviews', current.query.annotations)
+
+        productions = Production.objects.with_tile_data(
+            current.filter(pk=production.pk))
+        with self.assertNumQueries(3):
+            self.assertEqual(list(productions), [production])
+        with self.assertNumQueries(0):
+            self.assertFalse(productions[0].has_reviews)
+            self.assertEqual(productions[0].published_reviews(), [])
+
     def test_filter_in_range(self):
         range_start = timezone.now()
         range_end = range_start + timedelta(days=5)
@@ -478,6 +597,43 @@ class ProductionManagerTestCase(TestCase):
         self.assertIn(current_overlap_start, in_range)
         self.assertIn(current_overlap_end, in_range)
 
+    def test_filter_performing(self):
+        monday = date(2016, 8, 1)
+        weekend = ProductionFactory(
+            start_date=monday,
+            end_date=monday + timedelta(days=13),
+            on_saturday=True,
+            on_sunday=True,
+        )
+        unscheduled = ProductionFactory(start_date=monday + timedelta(days=2))
+
+        self.assertNotIn(weekend, Production.objects.filter_performing(monday))
+        performing = Production.objects.filter_performing(
+            monday, monday + timedelta(days=5))
+        self.assertIn(weekend, performing)
+        self.assertIn(unscheduled, performing)
+        self.assertEqual(len(performing), 2)
+
+    def test_filter_tonight(self):
+        tonight = ProductionFactory(start_date=timezone.localdate())
+        ProductionFactory(start_date=timezone.localdate() - timedelta(days=1))
+        self.assertEqual(list(Production.objects.filter_tonight()), [tonight])
+
+    def test_filter_weekdays(self):
+        weekend = ProductionFactory(on_saturday=True, on_sunday=True)
+        weekday = ProductionFactory(on_monday=True, on_friday=True)
+        unscheduled = ProductionFactory()
+
+        saturday = Production.objects.filter_weekdays(5)
+        self.assertIn(weekend, saturday)
+        self.assertNotIn(weekday, saturday)
+        self.assertNotIn(unscheduled, saturday)
+
+        friday_or_sunday = Production.objects.filter_weekdays(4, 6)
+        self.assertIn(weekend, friday_or_sunday)
+        self.assertIn(weekday, friday_or_sunday)
+        self.assertNotIn(unscheduled, friday_or_sunday)
+
     def test_filter_current(self):
         today = timezone.now()
         yesterday = today - timedelta(days=1)
@@ -512,11 +668,71 @@ class ProductionTestCase(TestCase):
 
     def test_save(self):
         production = ProductionFactory(pk=None, slug=None)
+        production.on_tuesday = True
         with patch('django.db.models.Model.save') as mock_save:
             production.save()
         self.assertEqual(production.slug, production.get_slug())
+        self.assertEqual(production.schedule_mask, 0b10)
         mock_save.assert_called_once_with()
 
+    def test_save_update_fields(self):
+        production = ProductionFactory()
+        production.on_monday = True
+        production.save(update_fields=['on_monday'])
+        production.refresh_from_db()
+        self.assertEqual(production.schedule_mask, 0b1)
+        self.assertEqual(
+            production.get_performance_dates(),
+            list(production.productionoccurrence_set.values_list(
+                'date', flat=True)))
+
+    def test_update_day_fields(self):
+        production = ProductionFactory()
+        with self.assertRaises(ValueError):
+            Production.objects.update(on_monday=True)
+        with self.assertRaises(ValueError):
+            production.venue.production_set.update(on_sunday=True)
+        Production.objects.update(event_details='Details')
+        production.refresh_from_db()
+        self.assertEqual(production.event_details, 'Details')
+        self.assertEqual(production.schedule_mask, 0)
+
+    def test_get_performance_dates(self):
+        monday = date(2016, 8, 1)
+        production = ProductionFactory(start_date=monday)
+        self.assertEqual(production.get_performance_dates(), [monday])
+
+        production = ProductionFactory(
+            start_date=monday,
+            end_date=monday + timedelta(days=8),
+            on_monday=True,
+            on_friday=True,
+        )
+        self.assertEqual(
+            production.get_performance_dates(),
+            [monday, monday + timedelta(days=4), monday + timedelta(days=7)]
+        )
+
+    def test_rebuild_occurrences(self):
+        monday = date(2016, 8, 1)
+        production = ProductionFactory(
+            start_date=monday,
+            end_date=monday + timedelta(days=2),
+        )
+        self.assertEqual(
+            list(production.productionoccurrence_set.values_list(
+                'date', flat=True)),
+            [monday, monday + timedelta(days=1), monday + timedelta(days=2)]
+        )
+
+        production.on_tuesday = True
+        production.save()
+        self.assertEqual(
+            list(production.productionoccurrence_set.values_list(
+                'date', flat=True)),
+            [monday + timedelta(days=1)]
+        )
+
     def test_duration(self):
         production = ProductionFactory()
         self.assertEqual(
@@ -637,6 +853,33 @@ class PlayTestCase(TestCase):
 
 
 class VenueManagerTestCase(TestCase):
+    def test_get_directory(self):
+        austin_venue = VenueFactory(
+            name='B', address=AddressFactory(city='Austin'))
+        other_austin_venue = VenueFactory(
+            name='A', address=AddressFactory(city='Austin'))
+        bastrop_venue = VenueFactory(address=AddressFactory(city='Bastrop'))
+        ProductionFactory(venue=bastrop_venue)
+        company = ProductionCompanyFactory()
+        company.home_venues.add(austin_venue)
+
+        with self.assertNumQueries(2):
+            directory = Venue.objects.get_directory()
+            self.assertEqual(directory, [
+                ('Austin', [other_austin_venue, austin_venue]),
+                ('Bastrop', [bastrop_venue]),
+            ])
+            austin_venues = directory[0][1]
+            self.assertEqual(
+                list(austin_venues[1].productioncompany_set.all()), [company])
+            self.assertEqual(austin_venues[1].address.city, 'Austin')
+            self.assertFalse(austin_venues[1].has_productions)
+            self.assertTrue(directory[1][1][0].has_productions)
+
+        directory = Venue.objects.get_directory(
+            Venue.objects.filter(pk=bastrop_venue.pk))
+        self.assertEqual(directory, [('Bastrop', [bastrop_venue])])
+
     def test_filter_cities(self):
         city1 = 'Austin'
         city2 = 'San Antonio'
@@ -664,6 +907,42 @@ class VenueManagerTestCase(TestCase):
         self.assertNotIn(inactive_venue, active_venues)
         self.assertNotIn(empty_venue, active_venues)
 
+    def test_update_activity(self):
+        venue = VenueFactory()
+        other_venue = VenueFactory()
+        ProductionFactory(venue=venue, start_date=date(2015, 3, 1))
+        venue.refresh_from_db()
+        self.assertEqual(venue.last_production_date, date(2015, 3, 1))
+
+        Production.objects.update(venue=other_venue)
+        self.assertEqual(Venue.objects.update_activity([venue.pk]), 1)
+        venue.refresh_from_db()
+        other_venue.refresh_from_db()
+        self.assertIsNone(venue.last_production_date)
+        self.assertIsNone(other_venue.last_production_date)
+        Venue.objects.update_activity()
+        other_venue.refresh_from_db()
+        self.assertEqual(other_venue.last_production_date, date(2015, 3, 1))
+
+    def test_update_activity_reassigned(self):
+        venue = VenueFactory()
+        other_venue = VenueFactory()
+        production = ProductionFactory(
+            venue=venue, start_date=date(2015, 3, 1))
+
+        production = Production.objects.get(pk=production.pk)
+        production.venue = other_venue
+        production.save()
+        venue.refresh_from_db()
+        other_venue.refresh_from_db()
+        self.assertIsNone(venue.last_production_date)
+        self.assertEqual(other_venue.last_production_date, date(2015, 3, 1))
+
+        production.venue = venue
+        production.save()
+        other_venue.refresh_from_db()
+        self.assertIsNone(other_venue.last_production_date)
+
 
 class VenueTestCase(TestCase):
     def test_unicode(self):
@@ -779,9 +1058,51 @@ class ReviewerManagerTestCase(TestCase):
         self.assertNotIn(self.inactive_reviewer, active)
 
     def test_filter_inactive(self):
-        active = Reviewer.objects.filter_inactive()
-        self.assertIn(self.inactive_reviewer, active)
-        self.assertNotIn(self.active_reviewer, active)
+        new_reviewer = ReviewerFactory()
+        inactive = Reviewer.objects.filter_inactive()
+        self.assertIn(self.inactive_reviewer, inactive)
+        self.assertIn(new_reviewer, inactive)
+        self.assertNotIn(self.active_reviewer, inactive)
+
+    def test_annotate_review_counts(self):
+        published = self.active_reviewer.review_set.get()
+        ReviewFactory(is_published=False, reviewer=self.active_reviewer)
+        reviewer = Reviewer.objects.annotate_review_counts(
+            Reviewer.objects.filter(pk=self.active_reviewer.pk)).get()
+        self.assertEqual(reviewer.total_review_count, 2)
+        self.assertEqual(reviewer.published_review_count, 1)
+        self.assertEqual(reviewer.last_published_on, published.published_on)
+
+        new_reviewer = Reviewer.objects.annotate_review_counts().get(
+            pk=ReviewerFactory().pk)
+        self.assertEqual(new_reviewer.total_review_count, 0)
+        self.assertIsNone(new_reviewer.last_published_on)
+
+    def test_update_activity(self):
+        self.active_reviewer.refresh_from_db()
+        latest_review = self.active_reviewer.review_set.get()
+        self.assertEqual(
+            self.active_reviewer.last_review_on, latest_review.published_on)
+
+        unpublished = ReviewFactory(reviewer=self.active_reviewer)
+        self.active_reviewer.refresh_from_db()
+        self.assertEqual(
+            self.active_reviewer.last_review_on, latest_review.published_on)
+
+        unpublished.publish()
+        self.active_reviewer.refresh_from_db()
+        self.assertEqual(
+            self.active_reviewer.last_review_on, unpublished.published_on)
+
+    def test_update_activity_reassigned(self):
+        other_reviewer = ReviewerFactory()
+        review = self.active_reviewer.review_set.get()
+        review.reviewer = other_reviewer
+        review.save()
+        self.active_reviewer.refresh_from_db()
+        other_reviewer.refresh_from_db()
+        self.assertIsNone(self.active_reviewer.last_review_on)
+        self.assertEqual(other_reviewer.last_review_on, review.published_on)
 
 
 class ReviewerTestCase(TestCase):
@@ -0,0 +1,202 @@
+import email
+import smtplib
+from datetime import timedelta
+from io import BytesIO
+from tempfile import TemporaryDirectory
+
+from django.core import mail
+from django.core.mail.backends.smtp import EmailBackend as SMTPBackend
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from mock import patch
+
+from base.models import ContactMessage
+from base.outbox import (
+    build_email, claim, deliver, get_pending, send_pending, write_mime)
+
+
+class FakeSMTP(object):
+    """Records the data sent to it by send_spooled"""
+    def __init__(self, data_reply=(250, b'OK')):
+        self.commands = []
+        self.data = b''
+        self.data_reply = data_reply
+
+    def ehlo_or_helo_if_needed(self):
+        pass
+
+    def mail(self, sender):
+        self.commands.append(('mail', sender))
+        return 250, b'OK'
+
+    def rcpt(self, recipient):
+        self.commands.append(('rcpt', recipient))
+        return 250, b'OK'
+
+    def docmd(self, command):
+        self.commands.append((command,))
+        return 354, b'Go ahead'
+
+    def rset(self):
+        pass
+
+    def send(self, data):
+        self.data += data
+
+    def getreply(self):
+        return self.data_reply
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@override_settings(DEFAULT_CONTACT_EMAILS=['editor@example.com'])
+class SendPendingTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        storage = ContactMessage._meta.get_field('attachment').storage
+        patcher = patch.object(storage, 'location', self.tempdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_message(self, **kwargs):
+        kwargs.setdefault('subject', 'Inquiry from foo@bar.com')
+        kwargs.setdefault('body', 'Hello')
+        kwargs.setdefault('reply_to', 'foo@bar.com')
+        return ContactMessage.objects.create(**kwargs)
+
+    def test_send_pending(self):
+        message = self.create_message()
+        message.attachment.save(
+            'notice.txt', ContentFile(b'contents'), save=True)
+        attachment_name = message.attachment.name
+        self.create_message(subject='Correction from foo@bar.com')
+
+        with patch('base.outbox.get_connection',
+                   wraps=mail.get_connection) as mock_get_connection:
+            self.assertEqual(send_pending(), 2)
+        mock_get_connection.assert_called_once_with()
+
+        self.assertEqual(len(mail.outbox), 2)
+        email = mail.outbox[0]
+        self.assertEqual(email.subject, 'Inquiry from foo@bar.com')
+        self.assertEqual(email.to, ['editor@example.com'])
+        self.assertEqual(email.extra_headers['Reply-To'], 'foo@bar.com')
+        self.assertEqual(
+            email.attachments, [('notice.txt', 'contents', 'text/plain')])
+
+        message.refresh_from_db()
+        self.assertIsNotNone(message.sent_on)
+        self.assertEqual(message.attempts, 1)
+        self.assertFalse(message.attachment)
+        self.assertFalse(
+            message.attachment.storage.exists(attachment_name))
+        self.assertEqual(send_pending(), 0)
+
+    def test_send_pending_retries(self):
+        failing = self.create_message()
+        self.create_message()
+
+        with patch('django.core.mail.EmailMessage.send',
+                   side_effect=[IOError('Connection refused'), 1]):
+            self.assertEqual(send_pending(), 1)
+        failing.refresh_from_db()
+        self.assertIsNone(failing.sent_on)
+        self.assertEqual(failing.attempts, 1)
+        self.assertEqual(failing.last_error, 'OSError: Connection refused')
+        self.assertGreater(failing.next_attempt_on, timezone.now())
+        self.assertEqual(list(get_pending(5)), [])
+
+        failing.next_attempt_on = timezone.now() - timedelta(seconds=1)
+        failing.save()
+        self.assertEqual(list(get_pending(5)), [failing])
+        self.assertEqual(list(get_pending(1)), [])
+
+        self.assertEqual(send_pending(), 1)
+        failing.refresh_from_db()
+        self.assertEqual(failing.attempts, 2)
+        self.assertEqual(failing.last_error, '')
+
+    def test_claim(self):
+        message = self.create_message()
+        stale = ContactMessage.objects.get(pk=message.pk)
+        self.assertTrue(claim(message))
+        self.assertEqual(message.attempts, 1)
+        self.assertEqual(list(get_pending(5)), [])
+        self.assertFalse(claim(stale))
+
+    def test_send_pending_concurrently(self):
+        message = self.create_message()
+        # another sender claims the message after this one has read it
+        with patch('base.outbox.get_pending', return_value=[
+                ContactMessage.objects.get(pk=message.pk)]):
+            claim(ContactMessage.objects.get(pk=message.pk))
+            self.assertEqual(send_pending(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        message.refresh_from_db()
+        self.assertEqual(message.attempts, 1)
+
+
+@override_settings(DEFAULT_CONTACT_EMAILS=['editor@example.com'])
+class StreamedDeliveryTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        storage = ContactMessage._meta.get_field('attachment').storage
+        patcher = patch.object(storage, 'location', self.tempdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.content = bytes(range(256)) * 1000
+        self.message = ContactMessage.objects.create(
+            subject='Inquiry from foo@bar.com', body='Hello\n. and bye',
+            reply_to='foo@bar.com')
+        self.message.attachment.save(
+            'poster.png', ContentFile(self.content), save=True)
+
+    def test_write_mime(self):
+        out = BytesIO()
+        write_mime(
+            self.message, build_email(self.message, attach=False), out)
+        data = out.getvalue()
+        self.assertNotIn(b'\r\r', data)
+        self.assertFalse(any(
+            len(line) > 78 for line in data.split(b'\r\n')))
+
+        parsed = email.message_from_bytes(data)
+        self.assertEqual(parsed['Subject'], 'Inquiry from foo@bar.com')
+        self.assertEqual(parsed['Reply-To'], 'foo@bar.com')
+        body, attachment = parsed.get_payload()
+        self.assertEqual(body.get_payload(), 'Hello\r\n. and bye')
+        self.assertEqual(attachment.get_content_type(), 'image/png')
+        self.assertEqual(attachment.get_filename(), 'poster.png')
+        self.assertEqual(attachment.get_payload(decode=True), self.content)
+
+    def test_deliver_smtp(self):
+        connection = SMTPBackend()
+        connection.connection = smtp = FakeSMTP()
+        deliver(self.message, connection)
+        self.assertEqual(smtp.commands, [
+            ('mail', 'webmaster@localhost'),
+            ('rcpt', 'editor@example.com'),
+            ('data',),
+        ])
+        self.assertTrue(smtp.data.endswith(b'\r\n.\r\n'))
+        # the line beginning with a period was escaped
+        self.assertIn(b'\r\n.. and bye', smtp.data)
+
+        parsed = email.message_from_bytes(
+            smtp.data[:-3].replace(b'\r\n..', b'\r\n.'))
+        attachment = parsed.get_payload()[1]
+        self.assertEqual(attachment.get_payload(decode=True), self.content)
+
+    def test_deliver_smtp_refused(self):
+        connection = SMTPBackend()
+        connection.connection = FakeSMTP(data_reply=(554, b'Rejected'))
+        with self.assertRaises(smtplib.SMTPDataError):
+            deliver(self.message, connection)
@@ -0,0 +1,129 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+
+from base import generations, pagecache
+from base.models import ArtsNews, Production, Venue
+from base.tests.fixtures import ProductionFactory, VenueFactory
+
+
+def get_sql(queryset):
+    return queryset.query.sql_with_params()[0]
+
+
+class GetQueryTagsTestCase(TestCase):
+    def test_list(self):
+        self.assertEqual(
+            pagecache.get_query_tags(
+                get_sql(Production.objects.filter(venue__name='Zach')),
+                connection),
+            ['base.production', 'base.venue'])
+        self.assertEqual(
+            pagecache.get_query_tags(
+                get_sql(Production.objects.filter(Q(pk=1) | Q(pk=2))),
+                connection),
+            ['base.production'])
+
+    def test_single_object(self):
+        for queryset in (
+                Production.objects.filter(pk=1),
+                Production.objects.filter(slug='hamlet', venue__pk=1),
+                Venue.objects.select_related('address').filter(slug='zach')):
+            self.assertEqual(
+                pagecache.get_query_tags(get_sql(queryset), connection), [])
+
+    def test_single_object_conditions(self):
+        sql = get_sql(Production.objects.filter(
+            slug='hamlet', review__isnull=False))
+        self.assertEqual(
+            pagecache.get_query_tags(sql, connection), ['base.review'])
+        self.assertEqual(
+            pagecache.get_lookup_tags(sql, connection),
+            ['base.production', 'base.review'])
+        self.assertIsNone(pagecache.get_lookup_tags(
+            get_sql(Production.objects.all()), connection))
+
+    def test_other_apps(self):
+        self.assertEqual(pagecache.get_query_tags(
+            'SELECT "django_session"."session_data" FROM "django_session"',
+            connection), [])
+
+
+class RecordingTestCase(TestCase):
+    def test_recording(self):
+        production = ProductionFactory()
+        Production.objects.count()
+        with pagecache.recording() as tags:
+            Production.objects.get(pk=production.pk)
+            generations.get_generation(ArtsNews)
+            list(Venue.objects.all())
+        Production.objects.count()
+
+        self.assertEqual(tags, set([
+            pagecache.ALL_PAGES_TAG,
+            'base.production:%s' % production.pk,
+            'base.artsnews',
+            'base.venue',
+            'base.venue:%s' % production.venue.pk,
+        ]))
+
+    def test_recording_missing_object(self):
+        production = ProductionFactory()
+        with pagecache.recording() as tags:
+            Production.objects.get(pk=production.pk)
+            self.assertEqual(list(Production.objects.filter(
+                slug=production.slug, review__isnull=False)), [])
+            Venue.objects.get(pk=production.venue.pk)
+        self.assertEqual(tags, set([
+            pagecache.ALL_PAGES_TAG,
+            'base.production',
+            'base.production:%s' % production.pk,
+            'base.review',
+            'base.venue:%s' % production.venue.pk,
+        ]))
+
+        with pagecache.recording() as tags:
+            Production.objects.filter(pk=0).first()
+        self.assertIn('base.production', tags)
+
+    def test_recording_other_apps(self):
+        with pagecache.recording() as tags:
+            Session(session_key='key')
+        self.assertEqual(tags, set([pagecache.ALL_PAGES_TAG]))
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60)
+class PageTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_get_page(self):
+        response = HttpResponse('page', content_type='text/plain')
+        response['Server-Timing'] = 'db;dur=1'
+        pagecache.set_page('key', response, ['base.venue'])
+
+        cached = pagecache.get_page('key')
+        self.assertEqual(cached.content, b'page')
+        self.assertEqual(cached['Content-Type'], 'text/plain')
+        self.assertFalse(cached.has_header('Server-Timing'))
+        self.assertIsNone(pagecache.get_page('other'))
+
+        pagecache.invalidate(Venue)
+        self.assertIsNone(pagecache.get_page('key'))
+
+    def test_invalidate_instance(self):
+        venue, other_venue = VenueFactory(), VenueFactory()
+        for pk in (venue.pk, other_venue.pk):
+            pagecache.set_page(
+                'venue-%s' % pk, HttpResponse(),
+                [pagecache.ALL_PAGES_TAG, pagecache.instance_tag(Venue, pk)])
+
+        venue.save()
+        self.assertIsNone(pagecache.get_page('venue-%s' % venue.pk))
+        self.assertIsNotNone(pagecache.get_page('venue-%s' % other_venue.pk))
+
+        pagecache.clear()
+        self.assertIsNone(pagecache.get_page('venue-%s' % other_venue.pk))
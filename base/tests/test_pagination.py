@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from base.models import ArtsNews, Review
+from base.pagination import InvalidCursor, KeysetPage, KeysetPaginator
+from base.tests.fixtures import ArtsNewsFactory, ReviewFactory
+
+
+class KeysetPageTestCase(TestCase):
+    def test_has_other_pages(self):
+        self.assertFalse(KeysetPage([1]).has_other_pages())
+        self.assertTrue(KeysetPage([1], next_cursor='a').has_next())
+        self.assertTrue(KeysetPage([1], previous_cursor='b').has_previous())
+        self.assertTrue(KeysetPage([1], previous_cursor='b').has_other_pages())
+
+
+class KeysetPaginatorTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        # pairs of news items share a timestamp, so the id must break ties
+        for n in range(7):
+            ArtsNews.objects.filter(pk=ArtsNewsFactory().pk).update(
+                created_on=now - timedelta(hours=n // 2))
+        self.expected = list(ArtsNews.objects.order_by('-created_on', '-id'))
+        self.paginator = KeysetPaginator(
+            ArtsNews.objects.all(), 3, ('-created_on', '-id'))
+
+    def test_page(self):
+        page = self.paginator.page()
+        self.assertEqual(page.object_list, self.expected[:3])
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        page = self.paginator.page(page.next_cursor)
+        self.assertEqual(page.object_list, self.expected[3:6])
+        self.assertTrue(page.has_previous())
+
+        last_page = self.paginator.page(page.next_cursor)
+        self.assertEqual(last_page.object_list, self.expected[6:])
+        self.assertFalse(last_page.has_next())
+
+        page = self.paginator.page(last_page.previous_cursor)
+        self.assertEqual(page.object_list, self.expected[3:6])
+        self.assertTrue(page.has_next())
+
+        page = self.paginator.page(page.previous_cursor)
+        self.assertEqual(page.object_list, self.expected[:3])
+        self.assertFalse(page.has_previous())
+
+    def test_page_past_the_end(self):
+        last_page = self.paginator.page(
+            self.paginator.page(self.paginator.page().next_cursor).next_cursor)
+        ArtsNews.objects.filter(
+            pk__in=[news.pk for news in last_page.object_list]).delete()
+        cursor = self.paginator.encode_cursor('next', self.expected[5])
+        self.assertEqual(
+            self.paginator.page(cursor).object_list, self.expected[:3])
+
+    def test_page_empty(self):
+        ArtsNews.objects.all().delete()
+        page = self.paginator.page()
+        self.assertEqual(page.object_list, [])
+        self.assertFalse(page.has_other_pages())
+
+    def test_decode_cursor(self):
+        cursor = self.paginator.encode_cursor('previous', self.expected[2])
+        self.assertEqual(
+            self.paginator.decode_cursor(cursor),
+            ('previous', [self.expected[2].created_on, self.expected[2].id]))
+
+        for cursor in ['', 'garbage', 'WyJuZXh0Il0', 'eyJhIjogMX0',
+                       'WyJzaWRld2F5cyIsICJ4IiwgIjEiXQ']:
+            with self.assertRaises(InvalidCursor):
+                self.paginator.decode_cursor(cursor)
+
+
+class NullableKeysetPaginatorTestCase(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for n in range(5):
+            Review.objects.filter(pk=ReviewFactory().pk).update(
+                published_on=now - timedelta(hours=n) if n % 2 else None)
+        self.expected = (
+            list(Review.objects.filter(
+                published_on__isnull=False).order_by('-published_on')) +
+            list(Review.objects.filter(
+                published_on__isnull=True).order_by('-id')))
+        self.paginator = KeysetPaginator(
+            Review.objects.all(), 2, ('-published_on', '-id'))
+
+    def test_page(self):
+        pages = [self.paginator.page()]
+        while pages[-1].has_next():
+            pages.append(self.paginator.page(pages[-1].next_cursor))
+        self.assertEqual(
+            [review for page in pages for review in page], self.expected)
+
+        # a cursor from a null value pages back through the others
+        page = self.paginator.page(pages[-1].previous_cursor)
+        self.assertEqual(page.object_list, self.expected[2:4])
+        page = self.paginator.page(page.previous_cursor)
+        self.assertEqual(page.object_list, self.expected[:2])
+        self.assertFalse(page.has_previous())
+
+    def test_decode_cursor(self):
+        cursor = self.paginator.encode_cursor('next', self.expected[-1])
+        self.assertEqual(
+            self.paginator.decode_cursor(cursor),
+            ('next', [None, self.expected[-1].id]))
@@ -0,0 +1,43 @@
+from django.test import TestCase, override_settings
+
+from base.profiling import (
+    clear_profiles, format_server_timing, get_profiles, percentile,
+    record_profile
+)
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        clear_profiles()
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([3, 1, 2], 100), 3)
+        self.assertEqual(percentile([5], 90), 5)
+
+    @override_settings(PROFILING_BUFFER_SIZE=3)
+    def test_record_profile(self):
+        self.assertEqual(get_profiles(), [])
+        for n in range(5):
+            record_profile({'n': n})
+        self.assertEqual(get_profiles(), [{'n': 2}, {'n': 3}, {'n': 4}])
+
+    def test_clear_profiles(self):
+        record_profile({'n': 1})
+        clear_profiles()
+        self.assertEqual(get_profiles(), [])
+        record_profile({'n': 2})
+        self.assertEqual(get_profiles(), [{'n': 2}])
+
+    def test_format_server_timing(self):
+        profile = {
+            'queries': 4, 'db_ms': 1.25, 'view_ms': 3.0, 'render_ms': 2.0,
+            'total_ms': 5.5,
+        }
+        self.assertEqual(
+            format_server_timing(profile),
+            'db;dur=1.2;desc="4 queries", view;dur=3.0, render;dur=2.0, '
+            'total;dur=5.5'
+        )
@@ -0,0 +1,84 @@
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from filebrowser.base import FileObject
+from filebrowser.signals import filebrowser_post_upload
+from PIL import Image
+
+from base.renditions import (
+    generate_renditions, get_image_paths, get_renditions)
+from base.tests.fixtures import ProductionFactory, ReviewFactory
+
+
+class RenditionsTestCase(TestCase):
+    def setUp(self):
+        self.tempdir = TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.tempdir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.makedirs(os.path.join(self.tempdir.name, 'uploads'))
+        self.path = 'uploads/poster.jpg'
+        Image.new('RGB', (1000, 500), 'orange').save(
+            os.path.join(self.tempdir.name, self.path))
+        self.image = FileObject(self.path)
+
+    def get_width(self, path):
+        with Image.open(os.path.join(self.tempdir.name, path)) as image:
+            return image.size[0]
+
+    def test_generate_renditions(self):
+        self.assertEqual(get_renditions(self.image), [])
+        self.assertEqual(generate_renditions(self.image), 3)
+        renditions = get_renditions(self.image)
+        self.assertEqual(
+            [(name, width) for name, url, width in renditions],
+            [('thumbnail', 160), ('tile', 360), ('feature', 720)])
+        for name, url, width in renditions:
+            self.assertEqual(
+                self.get_width(self.image.version_path(name)), width)
+
+        # renditions are only generated again once the original changes
+        self.assertEqual(generate_renditions(self.image), 0)
+        missing = FileObject('uploads/missing.jpg')
+        self.assertEqual(generate_renditions(missing), 0)
+        self.assertEqual(get_renditions(None), [])
+
+    def test_get_image_paths(self):
+        ProductionFactory(poster=self.image)
+        ReviewFactory(cover_image=self.image)
+        ProductionFactory(poster='')
+        self.assertEqual(get_image_paths(), [self.path])
+
+    def test_image_attrs(self):
+        template = Template(
+            "{% load renditions %}<img {% image_attrs image 'tile' %} />")
+        self.assertEqual(
+            template.render(Context({'image': self.image})),
+            '<img src="%s" />' % self.image.url)
+
+        generate_renditions(self.image)
+        urls = dict(
+            (name, url) for name, url, width in get_renditions(self.image))
+        self.assertEqual(
+            template.render(Context({'image': self.image})),
+            '<img src="%s" srcset="%s 160w, %s 360w, %s 720w" sizes="360px" />'
+            % (urls['tile'], urls['thumbnail'], urls['tile'], urls['feature']))
+
+    def test_upload_signal(self):
+        filebrowser_post_upload.send(
+            sender=None, path='uploads', file=self.image, site=None)
+        self.assertEqual(len(get_renditions(self.image)), 3)
+
+    def test_command(self):
+        ProductionFactory(poster=self.image)
+        stdout = StringIO()
+        call_command('generate_renditions', workers=1, stdout=stdout)
+        self.assertTrue(stdout.getvalue().startswith(
+            'Generated 3 renditions of 1 images'))
+        self.assertEqual(len(get_renditions(self.image)), 3)
@@ -0,0 +1,32 @@
+from django.test import TestCase
+
+from base.search import LRUCache, normalize_query
+
+
+class NormalizeQueryTestCase(TestCase):
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query('  The   Rep  '), 'rep')
+        self.assertEqual(
+            normalize_query('Tale of Two  Cities'), 'tale two cities')
+        self.assertEqual(
+            normalize_query('"The  Importance of" -The Earnest'),
+            '"the importance of" earnest')
+        self.assertEqual(normalize_query('-"A  Play"'), '-"a play"')
+        self.assertEqual(normalize_query('To Be Or'), 'to be or')
+        self.assertEqual(normalize_query(''), '')
+
+
+class LRUCacheTestCase(TestCase):
+    def test_get_set(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+        cache.clear()
+        self.assertEqual(cache.get('a', 'missing'), 'missing')
@@ -1,15 +1,158 @@
+import os
+from datetime import date, timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.urls import reverse
+from haystack import connections
+from mock import patch
 
+from base.indexing import process_queue
 from base.models import (
     ArtsNews, Audition, Production, ProductionCompany, Review
 )
-from base.tests.fixtures import ReviewFactory
+from base.search import results_cache
+from base.tests.fixtures import (
+    ArtsNewsFactory, AuditionFactory, ProductionCompanyFactory,
+    ProductionFactory, ReviewFactory
+)
 from base.search_indexes import (
     ArtsNewsIndex, AuditionIndex, ProductionIndex, ProductionCompanyIndex,
     ReviewIndex
 )
 
 
+class ResultIndexTestCase(TestCase):
+    def test_prepare(self):
+        review = ReviewFactory(lede='A <b>bold</b> lede')
+        prepared = ReviewIndex().full_prepare(review)
+        self.assertEqual(prepared['title'], review.get_title())
+        self.assertEqual(prepared['url'], review.get_absolute_url())
+        self.assertEqual(prepared['duration'], '')
+        self.assertEqual(prepared['summary'], 'A &lt;b&gt;bold&lt;/b&gt; lede')
+        self.assertEqual(prepared['kind'], 'Review')
+
+        production = ProductionFactory(description='<p>%s</p>' % ('w ' * 60))
+        prepared = ProductionIndex().full_prepare(production)
+        self.assertEqual(prepared['title'], production.title)
+        self.assertEqual(prepared['duration'], production.detailed_duration())
+        self.assertEqual(prepared['summary'], ' '.join(['w'] * 50) + '…')
+
+        audition = AuditionFactory()
+        self.assertEqual(
+            AuditionIndex().full_prepare(audition)['title'],
+            audition.get_title())
+        company = ProductionCompanyFactory()
+        self.assertEqual(
+            ProductionCompanyIndex().full_prepare(company)['title'],
+            company.name)
+
+    def test_prepare_facets(self):
+        company = ProductionCompanyFactory(name='Rude Mechs')
+        production = ProductionFactory(
+            production_company=company, start_date=date(2026, 3, 1))
+        prepared = ProductionIndex().full_prepare(production)
+        self.assertEqual(prepared['kind_exact'], 'Production')
+        self.assertEqual(prepared['city_exact'], 'Austin')
+        self.assertEqual(prepared['company_exact'], 'Rude Mechs')
+        self.assertEqual(prepared['start_date'], date(2026, 3, 1))
+        self.assertEqual(prepared['end_date'], date(2026, 3, 1))
+
+        review = ReviewFactory(is_published=True, production=production)
+        prepared = ReviewIndex().full_prepare(review)
+        self.assertEqual(prepared['city_exact'], 'Austin')
+        self.assertEqual(prepared['company_exact'], 'Rude Mechs')
+        self.assertNotIn('start_date', prepared)
+
+        prepared = ArtsNewsIndex().full_prepare(ArtsNewsFactory())
+        self.assertNotIn('company', prepared)
+
+
+class SearchViewTestCase(TestCase):
+    def setUp(self):
+        self.connections_info = connections.connections_info
+        connections.connections_info = {
+            'default': dict(self.connections_info['default'], STORAGE='ram'),
+        }
+        connections.reload('default')
+        cache.clear()
+        results_cache.clear()
+
+    def tearDown(self):
+        connections.connections_info = self.connections_info
+        connections.reload('default')
+
+    def test_get(self):
+        for n in range(3):
+            ArtsNewsFactory(title='Curtain call %s' % n, content='curtain')
+        call_command('reindex_search', workers=1, stdout=open(os.devnull, 'w'))
+
+        url = reverse('haystack_search')
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'curtain'})
+        self.assertContains(response, 'Curtain call 2')
+        self.assertContains(
+            response, ArtsNews.objects.first().get_absolute_url())
+
+    def test_get_facets(self):
+        for city, start_date in [('Austin', date(2026, 3, 1)),
+                                 ('Austin', date(2026, 5, 1)),
+                                 ('Round Rock', date(2026, 3, 10))]:
+            ProductionFactory(
+                play__title='Hamlet', start_date=start_date,
+                end_date=start_date + timedelta(days=14),
+                venue__address__city=city)
+        AuditionFactory(title='Hamlet auditions')
+        call_command('reindex_search', workers=1, stdout=open(os.devnull, 'w'))
+        url = reverse('haystack_search')
+
+        response = self.client.get(url, {'q': 'hamlet'})
+        self.assertEqual(response.context['paginator'].count, 4)
+        facets = dict(
+            (label, [(v['value'], v['count']) for v in values])
+            for label, values in response.context['facets'])
+        self.assertEqual(
+            facets['Type'], [('Production', 3), ('Audition', 1)])
+        self.assertEqual(facets['City'], [('Austin', 2), ('Round Rock', 1)])
+
+        response = self.client.get(url, {
+            'q': 'hamlet', 'kind': 'Production', 'city': 'Austin',
+            'date_from': '2026-03-01', 'date_to': '2026-03-31'})
+        self.assertEqual(response.context['paginator'].count, 1)
+        city_facet = dict(response.context['facets'])['City'][0]
+        self.assertTrue(city_facet['selected'])
+        self.assertNotIn('city=', city_facet['querystring'])
+        self.assertIn('q=hamlet', response.context['page_querystring'])
+
+        # facet values are matched literally, whatever they contain
+        for city, count in [('Round Rock', 1), ('Austin"', 0),
+                            ('x" OR city_exact:"Austin', 0),
+                            ('Austin) OR (kind_exact:Audition', 0)]:
+            response = self.client.get(url, {'q': 'hamlet', 'city': city})
+            self.assertEqual(response.context['paginator'].count, count)
+
+    def test_get_cached(self):
+        ArtsNewsFactory(title='Curtain call', content='curtain')
+        call_command('reindex_search', workers=1, stdout=open(os.devnull, 'w'))
+        url = reverse('haystack_search')
+        backend = connections['default'].get_backend()
+        with patch.object(backend, 'search', wraps=backend.search) as search:
+            self.client.get(url, {'q': 'The Curtain'})
+            response = self.client.get(url, {'q': '  the  curtain '})
+            self.assertEqual(search.call_count, 1)
+            self.assertContains(response, 'Curtain call')
+
+            news = ArtsNewsFactory(title='Curtain up', content='curtain')
+            self.client.get(url, {'q': 'curtain'})
+            self.assertEqual(search.call_count, 1)
+
+            process_queue()
+            response = self.client.get(url, {'q': 'curtain'})
+            self.assertEqual(search.call_count, 2)
+            self.assertContains(response, news.title)
+
+
 class ReviewIndexTestCase(TestCase):
     def setUp(self):
         self.review_index = ReviewIndex()
@@ -0,0 +1,161 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from mock import patch
+
+from base import generations
+from base.models import Play, SuggestionChange
+from base.tests.fixtures import (
+    ArtsNewsFactory, PlayFactory, ProductionCompanyFactory, ReviewerFactory,
+    VenueFactory)
+from base.typeahead import (
+    CHANGE_RETENTION, PrefixIndex, normalize, suggestions)
+
+
+class NormalizeTestCase(TestCase):
+    def test_normalize(self):
+        self.assertEqual(normalize(u'  Zach  Théatre! '), 'zach theatre')
+        self.assertEqual(normalize(u"Hyde Park's"), 'hyde park s')
+        self.assertEqual(normalize(''), '')
+
+
+class PrefixIndexTestCase(TestCase):
+    def test_search(self):
+        index = PrefixIndex()
+        index.add(1, {'name': 'Rude Mechs'})
+        index.add(2, {'name': 'Mary Moody Northen'})
+        index.add(3, {'name': 'The Merry Wives'})
+        self.assertEqual(len(index), 3)
+
+        self.assertEqual(
+            [entry['name'] for entry in index.search('M')],
+            ['Mary Moody Northen', 'Rude Mechs', 'The Merry Wives'])
+        self.assertEqual(
+            [entry['name'] for entry in index.search('me')],
+            ['Rude Mechs', 'The Merry Wives'])
+        self.assertEqual(
+            [entry['name'] for entry in index.search('mary mo')],
+            ['Mary Moody Northen'])
+        self.assertEqual(len(index.search('m', limit=2)), 2)
+        self.assertEqual(index.search('x'), [])
+        self.assertEqual(index.search(' '), [])
+
+    def test_add_remove(self):
+        index = PrefixIndex()
+        index.extend([(1, {'name': 'Hamlet'}), (2, {'name': 'Hair'})])
+        index.add(1, {'name': 'Macbeth'})
+        self.assertEqual(index.search('ham'), [])
+        self.assertEqual(index.search('mac'), [{'name': 'Macbeth'}])
+
+        index.remove(1)
+        index.remove(1)
+        self.assertEqual(index.search('mac'), [])
+        self.assertEqual(len(index), 1)
+
+        index.clear()
+        self.assertEqual(index.search('hai'), [])
+
+
+class SuggestionsTestCase(TestCase):
+    def setUp(self):
+        suggestions.reset()
+
+    def tearDown(self):
+        suggestions.reset()
+
+    def test_search(self):
+        play = PlayFactory(title='Hamlet')
+        company = ProductionCompanyFactory(name='Hyde Park Theatre')
+        venue = VenueFactory(name='The Hideout')
+        ReviewerFactory(first_name='Harold', last_name='Hill')
+
+        self.assertEqual(suggestions.search('h'), [
+            {'name': 'Hamlet', 'kind': 'Play',
+             'url': reverse('haystack_search') + '?q=Hamlet'},
+            {'name': 'Harold Hill', 'kind': 'Reviewer',
+             'url': reverse('reviewers')},
+            {'name': 'Hyde Park Theatre', 'kind': 'Company',
+             'url': company.get_absolute_url()},
+            {'name': 'The Hideout', 'kind': 'Venue',
+             'url': reverse('venue_productions', args=[venue.slug])},
+        ])
+
+        # saves and deletes update the loaded index without queries
+        play.title = 'Hedda Gabler'
+        play.save()
+        venue.delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [entry['name'] for entry in suggestions.search('h')],
+                ['Harold Hill', 'Hedda Gabler', 'Hyde Park Theatre'])
+
+    def test_search_syncs(self):
+        hamlet = PlayFactory(title='Hamlet')
+        lear = PlayFactory(title='King Lear')
+        VenueFactory(name='The Hideout')
+        self.assertEqual(len(suggestions.search('ham')), 1)
+        SuggestionChange.objects.all().delete()
+
+        # changes recorded by another process are applied incrementally
+        pks = [hamlet.pk, lear.pk]
+        Play.objects.filter(pk=hamlet.pk).update(title='Macbeth')
+        with patch.object(suggestions, 'remove'):
+            lear.delete()
+        for pk in pks:
+            SuggestionChange.objects.create(
+                model_label='base.play', object_pk=pk)
+        generations.bump_suggestions_generation()
+        with self.assertNumQueries(2):
+            self.assertEqual(suggestions.search('ham'), [])
+        self.assertEqual(len(suggestions.search('mac')), 1)
+        self.assertEqual(suggestions.search('king'), [])
+        self.assertEqual(len(suggestions.search('hid')), 1)
+
+    def test_search_reloads(self):
+        PlayFactory(title='Hamlet')
+        self.assertEqual(len(suggestions.search('ham')), 1)
+
+        # changes older than the last sync may have been forgotten
+        suggestions.synced_on -= CHANGE_RETENTION
+        Play.objects.update(title='Macbeth')
+        self.assertEqual(len(suggestions.search('mac')), 1)
+
+    @patch('base.typeahead.transaction.on_commit')
+    def test_record_change(self, mock_on_commit):
+        old_change = SuggestionChange.objects.create(
+            model_label='base.play', object_pk=1,
+            changed_on=timezone.now() - CHANGE_RETENTION)
+        play = PlayFactory(title='Hamlet')
+        change, = SuggestionChange.objects.all()
+        self.assertNotEqual(change, old_change)
+        self.assertEqual(
+            (change.model_label, change.object_pk), ('base.play', play.pk))
+        mock_on_commit.assert_called_with(
+            generations.bump_suggestions_generation)
+
+        ArtsNewsFactory()
+        self.assertEqual(SuggestionChange.objects.count(), 1)
+
+
+class SearchSuggestionsViewTestCase(TestCase):
+    def setUp(self):
+        suggestions.reset()
+
+    def tearDown(self):
+        suggestions.reset()
+
+    def test_get(self):
+        PlayFactory(title='Hamlet')
+        url = reverse('search_suggestions')
+        self.client.get(url, {'q': 'h'})
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'q': 'Ham'})
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual(data['query'], 'Ham')
+        self.assertEqual(
+            [entry['name'] for entry in data['suggestions']], ['Hamlet'])
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['suggestions'], [])
@@ -0,0 +1,53 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from base.uploads import LimitedUploadHandler
+
+
+class LimitedUploadHandlerTestCase(TestCase):
+    def upload(self, handler, chunks):
+        handler.new_file('attachment', 'notice.txt', 'text/plain', None)
+        start = 0
+        for chunk in chunks:
+            self.assertIsNone(handler.receive_data_chunk(chunk, start))
+            start += len(chunk)
+        return handler.file_complete(start)
+
+    def test_upload(self):
+        uploaded = self.upload(
+            LimitedUploadHandler(max_size=10), [b'abcd', b'efgh'])
+        self.assertEqual(uploaded.size, 8)
+        self.assertEqual(uploaded.read(), b'abcdefgh')
+        self.assertTrue(hasattr(uploaded, 'temporary_file_path'))
+
+    def test_upload_too_large(self):
+        handler = LimitedUploadHandler(max_size=6)
+        with self.assertRaises(SkipFile):
+            self.upload(handler, [b'abcd', b'efgh', b'ijkl'])
+        self.assertEqual(handler.received, 8)
+        self.assertEqual(handler.skipped, set(['attachment']))
+
+    @override_settings(MAX_UPLOAD_SIZE=10)
+    def test_contact_form(self):
+        url = reverse('contact')
+        response = self.client.post(url, {
+            'attachment': SimpleUploadedFile('notice.txt', b'x' * 11),
+        })
+        self.assertIn(
+            'Please keep your attachments smaller than 10\xa0bytes',
+            response.context['form'].errors['attachment'][0])
+        self.assertNotIn('attachment', response.context['form'].files)
+
+        response = self.client.post(url, {
+            'attachment': SimpleUploadedFile('notice.txt', b'x' * 10),
+        })
+        self.assertNotIn('attachment', response.context['form'].errors)
+        self.assertEqual(
+            response.context['form'].files['attachment'].size, 10)
+
+    def test_contact_form_csrf(self):
+        client = self.client_class(enforce_csrf_checks=True)
+        response = client.post(reverse('contact'), {})
+        self.assertEqual(response.status_code, 403)
@@ -1,6 +1,6 @@
 from django.test import TestCase
 
-from base.utils import chunks
+from base.utils import accepts_encoding, chunks, parse_accept_encoding
 
 
 class ChunksTestCase(TestCase):
@@ -14,3 +14,20 @@ class ChunksTestCase(TestCase):
             list(chunks(some_list, 3)),
             [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
         )
+
+
+class AcceptEncodingTestCase(TestCase):
+    def test_parse_accept_encoding(self):
+        self.assertEqual(parse_accept_encoding(''), {})
+        self.assertEqual(
+            parse_accept_encoding('gzip, br;q=0.5, *;q=0, x;q=bad'),
+            {'gzip': 1.0, 'br': 0.5, '*': 0.0, 'x': 0.0})
+
+    def test_accepts_encoding(self):
+        self.assertTrue(accepts_encoding('gzip, deflate', 'gzip'))
+        self.assertTrue(accepts_encoding('GZIP;q=0.1', 'gzip'))
+        self.assertTrue(accepts_encoding('*', 'br'))
+        self.assertFalse(accepts_encoding('gzip;q=0', 'gzip'))
+        self.assertFalse(accepts_encoding('*;q=0.5, gzip;q=0', 'gzip'))
+        self.assertFalse(accepts_encoding('deflate', 'gzip'))
+        self.assertFalse(accepts_encoding('', 'gzip'))
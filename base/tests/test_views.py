@@ -1,8 +1,12 @@
 from datetime import date, timedelta
 
+from django.core.cache import cache
 from django.http import HttpRequest
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 from django.utils import timezone
 from django.views.generic.base import TemplateView
 from django.views.generic.detail import DetailView
@@ -12,6 +16,7 @@ from filebrowser.base import FileObject
 from mock import patch
 
 from base.forms import ContactForm
+from base.pagination import KeysetPage
 from base.models import (
     ArtsNews, Audition, Production, ProductionCompany, Review, Reviewer, Venue
 )
@@ -28,7 +33,7 @@ from base.views import (
     VenueProductionListView, WeekPerformanceView,
 )
 from base.tests.fixtures import (
-    AddressFactory, ArtsNewsFactory, AuditionFactory,
+    AddressFactory, ArtsNewsFactory, AuditionFactory, ExternalReviewFactory,
     NewsSlideshowImageFactory, PlayFactory, ProductionFactory,
     ProductionCompanyFactory, ReviewFactory, ReviewerFactory, VenueFactory
 )
@@ -36,6 +41,7 @@ from base.tests.fixtures import (
 
 class HomepageViewTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.view = HomepageView()
 
     def test_inherits_base_class(self):
@@ -76,6 +82,35 @@ class HomepageViewTestCase(TestCase):
         self.assertEqual(context['media_news'], media_news)
         self.assertIn([news], context['news_groups'])
 
+    def _make_homepage_content(self):
+        company = ProductionCompanyFactory()
+        production = ProductionFactory(
+            poster=FileObject('poster'),
+            production_company=company,
+            description='A production.',
+        )
+        ReviewFactory(
+            production=production,
+            is_published=True,
+            cover_image=FileObject('image'),
+        )
+        ExternalReviewFactory(production=production)
+        AuditionFactory(production_company=company)
+        NewsSlideshowImageFactory()
+        ArtsNewsFactory()
+
+    def test_query_count_is_constant(self):
+        self._make_homepage_content()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+
+        for _ in range(5):
+            self._make_homepage_content()
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(len(response.context['productions']), 6)
+
 
 class ReviewDetailViewTestCase(TestCase):
     def test_inherits_base_class(self):
@@ -144,6 +179,22 @@ class ReviewListViewTestCase(TestCase):
                 pass
         mock.has_call(1)
 
+    def test_get_context_data_keyset(self):
+        reviews = [ReviewFactory(is_published=True) for _ in range(8)]
+        response = self.client.get(reverse('reviews'))
+        page = response.context['page']
+        self.assertIsInstance(page, KeysetPage)
+        self.assertEqual(response.context['reviews'], reviews[::-1][:6])
+
+        response = self.client.get(
+            reverse('reviews'), {'cursor': page.next_cursor})
+        self.assertEqual(response.context['reviews'], reviews[1::-1])
+        self.assertContains(
+            response, '?cursor=%s' % response.context['page'].previous_cursor)
+
+        response = self.client.get(reverse('reviews'), {'cursor': 'invalid'})
+        self.assertEqual(response.context['reviews'], reviews[::-1][:6])
+
 
 class ProductionCompanyViewTestCase(TestCase):
     def test_inherits_base_class(self):
@@ -322,7 +373,11 @@ class NewsDetailViewTestCase(TestCase):
         self.assertIn(review, context['recent_reviews'])
         self.assertIn(other_news, context['recent_news'])
         self.assertNotIn(news, context['recent_news'])
-        self.assertIn(production, context['current_productions'])
+        with self.assertNumQueries(1):
+            current_productions = list(context['current_productions'])
+            for current_production in current_productions:
+                self.assertTrue(current_production.title)
+        self.assertIn(production, current_productions)
 
 
 class NewsListViewTestCase(TestCase):
@@ -409,6 +464,25 @@ class NewsListViewTestCase(TestCase):
                     pass
         mock.has_call(1)
 
+    def test_get_context_data_keyset(self):
+        for _ in range(40):
+            ArtsNewsFactory(is_job_opportunity=True)
+        ArtsNewsFactory()
+        response = self.client.get(
+            reverse('news_list'), {'category': 'opportunities'})
+        page = response.context['page']
+        self.assertEqual(len(page.object_list), 36)
+        self.assertEqual(
+            response.context['page_querystring'], 'category=opportunities')
+        self.assertContains(
+            response,
+            '?category=opportunities&amp;cursor=%s' % page.next_cursor)
+
+        response = self.client.get(
+            reverse('news_list'),
+            {'category': 'opportunities', 'cursor': page.next_cursor})
+        self.assertEqual(len(response.context['page'].object_list), 4)
+
 
 class ProductionNewsListViewTestCase(TestCase):
     def setUp(self):
@@ -634,6 +708,20 @@ class MonthPerformanceViewTestCase(TestCase):
             date_range = view._get_range()
         self.assertEqual(date_range, (start_date, date(2016, 8, 31)))
 
+    def test_get_calendar(self):
+        production = ProductionFactory(
+            start_date=date(2016, 7, 30),
+            end_date=date(2016, 8, 10),
+            on_monday=True,
+        )
+        view = MonthPerformanceView(kwargs={'month': '8', 'year': '2016'})
+        calendar = view.get_calendar()
+        self.assertEqual(len(calendar), 5)
+        self.assertEqual(calendar[0][0], (date(2016, 8, 1), [production]))
+        self.assertEqual(calendar[0][1], (date(2016, 8, 2), []))
+        self.assertEqual(calendar[1][0], (date(2016, 8, 8), [production]))
+        self.assertEqual(calendar[4][3], (date(2016, 9, 1), None))
+
     def test_get_context_data(self):
         view = MonthPerformanceView()
         start = timezone.now()
@@ -686,25 +774,19 @@ class CityPerformanceViewTestCase(TestCase):
         view = CityPerformanceView()
         view.city = 'Austin'
         austin_venue = VenueFactory(address=AddressFactory(city='Austin'))
-        bastrop_venue = VenueFactory(address=AddressFactory(city='Bastrop'))
+        VenueFactory(address=AddressFactory(city='Bastrop'))
+        elgin_venue = VenueFactory(address=AddressFactory(city='Elgin'))
+        VenueFactory(address=AddressFactory(city='Elgin'))
         ProductionFactory(venue=austin_venue)
-        city_venues = {
-            'Austin': [austin_venue],
-            'Bastrop': [bastrop_venue],
-        }
+        ProductionFactory(venue=elgin_venue)
         with patch(
             'django.views.generic.list.ListView.get_context_data',
             return_value={}
         ):
-            with patch.object(
-                Venue.objects,
-                'filter_cities',
-                return_value=city_venues
-            ):
+            with self.assertNumQueries(1):
                 context = view.get_context_data()
-        self.assertEqual(context['city'], 'Austin')
-        self.assertIn('Austin', context['cities'])
-        self.assertNotIn('Bastrop', context['cities'])
+                self.assertEqual(context['city'], 'Austin')
+                self.assertEqual(list(context['cities']), ['Elgin', 'Austin'])
 
 
 class CompanyObjectListViewTestCase(TestCase):
@@ -1026,10 +1108,16 @@ class ReviewerListViewTestCase(TestCase):
             return_value={}
         ):
             context = view.get_context_data()
-        self.assertIn(reviewer_1, context['active_reviewers'])
-        self.assertIn(reviewer_2, context['active_reviewers'])
+        self.assertEqual(
+            list(context['active_reviewers']), [reviewer_1, reviewer_2])
         self.assertEqual(context['inactive_reviewers'][0], inactive_reviewer)
 
+    def test_get_query_count(self):
+        for _ in range(3):
+            ReviewFactory(is_published=True, published_on=timezone.now())
+        with self.assertNumQueries(2):
+            self.client.get(reverse('reviewers'))
+
 
 class AboutViewTestCase(TestCase):
     def test_inherits_base_class(self):
@@ -1064,10 +1152,10 @@ class ContactFormViewTestCase(TestCase):
     def test_form_valid(self):
         view = ContactFormView()
         form = ContactForm()
-        with patch.object(form, 'send_message') as mock_send_message:
+        with patch.object(form, 'queue_message') as mock_queue_message:
             with patch.object(FormView, 'form_valid', return_value='foobar'):
                 result = view.form_valid(form)
-        mock_send_message.assert_called_once_with()
+        mock_queue_message.assert_called_once_with()
         self.assertEqual(result, 'foobar')
 
 
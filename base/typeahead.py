@@ -0,0 +1,251 @@
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import urlencode
+
+from base import generations
+from base.models import (
+    Play, ProductionCompany, Reviewer, SuggestionChange, Venue)
+
+WORD_RE = re.compile(r'\w+')
+
+
+def normalize(value):
+    """Return a lowercase, accent-free form of value with single spaces"""
+    value = unicodedata.normalize('NFKD', value)
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return ' '.join(WORD_RE.findall(value.lower()))
+
+
+def search_url(query):
+    return '%s?%s' % (reverse('haystack_search'), urlencode({'q': query}))
+
+
+def play_suggestion(play):
+    return play.title, search_url(play.title)
+
+
+def company_suggestion(company):
+    return company.name, company.get_absolute_url()
+
+
+def venue_suggestion(venue):
+    return venue.name, reverse('venue_productions', args=[venue.slug])
+
+
+def reviewer_suggestion(reviewer):
+    return reviewer.full_name, reverse('reviewers')
+
+
+# The models offered as suggestions: the kind displayed with each, the fields
+# needed to build it, and a function returning its name and URL
+SOURCES = (
+    (Play, 'Play', ('title',), play_suggestion),
+    (ProductionCompany, 'Company', ('name', 'slug'), company_suggestion),
+    (Venue, 'Venue', ('name', 'slug'), venue_suggestion),
+    (Reviewer, 'Reviewer', ('first_name', 'last_name'), reviewer_suggestion),
+)
+SOURCE_MODELS = tuple(source[0] for source in SOURCES)
+
+# How long recorded changes are kept. A process that has not synced its
+# index for longer reloads it instead.
+CHANGE_RETENTION = timedelta(days=1)
+
+# Changes are dated when made but read by other processes once committed,
+# so each sync reads again those made shortly before the previous one
+CHANGE_OVERLAP = timedelta(minutes=5)
+
+
+class PrefixIndex(object):
+    """
+    A sorted list of normalized names, searched by prefix with a binary
+    search. Names are listed under each of their words, so that any word of a
+    name can begin a match.
+    """
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _get_keys(self, ident, normalized):
+        words = normalized.split()
+        return [
+            (' '.join(words[position:]), ident)
+            for position in range(len(words))
+        ]
+
+    def _remove(self, ident):
+        normalized, entry = self._entries.pop(ident, (None, None))
+        if entry is None:
+            return
+        for key in self._get_keys(ident, normalized):
+            position = bisect_left(self._keys, key)
+            if position < len(self._keys) and self._keys[position] == key:
+                del self._keys[position]
+
+    def add(self, ident, entry):
+        """Add the entry, replacing any entry with the same identifier"""
+        with self._lock:
+            self._remove(ident)
+            normalized = normalize(entry['name'])
+            self._entries[ident] = (normalized, entry)
+            for key in self._get_keys(ident, normalized):
+                insort(self._keys, key)
+
+    def extend(self, items):
+        """Add (identifier, entry) pairs to an empty index, sorting once"""
+        with self._lock:
+            for ident, entry in items:
+                normalized = normalize(entry['name'])
+                self._entries[ident] = (normalized, entry)
+                self._keys.extend(self._get_keys(ident, normalized))
+            self._keys.sort()
+
+    def remove(self, ident):
+        with self._lock:
+            self._remove(ident)
+
+    def clear(self):
+        with self._lock:
+            self._keys = []
+            self._entries = {}
+
+    def search(self, prefix, limit=10):
+        """
+        Return up to limit entries with a word beginning with prefix,
+        matches at the start of the name first
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        with self._lock:
+            position = bisect_left(self._keys, (prefix,))
+            matches = []
+            for key, ident in self._keys[position:]:
+                if not key.startswith(prefix):
+                    break
+                matches.append(ident)
+            entries = sorted(
+                (self._entries[ident] for ident in set(matches)),
+                key=lambda item: (not item[0].startswith(prefix), item[0]))
+        return [entry for _, entry in entries[:limit]]
+
+
+class Suggestions(object):
+    """
+    Typeahead suggestions for the names of plays, companies, venues, and
+    reviewers, held in the memory of each process. The index is loaded on
+    first use. Saves and deletes are applied to the index of the process
+    making them, and recorded as SuggestionChange rows. Once committed, they
+    bump the suggestions generation, and every process then applies the
+    recorded changes it has not seen yet. This relies on the generation
+    being kept in a cache shared by every process (see CACHES).
+    """
+    def __init__(self):
+        self.index = PrefixIndex()
+        self.version = None
+        self.synced_on = None
+        self._load_lock = threading.Lock()
+
+    def get_version(self):
+        return generations.get_suggestions_generation()
+
+    def get_source(self, model):
+        for source in SOURCES:
+            if source[0] is model:
+                return source
+        return None
+
+    def make_entry(self, obj, kind, build):
+        name, url = build(obj)
+        return {'name': name, 'kind': kind, 'url': url}
+
+    def load(self):
+        """Rebuild the index from the database"""
+        with self._load_lock:
+            # read first, so changes made while loading are applied later
+            version, synced_on = self.get_version(), timezone.now()
+            index = PrefixIndex()
+            for model, kind, fields, build in SOURCES:
+                index.extend(
+                    ((kind, obj.pk), self.make_entry(obj, kind, build))
+                    for obj in model.objects.only(*fields).iterator())
+            self.index, self.version = index, version
+            self.synced_on = synced_on
+
+    def sync(self):
+        """Apply the changes recorded since the index was last synced"""
+        with self._load_lock:
+            # read first, so changes made while syncing are applied next time
+            version, synced_on = self.get_version(), timezone.now()
+            if version == self.version:
+                return
+            changes = SuggestionChange.objects.filter(
+                changed_on__gte=self.synced_on - CHANGE_OVERLAP)
+            changed_pks = {}
+            for label, pk in changes.values_list('model_label', 'object_pk'):
+                changed_pks.setdefault(label, set()).add(pk)
+            for model, kind, fields, build in SOURCES:
+                pks = changed_pks.get(model._meta.label_lower)
+                if not pks:
+                    continue
+                for obj in model.objects.only(*fields).filter(pk__in=pks):
+                    self.index.add(
+                        (kind, obj.pk), self.make_entry(obj, kind, build))
+                    pks.discard(obj.pk)
+                for pk in pks:
+                    self.index.remove((kind, pk))
+            self.version, self.synced_on = version, synced_on
+
+    def reset(self):
+        """Discard the index, so it is reloaded when next searched"""
+        self.version = None
+
+    def record_change(self, obj):
+        """
+        Record a change to an object's suggestion for the other processes,
+        forgetting those older than CHANGE_RETENTION
+        """
+        SuggestionChange.objects.create(
+            model_label=obj._meta.label_lower, object_pk=obj.pk)
+        SuggestionChange.objects.filter(
+            changed_on__lt=timezone.now() - CHANGE_RETENTION).delete()
+        transaction.on_commit(generations.bump_suggestions_generation)
+
+    def update(self, obj):
+        source = self.get_source(type(obj))
+        if source is None:
+            return
+        self.record_change(obj)
+        if self.version is not None:
+            model, kind, fields, build = source
+            self.index.add((kind, obj.pk), self.make_entry(obj, kind, build))
+
+    def remove(self, obj):
+        source = self.get_source(type(obj))
+        if source is None:
+            return
+        self.record_change(obj)
+        if self.version is not None:
+            self.index.remove((source[1], obj.pk))
+
+    def search(self, prefix, limit=10):
+        if self.version is None or self.synced_on - CHANGE_OVERLAP < \
+                timezone.now() - CHANGE_RETENTION:
+            # changes may have been forgotten since the last sync
+            self.load()
+        elif self.version != self.get_version():
+            self.sync()
+        return self.index.search(prefix, limit)
+
+
+suggestions = Suggestions()
@@ -0,0 +1,28 @@
+from django.core.files.uploadhandler import (
+    SkipFile, TemporaryFileUploadHandler)
+
+
+class LimitedUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams each uploaded file to a temporary file on disk, in chunks, and
+    skips a file as soon as it grows past max_size bytes: its temporary file
+    is deleted and the rest of its data is discarded by the parser, without
+    reaching the handler. The names of the fields whose files were skipped
+    are kept in skipped, so forms can reject them.
+    """
+    def __init__(self, request=None, max_size=None):
+        super(LimitedUploadHandler, self).__init__(request)
+        self.max_size = max_size
+        self.skipped = set()
+
+    def new_file(self, *args, **kwargs):
+        super(LimitedUploadHandler, self).new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.max_size is not None and self.received > self.max_size:
+            # the parser closes, and so deletes, the temporary file
+            self.skipped.add(self.field_name)
+            raise SkipFile
+        self.file.write(raw_data)
@@ -135,6 +135,12 @@ urlpatterns = [
         name='contact_thanks'),
 
 
+    # Search suggestions
+    url(r'^search/suggestions/$',
+        views.SearchSuggestionsView.as_view(),
+        name='search_suggestions'),
+
+
     # RSS feeds
     url(r'^rss/all/$',
         feeds.AggregatedFeed(),
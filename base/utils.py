@@ -11,3 +11,32 @@ def chunks(iterable, n):
         except StopIteration:
             return
         yield itertools.chain((first_item,), chunk)
+
+
+def parse_accept_encoding(header):
+    """
+    Return a dictionary mapping each content coding of an Accept-Encoding
+    header, including "*", to its quality value.
+    """
+    qualities = {}
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def accepts_encoding(header, coding):
+    """Return whether an Accept-Encoding header allows a content coding."""
+    qualities = parse_accept_encoding(header)
+    return qualities.get(coding, qualities.get('*', 0.0)) > 0
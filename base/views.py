@@ -1,78 +1,128 @@
-from calendar import monthrange
+import mimetypes
+import os
+from calendar import Calendar, monthrange
+from collections import defaultdict
 from datetime import date, datetime, timedelta
+from django.conf import settings
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.urls import reverse
-from django.db.models import Q
+from django.db.models import Count, Q
+from django.http import FileResponse, Http404, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.views.generic.base import TemplateView
+from django.utils._os import safe_join
+from django.utils.decorators import method_decorator
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.generic.base import TemplateView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import FormView
 from django.views.generic.list import ListView
+from haystack.views import SearchView
 
-from base import utils, forms
+from base import assets, forms, generations, utils
+from base.pagination import InvalidCursor, KeysetPaginator
+from base.search import normalize_query, results_cache
+from base.typeahead import suggestions
+from base.uploads import LimitedUploadHandler
 from base.models import (
-    ArtsNews, Audition, Production, ProductionCompany, Review, Reviewer, Venue
+    Address, ArtsNews, Audition, ExternalReview, NewsSlideshowImage, Play,
+    Production, ProductionCompany, ProductionOccurrence, Review, Reviewer,
+    Venue
 )
 
 
 class HomepageView(TemplateView):
-    """The site's homepage"""
+    """
+    The site's homepage
+
+    Each section is loaded by its own method with bounded, pre-joined queries,
+    so the page costs a fixed number of queries however much content exists.
+    """
     template_name = 'homepage.html'
+    max_reviews = 4
+    max_productions = 24
+    max_auditions = 8
+    max_news_per_column = 4
+    news_columns = 3
+
+    def get_reviews(self):
+        """Return the latest published reviews with a cover image"""
+        reviews = Review.objects.filter(
+            is_published=True,
+            cover_image__isnull=False
+        ).exclude(cover_image='').select_related(
+            'production__play', 'production__production_company')
+        return list(reviews[:self.max_reviews])
+
+    def get_productions(self):
+        """Return current productions with a poster, ready for tile display"""
+        productions = Production.objects.with_tile_data(
+            Production.objects.filter_current().exclude(poster__isnull=True))
+        return list(productions.order_by('start_date')[:self.max_productions])
+
+    def get_audition_groups(self):
+        """Return upcoming auditions, split into two columns"""
+        auditions = Audition.objects.filter(
+            start_date__gte=date.today()
+        ).select_related('play', 'production_company').order_by('start_date')
+        auditions = list(auditions[:self.max_auditions])
+        if not auditions:
+            return None
+        auditions_col_len = max(1, int(len(auditions)/2))
+        return [
+            list(group) for group in utils.chunks(auditions, auditions_col_len)
+        ]
+
+    def get_media_news(self):
+        """Return the latest news item with feature media"""
+        media_news = ArtsNews.objects.filter_media().prefetch_related(
+            'newsslideshowimage_set')
+        return media_news.first()
+
+    def get_news_groups(self, exclude=None):
+        """Return the latest news items, split into columns"""
+        news = ArtsNews.objects.order_by('-created_on').prefetch_related(
+            'newsslideshowimage_set')
+        if exclude:
+            news = news.exclude(pk=exclude.pk)
+        news = list(news[:self.news_columns * self.max_news_per_column])
+        if not news:
+            return None
+        news_column_length = max(1, int(len(news)/self.news_columns))
+        news_groups = [
+            list(news_column)
+            for news_column in utils.chunks(news, news_column_length)
+        ]
+        return news_groups[:self.news_columns]
 
     def get_context_data(self, *args, **kwargs):
         context = super(HomepageView, self).get_context_data(*args, **kwargs)
 
-        # get reviews, productions, auditions, and news to display
-        published_reviews = Review.objects.filter(
-            is_published=True,
-            cover_image__isnull=False
-        ).exclude(cover_image='')
-        current_productions = Production.objects.filter_current().exclude(
-            poster__isnull=True)
-        upcoming_auditions = Audition.objects.filter(
-            start_date__gte=date.today())
-        media_news = ArtsNews.objects.filter_media()
-        news = ArtsNews.objects.order_by('-created_on')
-
-        # limit records displayed on page
-        reviews = published_reviews[:4]
-        productions = current_productions.order_by('start_date')[:24]
-
-        # format data for display in columns, etc.
-        auditions = upcoming_auditions.order_by('start_date')[:8]
-        if auditions:
-            auditions_col_len = int(len(auditions)/2)
-            audition_groups = [
-                list(group) for group in utils.chunks(auditions, auditions_col_len)
-            ]
-        else:
-            audition_groups = None
-
-        # extract the latest news item with feature media
-        media_news = media_news[0] if media_news else None
-
-        # get the proper number of non-media news items
-        max_news_per_column = 4
-        news_columns = 3
-        news = news.exclude(pk=media_news.pk) if media_news else news
-        if news:
-            news = news[:news_columns * max_news_per_column]
-            news_column_length = int(len(news)/news_columns)
-            news_groups = [
-                list(news_column) for news_column in utils.chunks(news, news_column_length)
-            ]
-            news_groups = news_groups[:news_columns]
-        else:
-            news_groups = None
-
-        # order & limit number of items to display
+        # sections are cached until a model they display is saved or deleted
+        today = date.today()
+        news_models = (ArtsNews, NewsSlideshowImage)
+        media_news = generations.get_or_set_versioned(
+            'homepage_media_news', news_models, self.get_media_news)
         context.update({
-            'reviews': reviews,
-            'productions': productions,
-            'audition_groups': audition_groups,
+            'reviews': generations.get_or_set_versioned(
+                'homepage_reviews',
+                (Review, Production, Play, ProductionCompany),
+                self.get_reviews),
+            'productions': generations.get_or_set_versioned(
+                'homepage_productions',
+                (Production, Play, ProductionCompany, Venue, Address, Review,
+                    ExternalReview),
+                self.get_productions, today),
+            'audition_groups': generations.get_or_set_versioned(
+                'homepage_auditions',
+                (Audition, Play, ProductionCompany),
+                self.get_audition_groups, today),
             'media_news': media_news,
-            'news_groups': news_groups,
+            'news_groups': generations.get_or_set_versioned(
+                'homepage_news', news_models,
+                lambda: self.get_news_groups(exclude=media_news)),
         })
         return context
 
@@ -104,31 +154,66 @@ class ReviewDetailView(DetailView):
         return context
 
 
-class ReviewListView(ListView):
+class KeysetPaginationMixin(object):
+    """
+    Paginate a list view's queryset by seeking past the last object shown
+    (see base.pagination), so deep pages cost as much as the first. Numbered
+    pages are still served when a ?page= parameter is given.
+
+    per_page - the number of objects on each page
+    keyset - the ordering used to seek between pages; must end with 'id'
+    """
+    per_page = None
+    keyset = None
+
+    def get_page(self):
+        """Return the requested page of objects"""
+        queryset = self.get_queryset()
+        if 'page' in self.request.GET:
+            paginator = Paginator(queryset, self.per_page)
+            page = self.request.GET.get('page')
+            try:
+                return paginator.page(page)
+            except PageNotAnInteger:
+                return paginator.page(1)
+            except EmptyPage:
+                return paginator.page(paginator.num_pages)
+
+        paginator = KeysetPaginator(queryset, self.per_page, self.keyset)
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            return paginator.page()
+
+    def get_page_querystring(self):
+        """Return the query string to carry over to other pages"""
+        return urlencode(sorted(
+            (key, value) for key, value in self.request.GET.items()
+            if key not in ('page', 'cursor')
+        ))
+
+    def get_context_data(self, *args, **kwargs):
+        context = super(KeysetPaginationMixin, self).get_context_data(
+            *args, **kwargs)
+        context.update({
+            'page': self.get_page(),
+            'page_querystring': self.get_page_querystring(),
+        })
+        return context
+
+
+class ReviewListView(KeysetPaginationMixin, ListView):
     """Display all published Review objects, paginated"""
     model = Review
     queryset = Review.objects.filter(is_published=True).order_by(
         '-published_on')
     template_name = 'reviews/list.html'
+    per_page = 6
+    keyset = ('-published_on', '-id')
 
     def get_context_data(self, *args, **kwargs):
         context = super(ReviewListView, self).get_context_data(*args, **kwargs)
-
-        # paginate reviews
-        all_reviews = self.get_queryset()
-        paginator = Paginator(all_reviews, 6)
-        page = self.request.GET.get('page')
-        try:
-            page = paginator.page(page)
-        except PageNotAnInteger:
-            page = paginator.page(1)
-        except EmptyPage:
-            page = paginator.page(paginator.num_pages)
-
-        context.update({
-            'reviews': page.object_list,
-            'page': page,
-        })
+        context['reviews'] = context['page'].object_list
         return context
 
 
@@ -148,12 +233,13 @@ class ProductionCompanyView(DetailView):
 class LocalTheatresView(ListView):
     """Display all ProductionCompany objects"""
     model = ProductionCompany
-    queryset = ProductionCompany.objects.filter_active()
     template_name = 'companies/list.html'
     context_object_name = 'companies'
 
     def get_queryset(self):
-        active_companies = self.queryset
+        active_companies = (
+            ProductionCompany.objects.filter_active()
+            if self.queryset is None else self.queryset)
 
         # categorize companies by the first letter in their name
         categorized = {}
@@ -205,38 +291,21 @@ class AuditionDetailView(DetailView):
 class UpcomingAuditionListView(ListView):
     """Display all upcoming Audition objects"""
     model = Audition
-    queryset = Audition.objects.filter_upcoming().order_by('start_date')
     template_name = 'auditions/upcoming_list.html'
 
+    def get_queryset(self):
+        return Audition.objects.filter_upcoming()
 
-class PastAuditionListView(ListView):
+
+class PastAuditionListView(KeysetPaginationMixin, ListView):
     """Display all past Audition objects, paginated"""
     model = Audition
     template_name = 'auditions/past_list.html'
+    per_page = 24
+    keyset = ('-start_date', '-id')
 
     def get_queryset(self):
-        upcoming = Audition.objects.filter_upcoming()
-        return Audition.objects.exclude(
-            id__in=[audition.id for audition in upcoming]
-            ).order_by('-start_date')
-
-    def get_context_data(self, *args, **kwargs):
-        context = super(PastAuditionListView, self).get_context_data(
-            *args, **kwargs)
-
-        # paginate past auditions
-        auditions = self.get_queryset()
-        paginator = Paginator(auditions, 24)
-        page = self.request.GET.get('page')
-        try:
-            page = paginator.page(page)
-        except PageNotAnInteger:
-            page = paginator.page(1)
-        except EmptyPage:
-            page = paginator.page(paginator.num_pages)
-
-        context['page'] = page
-        return context
+        return Audition.objects.filter_past()
 
 
 class NewsDetailView(DetailView):
@@ -252,7 +321,8 @@ class NewsDetailView(DetailView):
         news = self.get_object()
         recent_reviews = Review.objects.all()
         recent_news = ArtsNews.objects.exclude(pk=news.pk)
-        current_productions = Production.objects.filter_current()
+        current_productions = Production.objects.filter_current() \
+            .select_related('play', 'production_company')
 
         context.update({
             'recent_reviews': recent_reviews[:3],
@@ -263,10 +333,12 @@ class NewsDetailView(DetailView):
         return context
 
 
-class NewsListView(ListView):
+class NewsListView(KeysetPaginationMixin, ListView):
     """Display all ArtsNews objects, paginated"""
     model = ArtsNews
     template_name = 'news/list.html'
+    per_page = 36
+    keyset = ('-created_on', '-id')
 
     def get_queryset(self):
         # if a category is provided, return only news items in that category
@@ -287,24 +359,6 @@ class NewsListView(ListView):
 
         return news
 
-    def get_context_data(self, *args, **kwargs):
-        context = super(NewsListView, self).get_context_data(*args, **kwargs)
-
-        # paginate news
-        news_stories = self.get_queryset()
-        stories_per_page = 36
-        paginator = Paginator(news_stories, stories_per_page)
-        page = self.request.GET.get('page')
-        try:
-            page = paginator.page(page)
-        except PageNotAnInteger:
-            page = paginator.page(1)
-        except EmptyPage:
-            page = paginator.page(paginator.num_pages)
-
-        context['page'] = page
-        return context
-
 
 class ProductionNewsListView(NewsListView):
     """Display all news items associated with a production"""
@@ -337,7 +391,7 @@ class ProductionDetailView(DetailView):
 
         production = self.get_object()
         current_productions = Production.objects.filter_current().exclude(
-            pk=production.pk)
+            pk=production.pk).select_related('play', 'production_company')
         recent_news = ArtsNews.objects.all()
 
         production = self.get_object()
@@ -392,7 +446,8 @@ class DateRangePerformanceView(TemplateView):
     def get_performances(self):
         """Return all Production objects in the specified date range"""
         start_date, end_date = self._get_range()
-        productions = Production.objects.filter_in_range(start_date, end_date)
+        productions = Production.objects.with_tile_data(
+            Production.objects.filter_in_range(start_date, end_date))
         return productions.order_by('start_date')
 
     def get_context_data(self, *args, **kwargs):
@@ -468,6 +523,32 @@ class MonthPerformanceView(DateRangePerformanceView):
             year=start_date.year)
         return start_date, end_date
 
+    def get_calendar(self):
+        """
+        Return the weeks of the month as lists of (date, productions) tuples.
+        Days outside of the month are padded with (date, None).
+        """
+        start_date, end_date = self._get_range()
+        occurrences = ProductionOccurrence.objects.filter(
+            date__gte=start_date,
+            date__lte=end_date
+        ).select_related('production__play', 'production__production_company')
+
+        productions_by_date = defaultdict(list)
+        for occurrence in occurrences:
+            productions_by_date[occurrence.date].append(occurrence.production)
+
+        weeks = Calendar().monthdatescalendar(
+            start_date.year, start_date.month)
+        return [
+            [
+                (day, productions_by_date.get(day, []))
+                if day.month == start_date.month else (day, None)
+                for day in week
+            ]
+            for week in weeks
+        ]
+
     def get_context_data(self, *args, **kwargs):
         context = super(MonthPerformanceView, self).get_context_data(
             *args, **kwargs)
@@ -480,6 +561,7 @@ class MonthPerformanceView(DateRangePerformanceView):
             'current_start_date': start_date,
             'next_start_date': next_start_date,
             'previous_start_date': previous_start_date,
+            'calendar': self.get_calendar(),
         })
         return context
 
@@ -498,7 +580,8 @@ class CityPerformanceView(ListView):
     def get_queryset(self):
         now = timezone.now()
         sixty_days = now + timedelta(days=60)
-        current_queryset = Production.objects.filter_in_range(now, sixty_days)
+        current_queryset = Production.objects.with_tile_data(
+            Production.objects.filter_in_range(now, sixty_days))
         queryset = (
             current_queryset.filter(
                 venue__address__city=self.city
@@ -510,18 +593,15 @@ class CityPerformanceView(ListView):
         context = super(CityPerformanceView, self).get_context_data(
             *args, **kwargs)
 
-        # add list of cities, sorted by number of venues
-        city_venues = Venue.objects.filter_cities()
-        sorted_city_venues = sorted(
-            city_venues.items(),
-            key=lambda c: len(c[1]),
-            reverse=True)
-        cities = [cv[0] for cv in sorted_city_venues]
-
-        # remove any cities that do not have upcoming productions
-        upcoming_cities = Production.objects.filter_current().values_list(
-            'venue__address__city', flat=True).distinct()
-        cities = [city for city in cities if city in upcoming_cities]
+        # add list of cities with current productions, sorted by number of
+        # venues
+        cities = Venue.objects.filter(
+            address__city__in=Production.objects.filter_current().values(
+                'venue__address__city')
+        ).values('address__city').annotate(
+            venue_count=Count('pk')
+        ).order_by('-venue_count', 'address__city').values_list(
+            'address__city', flat=True)
 
         context.update({
             'city': self.city,
@@ -582,6 +662,11 @@ class CompanyProductionListView(CompanyObjectListView):
     template_name = 'productions/company.html'
     context_object_name = 'productions'
 
+    def get_queryset(self):
+        queryset = Production.objects.with_tile_data().filter(
+            production_company=self.company)
+        return self.order_queryset(queryset)
+
 
 class CompanyReviewListView(CompanyObjectListView, ReviewListView):
     """Display all published Review objects for a Production Company"""
@@ -603,9 +688,8 @@ class CompanyAuditionListView(UpcomingAuditionListView, CompanyObjectListView):
     template_name = 'auditions/company_upcoming.html'
 
     def get_queryset(self):
-        upcoming = super(CompanyAuditionListView, self).queryset
-        return upcoming.filter(production_company=self.company).order_by(
-            'start_date')
+        upcoming = super(CompanyAuditionListView, self).get_queryset()
+        return upcoming.filter(production_company=self.company)
 
 
 class CompanyPastAuditionListView(PastAuditionListView, CompanyObjectListView):
@@ -625,13 +709,8 @@ class VenueListView(ListView):
     template_name = 'venues/list.html'
 
     def get_queryset(self, *args, **kwargs):
-        """Return a dictionary that categorizes active venues by city"""
-        venues = Venue.objects.filter_active()
-        cities = venues.values_list('address__city', flat=True).distinct()
-        city_venues = {}
-        for city in cities:
-            city_venues[city] = venues.filter(address__city=city)
-        return sorted(city_venues.items())
+        """Return a list of (city, venues) tuples of active venues"""
+        return Venue.objects.get_directory(Venue.objects.filter_active())
 
 
 class VenueProductionListView(ListView):
@@ -646,8 +725,8 @@ class VenueProductionListView(ListView):
             request, *args, **kwargs)
 
     def get_queryset(self):
-        return Production.objects.filter(venue=self.venue).order_by(
-            '-start_date')
+        return Production.objects.with_tile_data().filter(
+            venue=self.venue).order_by('-start_date')
 
     def get_context_data(self, *args, **kwargs):
         context = super(VenueProductionListView, self).get_context_data(
@@ -666,11 +745,9 @@ class ReviewerListView(ListView):
             *args, **kwargs)
 
         # ensure reviewers are sorted by activity
-        active_reviewers = Reviewer.objects.filter_active()
-        active_reviewers = sorted(
-            list(active_reviewers),
-            key=lambda r: r.review_set.count(),
-            reverse=True)
+        active_reviewers = Reviewer.objects.annotate_review_counts(
+            Reviewer.objects.filter_active()
+        ).order_by('-total_review_count', 'last_name', 'first_name')
 
         context.update({
             'active_reviewers': active_reviewers,
@@ -694,14 +771,176 @@ class ContactFormView(FormView):
     form_class = forms.ContactForm
     template_name = 'about/contact.html'
 
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        # upload handlers must be replaced before the CSRF check reads the
+        # request body, so the check is made afterwards
+        self.upload_handler = LimitedUploadHandler(
+            request, settings.MAX_UPLOAD_SIZE)
+        request.upload_handlers = [self.upload_handler]
+        return self.protected_dispatch(request, *args, **kwargs)
+
+    @method_decorator(csrf_protect)
+    def protected_dispatch(self, request, *args, **kwargs):
+        return super(ContactFormView, self).dispatch(request, *args, **kwargs)
+
+    def get_form_kwargs(self):
+        kwargs = super(ContactFormView, self).get_form_kwargs()
+        kwargs['skipped_files'] = self.upload_handler.skipped
+        return kwargs
+
     def get_success_url(self):
         return reverse('contact_thanks')
 
     def form_valid(self, form):
-        form.send_message()
+        form.queue_message()
         return super(ContactFormView, self).form_valid(form)
 
 
 class ContactThanksView(TemplateView):
     """Display a thank-you page after the contact form is submitted"""
     template_name = 'about/contact_thanks.html'
+
+
+class CachedSearchView(SearchView):
+    """
+    Search with normalized queries and facet filters, caching each page of
+    results and its facet counts until the search index is next written
+    """
+    max_facet_values = 10
+
+    def __init__(self, *args, **kwargs):
+        if kwargs.get('form_class') is None:
+            kwargs['form_class'] = forms.FilteredSearchForm
+        super(CachedSearchView, self).__init__(*args, **kwargs)
+
+    def get_results(self):
+        if self.query:
+            self.form.cleaned_data['q'] = normalize_query(self.query)
+        return super(CachedSearchView, self).get_results()
+
+    def get_filters(self):
+        """Return the form's values, other than the query, as a tuple"""
+        return tuple(sorted(
+            (name, str(sorted(value) if isinstance(value, list) else value))
+            for name, value in self.form.cleaned_data.items() if name != 'q'
+        ))
+
+    def build_page(self):
+        self.facets = {}
+        try:
+            page_no = int(self.request.GET.get('page', 1))
+        except (TypeError, ValueError):
+            page_no = None
+        if not self.query or page_no is None:
+            return super(CachedSearchView, self).build_page()
+
+        key = (
+            generations.get_search_index_generation(),
+            normalize_query(self.query),
+            self.get_filters(),
+            page_no,
+            self.results_per_page,
+        )
+        cached = results_cache.get(key)
+        if cached is None:
+            paginator, page = super(CachedSearchView, self).build_page()
+            self.facets = self.results.facet_counts()
+            results_cache.set(
+                key, (list(page.object_list), paginator.count, self.facets))
+            return paginator, page
+
+        object_list, count, self.facets = cached
+        paginator = Paginator(range(count), self.results_per_page)
+        page = paginator.page(page_no)
+        page.object_list = object_list
+        return paginator, page
+
+    def get_facet_links(self, querystring):
+        """
+        Return a (label, values) tuple for each facet field with counts. Each
+        value has a querystring that selects it, or deselects it if selected.
+        """
+        field_counts = self.facets.get('fields', {})
+        facet_links = []
+        for name in self.form.facet_fields:
+            values = []
+            counts = field_counts.get(name, [])
+            for value, count in counts[:self.max_facet_values]:
+                selected = self.form.cleaned_data.get(name) == value
+                params = querystring.copy()
+                if selected:
+                    params.pop(name, None)
+                else:
+                    params[name] = value
+                values.append({
+                    'value': value,
+                    'count': count,
+                    'selected': selected,
+                    'querystring': params.urlencode(),
+                })
+            if values:
+                facet_links.append((self.form.fields[name].label, values))
+        return facet_links
+
+    def extra_context(self):
+        querystring = self.request.GET.copy()
+        querystring.pop('page', None)
+        return {
+            'facets': self.get_facet_links(querystring) if self.query else [],
+            'page_querystring': querystring.urlencode(),
+        }
+
+
+class SearchSuggestionsView(View):
+    """
+    Return, as JSON, the plays, companies, venues, and reviewers with a word
+    beginning with the query. Suggestions are served from memory.
+    """
+    max_suggestions = 8
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '')
+        return JsonResponse({
+            'query': query,
+            'suggestions': suggestions.search(query, self.max_suggestions),
+        })
+
+
+# Built assets have hashed names, so they can be cached for a year
+ASSET_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def serve_asset(request, path):
+    """
+    Serve a bundle written by the build_assets command, with headers letting
+    browsers cache it indefinitely. A precompressed copy is served to clients
+    that accept its encoding.
+    """
+    try:
+        full_path = safe_join(
+            settings.STATIC_ROOT, assets.ASSETS_DIR, path)
+    except ValueError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    encoding = None
+    for name, extension in (('br', '.br'), ('gzip', '.gz')):
+        if utils.accepts_encoding(accepted, name) and \
+                os.path.isfile(full_path + extension):
+            encoding = name
+            full_path += extension
+            break
+
+    response = FileResponse(
+        open(full_path, 'rb'),
+        content_type=mimetypes.guess_type(path)[0] or
+        'application/octet-stream')
+    if encoding:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response['Cache-Control'] = 'public, max-age=%s, immutable' % (
+        ASSET_MAX_AGE)
+    return response
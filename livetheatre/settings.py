@@ -10,6 +10,7 @@ https://docs.djangoproject.com/en/1.7/ref/settings/
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 import os
+import tempfile
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))
 
 
@@ -50,8 +51,23 @@ MIDDLEWARE = (
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'base.middleware.TexasTimezoneMiddleware',
+    'base.middleware.PageCacheMiddleware',
+    'base.middleware.ProfilingMiddleware',
 )
 
+# Full page cache for anonymous visitors (see base.middleware). Pages expire
+# when the objects they show change, or after PAGE_CACHE_TIMEOUT seconds.
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Per-request query and timing instrumentation (see base.middleware)
+PROFILING_ENABLED = False
+PROFILING_BUFFER_SIZE = 500
+# Each process buffers its own profiles; dump_request_profiles signals web
+# workers to write them to this directory
+PROFILING_DUMP_DIR = os.path.join(
+    tempfile.gettempdir(), 'livetheatre_profiles')
+
 ROOT_URLCONF = 'livetheatre.urls'
 
 WSGI_APPLICATION = 'livetheatre.wsgi.application'
@@ -66,6 +82,28 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+# Generation counters, and the fragments, pages and search results versioned
+# on them, must be shared by every process: web workers, the search queue
+# worker and management commands. A per-process backend such as
+# LocMemCache leaves each process serving its own stale copies. Configure
+# memcached in local_settings when serving from more than one host.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'LIVETHEATRE_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'livetheatre_cache')),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+}
+# Tests run against a temporary cache directory of their own (see
+# base.runner), leaving the cache of any local server untouched
+TEST_RUNNER = 'base.runner.TestRunner'
+# Seconds a versioned fragment is kept, even if its generations never change
+VERSIONED_CACHE_TIMEOUT = 24 * 60 * 60
+
 # Internationalization
 # https://docs.djangoproject.com/en/1.7/topics/i18n/
 
@@ -154,6 +192,20 @@ TINYMCE_DEFAULT_CONFIG = {
 # http://django-filebrowser.readthedocs.org/en/latest/settings.html
 VERSIONS_BASEDIR = '_versions'
 DIRECTORY = 'uploads'
+# Image renditions served through srcset (see base.renditions), generated on
+# upload and by the generate_renditions command
+FILEBROWSER_VERSIONS = {
+    'admin_thumbnail': {
+        'verbose_name': 'Admin Thumbnail', 'width': 60, 'height': 60,
+        'opts': 'crop'},
+    'thumbnail': {
+        'verbose_name': 'Thumbnail', 'width': 160, 'height': '', 'opts': ''},
+    'tile': {'verbose_name': 'Tile', 'width': 360, 'height': '', 'opts': ''},
+    'feature': {
+        'verbose_name': 'Feature', 'width': 720, 'height': '', 'opts': ''},
+}
+FILEBROWSER_ADMIN_VERSIONS = ['thumbnail', 'tile', 'feature']
+FILEBROWSER_VERSION_QUALITY = 80
 
 # Grappelli Configuration
 # http://django-grappelli.readthedocs.org/en/latest/customization.html
@@ -161,13 +213,24 @@ GRAPPELLI_ADMIN_TITLE = 'CTX Live Theatre Admin'
 
 # Search Configuration
 # http://django-haystack.readthedocs.org/en/latest/tutorial.html
-HAYSTACK_SIGNAL_PROCESSOR = 'haystack.signals.RealtimeSignalProcessor'
+HAYSTACK_SIGNAL_PROCESSOR = 'base.indexing.QueuedSignalProcessor'
 HAYSTACK_CONNECTIONS = {
     'default': {
-        'ENGINE': 'haystack.backends.whoosh_backend.WhooshEngine',
+        'ENGINE': 'base.search.FacetedWhooshEngine',
         'PATH': os.path.join(os.path.dirname(__file__), 'whoosh_index'),
     },
 }
+# Number of search result pages cached by each process (see base.search)
+SEARCH_CACHE_SIZE = 256
+
+# Contact form submissions are queued and sent by the send_contact_messages
+# command. Their attachments hold visitors' personal data, so they are kept
+# outside of the source tree and the public media root until then.
+CONTACT_OUTBOX_ROOT = os.environ.get(
+    'LIVETHEATRE_CONTACT_OUTBOX_ROOT',
+    os.path.join(os.path.expanduser('~'), '.livetheatre', 'contact_outbox'))
+# Largest contact form attachment accepted, in bytes
+MAX_UPLOAD_SIZE = 5 * 1024 * 1024
 
 
 # Import local settings
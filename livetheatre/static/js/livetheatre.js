@@ -16,6 +16,36 @@ $(document).ready(function() {
     });
 
 
+    /* Top nav search suggestions */
+    var suggestion_timer = null;
+    $("#search-form input[data-suggestions-url]").on('input', function() {
+        var input = $(this);
+        var menu = $('#search-suggestions');
+        clearTimeout(suggestion_timer);
+        suggestion_timer = setTimeout(function() {
+            var query = $.trim(input.val());
+            if (query.length < 2) {
+                menu.hide();
+                return;
+            }
+            $.getJSON(input.data('suggestions-url'), {q: query}, function(data) {
+                if (data.query !== $.trim(input.val())) return;
+                menu.empty();
+                $.each(data.suggestions, function(i, suggestion) {
+                    $('<li>').append(
+                        $('<a>').attr('href', suggestion.url)
+                            .text(suggestion.name)
+                            .append($('<span class="suggestion-kind">').text(suggestion.kind))
+                    ).appendTo(menu);
+                });
+                menu.toggle(data.suggestions.length > 0);
+            });
+        }, 100);
+    }).on('blur', function() {
+        setTimeout(function() { $('#search-suggestions').hide(); }, 200);
+    });
+
+
     /* Add captions to in-body images */
     $("#main-content img[alt]:not(.no-caption,.captcha)").each(function() {
         caption_text = $(this).attr('alt');
@@ -3,6 +3,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from filebrowser.sites import site
 
+from base.assets import ASSETS_DIR
+from base.views import CachedSearchView, serve_asset
 from livetheatre import settings
 
 urlpatterns = [
@@ -10,9 +12,15 @@ urlpatterns = [
     url(r'^grappelli/', include('grappelli.urls')),
     url(r'^bossman/', admin.site.urls),
     url(r'^tinymce/', include('tinymce.urls')),
-    url(r'^search/', include('haystack.urls')),
+    # results render from stored index fields, so skip loading their objects
+    url(r'^search/$', CachedSearchView(load_all=False),
+        name='haystack_search'),
     url(r'^captcha/', include('captcha.urls')),
     url(r'^', include('base.urls')),
+    # hashed bundles from the build_assets command, cached indefinitely
+    url(r'^%s%s/(?P<path>[\w.-]+)$' % (
+        settings.STATIC_URL.lstrip('/'), ASSETS_DIR),
+        serve_asset, name='asset'),
 ]
 
 urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)